@@ -1,60 +1,51 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib import font_manager
-from matplotlib import rcParams
-import seaborn as sns
 import streamlit as st
 import math
+import os
+import functools
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
 import geopandas as gpd
-from matplotlib.colors import ListedColormap
-import unicodedata
-import requests
-import tempfile
 from streamlit_option_menu import option_menu
 import webbrowser
+from dashboard.store import load_tables
+from dashboard.encoding import encode_ids, decode_ids
+from dashboard.assets import PAGE_ICON, font_face_css
+from dashboard.fact import create_kelompok_order, create_df_fact, slice_date_range
+from dashboard.cube import CUBE_DIMS, CUBE_ROLLUPS, create_daily_cube, rollup_daily_cube, query_totals, query_monthly
+from dashboard.geodata import load_brazil, load_cities, create_zip_lookup, lookup_zip
+from dashboard.chartcache import CHART_CACHE_MB, ChartCache, fingerprint
+from dashboard import charts, vegacharts, sqlengine, shared
+from dashboard.filters import date_range
+from dashboard.dag import DatasetGraph
+from dashboard.instrument import (start_rerun, finish_rerun, annotate, mark_cache, traced, traced_cache,
+                                  summarize_spans)
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from dashboard.rfm import RFM_PERIODS, create_rfm
+from dashboard.leaderboard import LEADERBOARDS, create_leaderboard, query_top, top_n
+from dashboard.distinct import create_distinct_counter, query_distinct, query_distinct_by_state
+from dashboard.quantile import BOX_QUANTILES, QUANTILE_MEASURES, create_quantile_sketches, query_quantiles, query_quantiles_by
+from dashboard.category_matrix import (create_category_matrix, category_totals, category_entity_counts,
+                                       category_mask, top_categories)
 
 
 ### PAGE SETTING
 st.set_page_config(
     page_title="E-Commerce Data Analysis",
-    page_icon="https://reminerva.github.io/img_icon.ico",
+    page_icon=PAGE_ICON,
     initial_sidebar_state="expanded")
 
-############# STYLING #############
-# Font untuk matplotlib
-font_url = 'https://reminerva.github.io/Roboto-Medium.ttf'
-
-# Unduh font ke file sementara
-# Unduh font ke file sementara
-response = requests.get(font_url)
-with tempfile.NamedTemporaryFile(delete=False, suffix='.ttf') as temp_font_file:
-    temp_font_file.write(response.content)
-    temp_font_path = temp_font_file.name # Path ke file sementara
-
-# Load font custom
-custom_font = font_manager.FontProperties(fname=temp_font_path)
-
-# Tambahkan font ke Matplotlib dan perbarui cache
-font_manager.fontManager.addfont(temp_font_path)
-font_manager.fontManager.findfont(custom_font.get_name(), fallback_to_default=False)
-
-# Set font sebagai default
-rcParams['font.family'] = custom_font.get_name()
+## Instrumentasi rerun, aktif jika environment variable DASHBOARD_TRACE=1
+start_rerun(getattr(get_script_run_ctx(), 'session_id', None))
 
+############# STYLING #############
+# Font untuk matplotlib (file lokal di static/) didaftarkan sekali per proses oleh dashboard.charts
 st.html("""
         
         <style>
-        @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700;900&display=swap');
-        
-        @font-face {
-        font-family: "Source Sans Pro";
-        src: url('https://reminerva.github.io/Roboto-Medium.ttf') format("truetype");
-        }
-        @font-face {
-        font-family: "Roboto";
-        src: url('https://reminerva.github.io/Roboto-Medium.ttf') format("truetype");
-        }
+        """ + font_face_css() + """
 
         [data-testid="stHeader"] {
             background-color: rgba(0,0,0,0);
@@ -125,76 +116,42 @@ st.html("""
         </style>
         """)
 
-@st.cache_resource
-def read_csv():
-
-    # Import File CSV
-    df_customer = pd.read_csv('data/df_customer_clean.csv')
-    df_order = pd.read_csv('data/df_order_clean.csv')
-    df_order_items = pd.read_csv('data/df_order_items_clean.csv')
-    df_order_payments = pd.read_csv('data/df_order_payments_clean.csv')
-    df_product = pd.read_csv('data/df_product_clean.csv')
-    df_sellers = pd.read_csv('data/df_sellers_clean.csv')
-    df_geolocation = pd.read_csv('data/df_geolocation_clean.csv')
-
-    # Tertinggal
-    df_geolocation.drop(df_geolocation[df_geolocation['geolocation_lat'] <= -35].index, inplace=True)
+## Dataset bersama antar proses server pada satu host, aktif jika environment variable SHARED_DATA_DIR diisi
+@traced_cache(st.cache_resource)
+def load_shared_dataset() -> str:
 
-    ## Convert datetime
-    df_order['order_purchase_timestamp'] = pd.to_datetime(df_order['order_purchase_timestamp'])
-    df_order_items['shipping_limit_date'] = pd.to_datetime(df_order_items['shipping_limit_date'])
+    # Proses pertama yang tidak menemukan versi terbaru mem-publish dataset, proses lain langsung memetakannya
+    return shared.publish_dataset(shared.SHARED_DATA_DIR)
 
-    return df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation
+@traced_cache(st.cache_resource)
+def read_csv():
 
-df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation = read_csv()
+    if shared.SHARED_DATA_DIR:
+        # Tabel yang sudah di-encode dipetakan read-only dari file Arrow bersama, tanpa salinan per proses
+        tables, id_labels = shared.open_tables(load_shared_dataset())
+    else:
+        # Import data dari Parquet (data/parquet), fallback ke CSV jika belum dikonversi.
+        # Kolom datetime sudah di-parse saat konversi (python -m dashboard.store),
+        # kolom kota, state, status dan kategori dibaca sebagai categorical
+        tables = load_tables(categorical=True)
 
-## Kelompok order_id
-kelompok_cancel_unav = pd.concat([df_order[df_order['order_status']=='canceled']['order_id'],
-                                df_order[df_order['order_status']=='unavailable']['order_id']])
+        # Kolom ID hex diganti kode int32, id_labels hanya dipakai untuk menampilkan ID asli
+        tables, id_labels = encode_ids(tables)
 
-kelompok_seller = pd.concat([df_order[df_order['order_status']=='delivered']['order_id'],
-                           df_order[df_order['order_status']=='invoiced']['order_id'],
-                             df_order[df_order['order_status']=='shipped']['order_id'],
-                             df_order[df_order['order_status']=='processing']['order_id'],
-                             df_order[df_order['order_status']=='created']['order_id'],
-                             df_order[df_order['order_status']=='approved']['order_id']])
+    df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation = tables
 
-kelompok_customer = pd.concat([df_order[df_order['order_status']=='delivered']['order_id'],
-                             df_order[df_order['order_status']=='shipped']['order_id'],
-                             df_order[df_order['order_status']=='invoiced']['order_id'],
-                             df_order[df_order['order_status']=='processing']['order_id'],
-                             df_order[df_order['order_status']=='created']['order_id'],
-                             df_order[df_order['order_status']=='approved']['order_id']])
+    return df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation, id_labels
 
-## Kumpulan Fungsi
+df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation, id_labels = read_csv()
 
-### Menghapus Aksen
-def remove_accents(input_str):
-  
-    nfkd_form = unicodedata.normalize('NFKD', input_str)
-    return ''.join([char for char in nfkd_form if not unicodedata.combining(char)])
+## Kelompok order_id (sekali per proses)
+@traced_cache(st.cache_resource)
+def load_kelompok_order() -> tuple:
+    return create_kelompok_order(df_order)
 
-### Mendapatkan product
-def find_prod(prod_select:str, x:list):
+kelompok_cancel_unav, kelompok_seller, kelompok_customer = load_kelompok_order()
 
-    if prod_select in x:
-      return True
-    else:
-      return False
-    
-### Mendapatkan klaster rfm
-def assign_klaster_rfm(data_frame):
-    
-    # Hitung jumlah skor yang lebih dari 3
-    count_high_scores = sum([data_frame['score_freq'] >= 2, data_frame['score_rec'] >= 2, data_frame['score_monet'] > 2])
-
-    # Tentukan klaster berdasarkan jumlah skor tinggi
-    if count_high_scores >= 2:
-        return "1st Priority"
-    elif count_high_scores == 1:
-        return "2nd Priority"
-    else:
-        return "3rd Priority"
+## Kumpulan Fungsi
 
 ### Convert number ke teks 
 def format_number(num):
@@ -204,293 +161,479 @@ def format_number(num):
         return f'{round(num / 1000000, 1)} M'
     return f'{num // 1000} K'
 
+def format_value(num):
+    # Nilai kuantil dengan dua desimal, '-' jika tidak ada nilai pada rentang tanggal
+    if np.isnan(num):
+        return '-'
+    return f'{num:,.2f}'
+
+### Mendapatkan df_fact
+@traced_cache(st.cache_resource)
+def load_df_fact() -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan tabel fakta order-item yang sudah di-join (sekali per proses).
+    Filter tanggal dan semua pivot di bawah cukup berupa slice dan groupby dari tabel ini.
+
+    Returns:
+        df_fact (pandas DataFrame): Data Frame df_fact
+    """
+
+    return create_df_fact(df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers,
+                          kelompok_seller, kelompok_customer)
+
+### Mendapatkan daily_cubes
+@traced_cache(st.cache_resource)
+def load_daily_cubes() -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan cube harian (prefix sum per hari) dari df_fact beserta
+    rollup-nya per dimensi. Total pada rentang tanggal apa pun cukup dihitung dari dua prefix sum.
+
+    Returns:
+        daily_cubes (dict): {tuple dimensi: cube}, () untuk total keseluruhan
+    """
+
+    daily_cube = create_daily_cube(load_df_fact(), CUBE_DIMS)
+
+    daily_cubes = {CUBE_DIMS: daily_cube}
+    for dims in CUBE_ROLLUPS:
+        daily_cubes[dims] = rollup_daily_cube(daily_cube, dims)
+
+    return daily_cubes
+
+### Mendapatkan cube harian terkecil yang memuat dimensi by dan where
+def daily_cube_for(by: str = None, where: dict = None) -> dict:
+
+    # Rollup satu dimensi jika tersedia, selain itu cube dengan semua dimensi
+    dims = tuple([by] if by is not None else []) + tuple(where or ())
+    daily_cubes = load_daily_cubes()
+
+    return daily_cubes.get(dims, daily_cubes[CUBE_DIMS])
+
+### Mendapatkan leaderboards
+@traced_cache(st.cache_resource)
+def load_leaderboards() -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan leaderboard seller dan customer (partial total per hari
+    dan per bulan) dari df_fact, sekali per proses.
+
+    Returns:
+        leaderboards (dict): {kolom entity: leaderboard}
+    """
+
+    df_fact = load_df_fact()
+
+    return {entity: create_leaderboard(df_fact, entity, len(id_labels[entity])) for entity in LEADERBOARDS}
+
+### Mendapatkan distinct_counters
+@traced_cache(st.cache_resource)
+def load_distinct_counters() -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan sketch HyperLogLog per hari dan per bulan (keseluruhan
+    dan per state) untuk jumlah seller dan customer aktif dari df_fact, sekali per proses.
+
+    Returns:
+        distinct_counters (dict): {kolom entity: distinct counter}
+    """
+
+    df_fact = load_df_fact()
+
+    return {entity: create_distinct_counter(df_fact, entity, len(id_labels[entity])) for entity in LEADERBOARDS}
+
+### Mendapatkan quantile_sketches
+@traced_cache(st.cache_resource)
+def load_quantile_sketches() -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan sketch kuantil price, freight_value, dan nilai order
+    (count per bucket logaritmik per hari, keseluruhan dan per state / kategori) dari df_fact, sekali per proses.
+
+    Returns:
+        quantile_sketches (dict): {nama measure: {None atau kolom pengelompokan: quantile sketch}}
+    """
+
+    df_fact = load_df_fact()
+
+    return {name: create_quantile_sketches(df_fact, name) for name in QUANTILE_MEASURES}
+
+## Backend agregasi bisa diatur dengan environment variable QUERY_BACKEND:
+## 'pandas' (df_fact + cube harian) atau 'duckdb' (SQL langsung di atas file data, butuh paket duckdb)
+QUERY_BACKEND = sqlengine.query_backend()
+
+### Mendapatkan engine SQL
+@traced_cache(st.cache_resource)
+def load_sql_engine() -> sqlengine.SqlEngine:
+
+    """
+    Fungsi ini bertujuan untuk membuat engine DuckDB di atas file data (sekali per proses).
+    Label categorical diambil dari tabel di memori agar kode kota, state, dan kategori sama seperti jalur pandas.
+
+    Returns:
+        engine (SqlEngine): engine SQL
+    """
+
+    categories = {col: table[col].cat.categories for table in (df_order, df_product, df_sellers, df_customer)
+                  for col in sqlengine.CATEGORY_COLUMNS if col in table.columns}
+
+    return sqlengine.create_engine(id_labels, categories)
+
+### Query SQL dengan cache (engine tidak di-hash, cukup rentang tanggal dan filternya)
+@traced_cache(st.cache_data)
+def query_totals_sql(_engine, start_date, end_date, by=None, where: dict = None):
+    return sqlengine.query_totals(_engine, start_date, end_date, by, where)
+
+@traced_cache(st.cache_data)
+def query_monthly_sql(_engine, start_date, end_date, where: dict = None) -> pd.DataFrame:
+    return sqlengine.query_monthly(_engine, start_date, end_date, where)
+
+@traced_cache(st.cache_data)
+def query_pivot_seller_and_order(start_date, end_date) -> tuple:
+    return sqlengine.create_pivot_seller_and_order(load_sql_engine(), start_date, end_date)
+
+@traced_cache(st.cache_data)
+def query_category_matrices(start_date, end_date) -> dict:
+    return sqlengine.create_category_matrices(load_sql_engine(), start_date, end_date)
+
+@traced_cache(st.cache_data)
+def query_rfm_analysis(start_date, end_date) -> dict:
+    return sqlengine.create_rfm(load_sql_engine(), start_date, end_date, RFM_PERIODS)
+
+@traced_cache(st.cache_data)
+def query_top_sql(_engine, start_date, end_date, entity: str, n: int = 5) -> pd.DataFrame:
+    return sqlengine.query_top(_engine, start_date, end_date, entity, n)
+
+@traced_cache(st.cache_data)
+def query_distinct_sql(_engine, start_date, end_date, entity: str, by_state: bool = False):
+    return sqlengine.query_distinct(_engine, start_date, end_date, entity, by_state)
+
+@traced_cache(st.cache_data)
+def query_quantiles_sql(_engine, start_date, end_date, name: str, quantiles: tuple, by: str = None):
+    return sqlengine.query_quantiles(_engine, start_date, end_date, name, quantiles, by)
+
 ### Mendapatkan pivot_seller dan pivot_order
-@st.cache_data
-def create_pivot_seller_and_order(df_order_items: pd.DataFrame,
-                                  df_product: pd.DataFrame,
-                                  df_order_payments: pd.DataFrame,
-                                  df_order: pd.DataFrame) -> tuple:
+@traced_cache(st.cache_data)
+def create_pivot_seller_and_order(df_fact: pd.DataFrame) -> tuple:
 
     """
     Fungsi ini bertujuan untuk menghasilkan Data Frame pivot_seller dan pivot_order
 
     Parameters:
-        df_order_items (pandas DataFrame): Data Frame df_order_items
-        df_product (pandas DataFrame): Data Frame df_product
-        df_order_payments (pandas DataFrame): Data Frame df_order_payments
-        df_order (pandas DataFrame): Data Frame df_order
+        df_fact (pandas DataFrame): Data Frame df_fact yang sudah difilter
 
     Returns:
         tuple(pivot_seller, pivot_order):
         Data Frame pivot_seller dan  Data Frame pivot_order        
     """
 
-    def create_pivot_seller(df_order_items, df_product):
+    def create_pivot_seller(df_fact):
 
-        df_temp = pd.merge(df_order_items, df_product, on='product_id', how='inner')
-        pivot_seller = df_temp[df_temp['order_id'].isin(kelompok_seller)].groupby(by='seller_id').agg({
+        pivot_seller = df_fact[df_fact['kelompok_seller']].groupby(by='seller_id').agg({
                                                                     'price': ['sum','mean','max', 'min'],
                                                                     'freight_value': ['sum','mean','max', 'min'],
-                                                                    'product_id' : lambda x: tuple(x),
-                                                                    'product_category_name' : lambda x: tuple(x),
-                                                                    'shipping_limit_date' : lambda x: tuple(x)
+                                                                    'seller_zip_code_prefix': ['first'],
+                                                                    'seller_city': ['first'],
+                                                                    'seller_state': ['first']
                                                                     }).sort_values(by=('price','sum'), ascending=False)
-        pivot_seller.columns = ['_'.join(col).strip() for col in pivot_seller.columns.values]
+        pivot_seller.columns = ['_'.join(col).strip().removesuffix('_first') for col in pivot_seller.columns.values]
         
         return pivot_seller
     
-    def create_pivot_order(df_order_payments, df_order):
+    def create_pivot_order(df_fact):
 
-        df_temp = df_order_items.drop(columns=['order_item_id','shipping_limit_date','seller_id'])
-        df_temp = pd.merge(df_temp, df_product, on='product_id', how='inner')
-        df_temp = df_temp[df_temp['order_id'].isin(kelompok_customer)].groupby(by='order_id').agg({
+        pivot_order = df_fact[df_fact['kelompok_customer']].groupby(by='order_id').agg({
+                                                                    'customer_id': ['first'],
+                                                                    'payment_value': ['sum'],
                                                                     'price': ['sum','mean','max', 'min'],
                                                                     'freight_value': ['sum','mean','max', 'min'],
-                                                                    'product_id' : lambda x: tuple(x),
-                                                                    'product_category_name' : lambda x: tuple(x)
-                                                                    }).sort_values(by=('price','sum'), ascending=False)
-        df_temp.columns = ['_'.join(col).strip() for col in df_temp.columns.values]
-        
-        pivot_order = df_order_payments[df_order_payments['order_id'].isin(kelompok_customer)].groupby(by='order_id').agg({
-                                                            'payment_value': ['mean','max', 'min','sum'],
-                                                            }).sort_values(by=('payment_value','sum'), ascending=False)
-        pivot_order.columns = ['_'.join(col).strip() for col in pivot_order.columns.values]
-        pivot_order = pd.merge(pivot_order, df_temp, on='order_id', how='inner')
+                                                                    'order_status': ['first'],
+                                                                    'order_purchase_timestamp': ['first'],
+                                                                    'customer_zip_code_prefix': ['first'],
+                                                                    'customer_city': ['first'],
+                                                                    'customer_state': ['first']
+                                                                    }).sort_values(by=('payment_value','sum'), ascending=False)
+        pivot_order.columns = ['_'.join(col).strip().removesuffix('_first') for col in pivot_order.columns.values]
         
         return pivot_order
     
-    return create_pivot_seller(df_order_items, df_product), create_pivot_order(df_order_payments, df_order)
+    return create_pivot_seller(df_fact), create_pivot_order(df_fact)
+
+### Mendapatkan total measure pada rentang tanggal
+@traced
+def create_totals(start_date, end_date, by: str = None, where: dict = None):
 
-### Mendapatkan df_sellers_merged dan df_customer_merged
-@st.cache_data
-def create_df_sellers_and_customer_merged(pivot_seller: pd.DataFrame,
-                                          df_sellers: pd.DataFrame,
-                                          pivot_order: pd.DataFrame,
-                                          df_order: pd.DataFrame,
-                                          df_customer: pd.DataFrame) -> tuple:
-    
     """
-    Fungsi ini bertujuan untuk menghasilkan Data Frame df_sellers_merged dan df_customer_merged
+    Fungsi ini bertujuan untuk menghasilkan total setiap measure cube (price, freight_value, item_count,
+    payment_value, order_count) pada rentang tanggal, keseluruhan atau per dimensi by, dari rollup
+    cube harian yang sesuai atau dari query DuckDB.
 
     Parameters:
-        pivot_seller (pandas DataFrame): Data Frame pivot_seller
-        df_sellers (pandas DataFrame): Data Frame df_sellers
-        pivot_order (pandas DataFrame): Data Frame pivot_order
-        df_order (pandas DataFrame): Data Frame df_order
-        df_customer (pandas DataFrame): Data Frame df_customer
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
+        by (str): dimensi pengelompokan, None untuk total keseluruhan
+        where (dict): filter {dimensi: nilai}
 
     Returns:
-        tuple(df_sellers_merged, df_customer_merged):
-        Data Frame df_sellers_merged dan Data Frame df_customer_merged        
+        pandas Series (jika by None) atau pandas DataFrame yang diindeks oleh by
     """
 
-    df_sellers_merged = pd.merge(pivot_seller, df_sellers, on='seller_id', how='inner')
+    if QUERY_BACKEND == 'duckdb':
+        return query_totals_sql(load_sql_engine(), start_date, end_date, by, where)
 
-    df_order_merged = pd.merge(pivot_order, df_order, on='order_id', how='inner')
-    cols = df_order_merged.columns.tolist()
-    cols.insert(1, cols.pop(cols.index('customer_id')))
-    df_order_merged = df_order_merged[cols]
+    return query_totals(daily_cube_for(by, where), start_date, end_date, by, where)
 
-    df_customer_merged = pd.merge(df_order_merged, df_customer, on='customer_id', how='inner')
+### Mendapatkan total measure per bulan
+@traced
+def create_monthly(start_date, end_date, where: dict = None) -> pd.DataFrame:
 
-    return df_sellers_merged, df_customer_merged
+    """
+    Fungsi ini bertujuan untuk menghasilkan total setiap measure cube per bulan pada rentang tanggal,
+    dari rollup cube harian yang sesuai atau dari query DuckDB.
 
-### Mendapatkan monthly_summary
-def create_monthly_summary(df_customer_merged: pd.DataFrame) -> pd.DataFrame:
+    Parameters:
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
+        where (dict): filter {dimensi: nilai}
 
+    Returns:
+        pandas DataFrame yang diindeks oleh year_month (Period bulanan)
     """
-    Fungsi ini bertujuan untuk menghasilkan Data Frame monthly_summary
+
+    if QUERY_BACKEND == 'duckdb':
+        return query_monthly_sql(load_sql_engine(), start_date, end_date, where)
+
+    return query_monthly(daily_cube_for(None, where), start_date, end_date, where)
+
+### Mendapatkan top-N seller / customer
+@traced
+def create_df_top_entities(entity: str, start_date, end_date, n: int = 5) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan n seller (total price) atau customer (total payment)
+    terbesar pada rentang tanggal, tanpa groupby dan sort atas semua seller / customer.
 
     Parameters:
-        df_customer_merged (pandas DataFrame): Data Frame df_customer_merged
+        entity (str): 'seller_id' atau 'customer_id'
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
+        n (int): jumlah entity teratas
 
     Returns:
-        monthly_summary: Data Frame monthly_summary        
+        pandas DataFrame yang diindeks oleh kode entity, kolom price_sum / payment_value_sum, urut menurun
     """
 
-    ## Ekstrak tahun dan bulan
-    df_test = df_customer_merged.copy()
-    df_test['year_month'] = df_customer_merged['order_purchase_timestamp'].dt.to_period('M')
+    if QUERY_BACKEND == 'duckdb':
+        return query_top_sql(load_sql_engine(), start_date, end_date, entity, n)
 
-    ## Kelompokkan berdasarkan year_month dan jumlahkan payment_value_sum
-    monthly_summary = df_test.groupby('year_month')['payment_value_sum'].sum().reset_index()
+    # Partial bulanan dan harian leaderboard digabung, n teratas dipilih dengan argpartition
+    return query_top(load_leaderboards()[entity], start_date, end_date, n)
 
-    # ## Ubah kembali year_month ke string (opsional)
-    # monthly_summary['year_month'] = monthly_summary['year_month'].astype(str)
-    # monthly_summary['year_month'] = pd.to_datetime(monthly_summary['year_month'])
-    # monthly_summary['year_month'] = (monthly_summary['year_month']).dt.to_period('M')
+### Mendapatkan jumlah seller / customer aktif
+@traced
+def create_active_counts(entity: str, start_date, end_date, by_state: bool = False):
 
-    monthly_summary = monthly_summary.drop(index=monthly_summary[monthly_summary['year_month'] == '2018-09'].index)
+    """
+    Fungsi ini bertujuan untuk menghasilkan jumlah distinct seller atau customer aktif pada rentang
+    tanggal, keseluruhan atau per state. Rentang kecil (sampai distinct.EXACT_LIMIT pasangan hari
+    dan entity) dihitung exact, rentang yang lebih besar diestimasi dari union sketch HyperLogLog
+    (standard error 1.6%).
 
-    monthly_summary = monthly_summary.set_index('year_month')
+    Parameters:
+        entity (str): 'seller_id' atau 'customer_id'
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
+        by_state (bool): jika True, jumlah per state
 
-    return monthly_summary
+    Returns:
+        jumlah distinct (int), atau pandas Series yang diindeks oleh state jika by_state
+    """
 
-### Mendapatkan monthly_transactions
-def create_monthly_transactions(df_order_items: pd.DataFrame) -> tuple:
+    if QUERY_BACKEND == 'duckdb':
+        return query_distinct_sql(load_sql_engine(), start_date, end_date, entity, by_state)
 
-    daily_transactions = df_order_items[df_order_items['order_id'].isin(kelompok_seller)].copy()
-    daily_transactions['shipping_limit_date'] = pd.to_datetime(daily_transactions['shipping_limit_date'])
+    distinct_counter = load_distinct_counters()[entity]
+    if by_state:
+        return query_distinct_by_state(distinct_counter, start_date, end_date)
 
-    ## Ekstrak tahun dan bulan
-    daily_transactions['year_month_day'] = daily_transactions['shipping_limit_date'].dt.to_period('D')
-    daily_transactions = daily_transactions.sort_values(by='year_month_day', ascending=True).reset_index()
-    daily_transactions.drop(columns='index', inplace = True)
+    return query_distinct(distinct_counter, start_date, end_date)
 
-    daily_transactions = daily_transactions.drop(index=daily_transactions[daily_transactions['year_month_day'] == '2020-02-03'].index)
-    daily_transactions = daily_transactions.drop(index=daily_transactions[daily_transactions['year_month_day'] == '2020-04-09'].index)
-    daily_transactions = daily_transactions.drop(index=daily_transactions[daily_transactions['year_month_day'] == '2020-04-09'].index)
+### Mendapatkan kuantil price, freight_value, dan nilai order
+@traced
+def create_quantiles(name: str, start_date, end_date, quantiles: tuple = (0.5, 0.9, 0.95), by: str = None):
 
-    monthly_transactions = daily_transactions.copy()
+    """
+    Fungsi ini bertujuan untuk menghasilkan kuantil (misalnya median, p90, p95) pada rentang tanggal,
+    keseluruhan atau per state / kategori, dari gabungan sketch harian tanpa mengurutkan baris.
+    Error relatif setiap kuantil sekitar quantile.QUANTILE_ACCURACY (1%).
 
-    ## Ekstrak tahun dan bulan
-    monthly_transactions['year_month'] = daily_transactions['year_month_day'].dt.to_timestamp().dt.to_period('M')
+    Parameters:
+        name (str): 'price', 'freight_value', atau 'order_value' (total payment per order)
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
+        quantiles (tuple): kuantil antara 0 dan 1
+        by (str): kolom pengelompokan pada QUANTILE_MEASURES[name]['by'], None untuk keseluruhan
 
-    ## Kelompokkan berdasarkan year_month dan jumlahkan payment_value_sum
-    monthly_transactions = monthly_transactions.groupby('year_month')['seller_id'].count().reset_index()
-    monthly_transactions = monthly_transactions.drop(index=monthly_transactions[monthly_transactions['year_month'] == '2018-09'].index)
-    monthly_transactions = monthly_transactions.drop(index=monthly_transactions[monthly_transactions['year_month'] == '2020-02'].index)
-    monthly_transactions = monthly_transactions.drop(index=monthly_transactions[monthly_transactions['year_month'] == '2020-04'].index)
+    Returns:
+        pandas Series yang diindeks oleh kuantil, atau pandas DataFrame yang diindeks oleh
+        kelompok (satu kolom per kuantil dan kolom count) jika by diisi
+    """
 
-    monthly_transactions = monthly_transactions.set_index('year_month')
+    if QUERY_BACKEND == 'duckdb':
+        return query_quantiles_sql(load_sql_engine(), start_date, end_date, name, tuple(quantiles), by)
 
-    return monthly_transactions, daily_transactions
+    quantile_sketch = load_quantile_sketches()[name][by]
+    if by:
+        return query_quantiles_by(quantile_sketch, start_date, end_date, quantiles)
 
-### Mendapatkan df_monthly_seller_state
-def create_df_monthly_seller_state(state: str, df_order_items: pd.DataFrame, df_sellers: pd.DataFrame, df_order: pd.DataFrame) -> pd.DataFrame:
+    return query_quantiles(quantile_sketch, start_date, end_date, quantiles)
 
-    df_test = df_order_items[df_order_items['order_id'].isin(kelompok_seller)][['order_id', 'seller_id', 'price']]
-    df_test = pd.merge(df_test, df_sellers[['seller_id', 'seller_city', 'seller_state']], on='seller_id', how='left')
-    df_test = pd.merge(df_test, df_order[['order_id', 'order_purchase_timestamp']], on='order_id', how='left')
-    
-    df_test = df_test[df_test.seller_state == state].groupby(by='order_purchase_timestamp').agg({'price':'sum'})
-    df_test = df_test.reset_index()
+### Mendapatkan df_sellers_merged dan df_customer_merged
+@traced_cache(st.cache_data)
+def create_df_sellers_and_customer_merged(pivot_seller: pd.DataFrame,
+                                          pivot_order: pd.DataFrame) -> tuple:
     
-    df_test['year_month'] = df_test['order_purchase_timestamp'].dt.to_period('M')
-    df_monthly_seller_state = df_test.groupby(by='year_month').agg({'price':'sum'})
-    df_monthly_seller_state = df_monthly_seller_state.drop(index=df_monthly_seller_state[df_monthly_seller_state.index == '2018-09'].index)
+    """
+    Fungsi ini bertujuan untuk menghasilkan Data Frame df_sellers_merged dan df_customer_merged.
+    Lokasi seller dan customer sudah terbawa dari df_fact sehingga tidak perlu merge lagi.
 
-    return df_monthly_seller_state
+    Parameters:
+        pivot_seller (pandas DataFrame): Data Frame pivot_seller
+        pivot_order (pandas DataFrame): Data Frame pivot_order
 
-### Mendapatkan df_monthly_seller_city
-def create_df_monthly_seller_city(city: str, df_order_items: pd.DataFrame, df_sellers: pd.DataFrame, df_order: pd.DataFrame) -> pd.DataFrame:
+    Returns:
+        tuple(df_sellers_merged, df_customer_merged):
+        Data Frame df_sellers_merged dan Data Frame df_customer_merged        
+    """
 
-    df_test = df_order_items[df_order_items['order_id'].isin(kelompok_seller)][['order_id', 'seller_id', 'price']]
-    df_test = pd.merge(df_test, df_sellers[['seller_id', 'seller_state', 'seller_city']], on='seller_id', how='left')
-    df_test = pd.merge(df_test, df_order[['order_id', 'order_purchase_timestamp']], on='order_id', how='left')
-    
-    df_test = df_test[df_test.seller_city == city].groupby(by='order_purchase_timestamp').agg({'price':'sum'})
-    df_test = df_test.reset_index()
-    
-    df_test['year_month'] = df_test['order_purchase_timestamp'].dt.to_period('M')
-    df_monthly_seller_city = df_test.groupby(by='year_month').agg({'price':'sum'})
-    df_monthly_seller_city = df_monthly_seller_city.drop(index=df_monthly_seller_city[df_monthly_seller_city.index == '2018-09'].index)
+    df_sellers_merged = pivot_seller.dropna(subset=['seller_state']).reset_index()
 
-    return df_monthly_seller_city
+    df_customer_merged = pivot_order.dropna(subset=['customer_state']).reset_index()
 
-### Mendapatkan df_monthly_customer_state
-def create_df_monthly_customer_state(state:str, df_order: pd.DataFrame, df_order_payments: pd.DataFrame, df_customer: pd.DataFrame) -> pd.DataFrame:
+    return df_sellers_merged, df_customer_merged
 
-    df_test = df_order[df_order.order_id.isin(kelompok_customer)][['order_id', 'customer_id', 'order_purchase_timestamp']]
-    df_test = pd.merge(df_test, df_order_payments[['order_id', 'payment_value']], on='order_id', how='left')
-    df_test = pd.merge(df_test, df_customer[['customer_id', 'customer_city', 'customer_state']], on='customer_id', how='left')
+### Mendapatkan category_matrices
+@traced_cache(st.cache_data)
+def create_category_matrices(df_fact: pd.DataFrame) -> dict:
 
-    df_test = df_test[df_test.customer_state == state].groupby(by='order_purchase_timestamp').agg({'payment_value':'sum'})
-    df_test = df_test.reset_index()
-    df_test['year_month'] = df_test['order_purchase_timestamp'].dt.to_period('M')
-    df_monthly_customer_state = df_test.groupby(by='year_month').agg({'payment_value':'sum'})
-    df_monthly_customer_state = df_monthly_customer_state.drop(index=df_monthly_customer_state[df_monthly_customer_state.index == '2018-09'].index)
-    
-    return df_monthly_customer_state
+    """
+    Fungsi ini bertujuan untuk menghasilkan matriks sparse jumlah item per entity per kategori product
+    (seller, order/customer, kota, dan state) dari df_fact yang sudah difilter.
 
-### Mendapatkan df_monthly_customer_city
-def create_df_monthly_customer_city(city:str, df_order: pd.DataFrame, df_order_payments: pd.DataFrame, df_customer: pd.DataFrame) -> pd.DataFrame:
+    Parameters:
+        df_fact (pandas DataFrame): Data Frame df_fact yang sudah difilter
 
-    df_test = df_order[df_order.order_id.isin(kelompok_customer)][['order_id', 'customer_id', 'order_purchase_timestamp']]
-    df_test = pd.merge(df_test, df_order_payments[['order_id', 'payment_value']], on='order_id', how='left')
-    df_test = pd.merge(df_test, df_customer[['customer_id', 'customer_city', 'customer_state']], on='customer_id', how='left')
+    Returns:
+        category_matrices (dict): {nama entity: scipy csr_matrix}, beserta 'categories' (label kolom)
+        dan 'labels' (label baris untuk entity kota dan state)
+    """
 
-    df_test = df_test[df_test.customer_city == city].groupby(by='order_purchase_timestamp').agg({'payment_value':'sum'})
-    df_test = df_test.reset_index()
-    df_test['year_month'] = df_test['order_purchase_timestamp'].dt.to_period('M')
-    df_monthly_customer_city = df_test.groupby(by='year_month').agg({'payment_value':'sum'})
-    df_monthly_customer_city = df_monthly_customer_city.drop(index=df_monthly_customer_city[df_monthly_customer_city.index == '2018-09'].index)
-    
-    return df_monthly_customer_city
+    category = 'product_category_name'
+    df_seller = df_fact[df_fact['kelompok_seller']]
+    df_buyer = df_fact[df_fact['kelompok_customer']]
 
-### Mendapatkan rec_pivot_org
-@st.cache_data
-def create_rec_pivot_org(period: int, daily_transactions: pd.DataFrame) -> pd.DataFrame:
+    category_matrices = {
+        'categories': df_fact[category].cat.categories,
+        'labels': {col: df_fact[col].cat.categories for col in ['seller_city', 'seller_state', 'customer_city', 'customer_state']},
+        'seller_id': create_category_matrix(df_seller['seller_id'], df_seller[category], len(id_labels['seller_id'])),
+        'seller_city': create_category_matrix(df_seller['seller_city'], df_seller[category]),
+        'seller_state': create_category_matrix(df_seller['seller_state'], df_seller[category]),
+        'order_id': create_category_matrix(df_buyer['order_id'], df_buyer[category], len(id_labels['order_id'])),
+        'customer_city': create_category_matrix(df_buyer['customer_city'], df_buyer[category]),
+        'customer_state': create_category_matrix(df_buyer['customer_state'], df_buyer[category]),
+    }
 
-    rec = daily_transactions[daily_transactions['year_month_day'] >= daily_transactions['year_month_day'].max() - pd.Timedelta(days=period)][daily_transactions['year_month_day'] <= daily_transactions['year_month_day'].max()]['year_month_day']
+    return category_matrices
 
-    a = rec
-    b = rec.max()
+### Mendapatkan monthly_summary
+@traced
+def create_monthly_summary(start_date, end_date) -> pd.DataFrame:
 
-    rec_pivot_org = pd.merge(daily_transactions['order_id'], (b-a), left_index=True, right_index=True)
-    
-    return rec_pivot_org
+    """
+    Fungsi ini bertujuan untuk menghasilkan Data Frame monthly_summary
 
-### Mendapatkan freq_pivot_org
-@st.cache_data
-def create_freq_pivot_org(period: int, daily_transactions: pd.DataFrame) -> pd.DataFrame:
+    Parameters:
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
 
-    freq = daily_transactions[daily_transactions['year_month_day'] >= daily_transactions['year_month_day'].max() - pd.Timedelta(days=period)][daily_transactions['year_month_day'] <= daily_transactions['year_month_day'].max()]
-    freq_pivot_org = freq.groupby(by='order_id').agg({'order_item_id': 'count'}).sort_values(by='order_item_id', ascending=False)
+    Returns:
+        monthly_summary: Data Frame monthly_summary        
+    """
 
-    return freq_pivot_org
+    ## Jumlah payment_value per bulan dari cube
+    monthly_summary = create_monthly(start_date, end_date)[['payment_value']]
+    monthly_summary = monthly_summary.rename(columns={'payment_value': 'payment_value_sum'})
 
-### Mendapatkan monet_pivot_org
-@st.cache_data
-def create_monet_pivot_org(period: int, df_customer_merged: pd.DataFrame) -> pd.DataFrame:
+    monthly_summary = monthly_summary.drop(index=monthly_summary[monthly_summary.index == '2018-09'].index)
 
-    monet = df_customer_merged[df_customer_merged['order_purchase_timestamp'] >= df_customer_merged['order_purchase_timestamp'].max() - pd.Timedelta(days=period)][df_customer_merged['order_purchase_timestamp'] <= df_customer_merged['order_purchase_timestamp'].max()][['order_id', 'payment_value_sum','order_purchase_timestamp']].sort_values(by='order_purchase_timestamp', ascending=True)
-    
-    monet_pivot_org = monet[monet['order_purchase_timestamp'] >= monet['order_purchase_timestamp'].max() - pd.Timedelta(days=period)].groupby('order_id').agg({'payment_value_sum': 'sum'})
-    
-    return monet_pivot_org
+    return monthly_summary
+
+### Mendapatkan monthly_transactions
+@traced
+def create_monthly_transactions(start_date, end_date) -> pd.DataFrame:
+
+    ## Jumlah item per bulan (berdasarkan waktu pembelian) dari cube
+    monthly_transactions = create_monthly(start_date, end_date)[['item_count']]
+    monthly_transactions = monthly_transactions.drop(index=monthly_transactions[monthly_transactions.index == '2018-09'].index)
 
-### Mendapatkan df_rfm_clustering
-@st.cache_data
-def create_df_rfm_clustering(period:int, rec_pivot_org: pd.DataFrame, freq_pivot_org: pd.DataFrame, monet_pivot_org:pd.DataFrame) -> pd.DataFrame:
+    return monthly_transactions
 
-    period = period/30
+### Mendapatkan df_monthly_seller_state
+@traced
+def create_df_monthly_seller_state(state: str, start_date, end_date) -> pd.DataFrame:
 
-    df_rfm = pd.merge(rec_pivot_org, freq_pivot_org, on='order_id')
-    df_rfm = pd.merge(df_rfm, monet_pivot_org, on='order_id')
+    df_monthly_seller_state = create_monthly(start_date, end_date, where={'seller_state': state})[['price']]
+    df_monthly_seller_state = df_monthly_seller_state.drop(index=df_monthly_seller_state[df_monthly_seller_state.index == '2018-09'].index)
 
-    df_rfm['year_month_day'] = df_rfm['year_month_day'].astype('str')
+    return df_monthly_seller_state
 
-    df_rfm['year_month_day'] = df_rfm['year_month_day'].str.replace(r"[<*> Days]", "", regex=True)
+### Mendapatkan df_monthly_seller_city
+@traced
+def create_df_monthly_seller_city(city: str, start_date, end_date) -> pd.DataFrame:
 
-    df_rfm['year_month_day'] = pd.to_numeric(df_rfm['year_month_day'], errors='coerce').fillna(0).astype('int64')
+    df_monthly_seller_city = create_monthly(start_date, end_date, where={'seller_city': city})[['price']]
+    df_monthly_seller_city = df_monthly_seller_city.drop(index=df_monthly_seller_city[df_monthly_seller_city.index == '2018-09'].index)
 
-    df_rfm['score_freq'] = df_rfm['order_item_id'].apply(lambda x: 3 if x >= 3
-                                                        else (2 if x >= 2
-                                                                else (1 if x >= 0 else 0)))
+    return df_monthly_seller_city
 
-    df_rfm['score_rec'] = df_rfm['year_month_day'].apply(lambda x: 1 if x >= 26*period
-                                                        else (2 if x >= 20*period
-                                                                else (3 if x >= 0 else 0)))
+### Mendapatkan df_monthly_customer_state
+@traced
+def create_df_monthly_customer_state(state:str, start_date, end_date) -> pd.DataFrame:
 
-    m = df_rfm['payment_value_sum'].max()/3
-    df_rfm['score_monet'] = df_rfm['payment_value_sum'].apply(lambda x: 5 if x >= 1.75*(m)*period
-                                            else (4 if x >= 1.25*(m)*period
-                                                    else (3 if x >= 1*(m)*period
-                                                        else (2 if (1/2)*(m)*period
-                                                                else (1 if x >= 0 else 0)))))
+    df_monthly_customer_state = create_monthly(start_date, end_date, where={'customer_state': state})[['payment_value']]
+    df_monthly_customer_state = df_monthly_customer_state.drop(index=df_monthly_customer_state[df_monthly_customer_state.index == '2018-09'].index)
     
-    df_rfm.sort_values(by='order_item_id', ascending=False)
+    return df_monthly_customer_state
+
+### Mendapatkan df_monthly_customer_city
+@traced
+def create_df_monthly_customer_city(city:str, start_date, end_date) -> pd.DataFrame:
+
+    df_monthly_customer_city = create_monthly(start_date, end_date, where={'customer_city': city})[['payment_value']]
+    df_monthly_customer_city = df_monthly_customer_city.drop(index=df_monthly_customer_city[df_monthly_customer_city.index == '2018-09'].index)
     
-    df_rfm['klaster_rfm_score'] = df_rfm.apply(assign_klaster_rfm, axis=1)
-    df_rfm = df_rfm.sort_values(by='klaster_rfm_score', ascending=True)
+    return df_monthly_customer_city
 
-    df_rfm_clustering = df_rfm[['order_id', 'klaster_rfm_score']].drop_duplicates()
+### Mendapatkan rfm
+@traced_cache(st.cache_data)
+def create_rfm_analysis(df_fact: pd.DataFrame) -> dict:
 
-    return df_rfm_clustering
+    """
+    Fungsi ini bertujuan untuk menghasilkan analisis RFM untuk periode 30, 60, dan 90 hari sekaligus,
+    sehingga mengganti periode pada selectbox hanya berupa lookup.
+
+    Parameters:
+        df_fact (pandas DataFrame): Data Frame df_fact yang sudah difilter
+
+    Returns:
+        rfm (dict): hasil create_rfm
+    """
+
+    return create_rfm(df_fact, RFM_PERIODS)
 
 ### Mendapatkan df_brazil
-@st.cache_resource
+@traced_cache(st.cache_resource)
 def create_df_brazil() -> gpd.GeoDataFrame:
 
     """
@@ -500,26 +643,13 @@ def create_df_brazil() -> gpd.GeoDataFrame:
         brazil_df: GeoPandas Data Frame brazil_df
     """
 
-    # URL mentah file GeoJSON
-    url = "https://raw.githubusercontent.com/luizpedone/municipal-brazilian-geodata/refs/heads/master/data/Brasil.json"
-    
-    # Membaca file GeoJSON
-    _brazil_df = gpd.read_file(url)
-
-    # Konversi Latitude Longitude ke Meter
-    _brazil_df['geometry_crs'] = _brazil_df['geometry'].to_crs(epsg=3395)
-  
-    # Menghitung centroid untuk setiap geometris (polygon atau multipolygon)
-    _brazil_df['centroid_crs'] = _brazil_df.geometry_crs.centroid
-
-    # Konversi kembali ke awal
-    _brazil_df['centroid'] = _brazil_df['centroid_crs'].to_crs(epsg=4326)
-
-    _brazil_df = _brazil_df.sort_values(by='UF', ascending=True).reset_index(drop=True)
+    # Peta dan centroid sudah dihitung pada bundle lokal (python -m dashboard.geodata)
+    _brazil_df = load_brazil()
 
     return _brazil_df
 
 ### Mendapatkan df_cities
+@traced_cache(st.cache_resource)
 def create_df_cities(state: str) -> gpd.GeoDataFrame:
 
     """
@@ -534,22 +664,31 @@ def create_df_cities(state: str) -> gpd.GeoDataFrame:
         GeoPandas Data Frame df_cities       
     """
     
-    # URL mentah file GeoJSON
-    url = f"https://raw.githubusercontent.com/luizpedone/municipal-brazilian-geodata/refs/heads/master/data/{state}.json"
-    
-    # Membaca file GeoJSON
-    df_cities = gpd.read_file(url)
-    
-  # Menghapus aksen di kolom 'city'
-    df_cities['NOME'] = df_cities['NOME'].apply(remove_accents)
-    df_cities['NOME'] = df_cities['NOME'].apply(lambda x: x.lower())
-    
-    # Menampilkan lima baris pertama
-    df_cities = df_cities.sort_values(by="NOME")
+    # Nama kota sudah tanpa aksen dan huruf kecil pada bundle lokal
+    df_cities = load_cities(state)
 
     return df_cities
 
+### Mendapatkan zip_lookup
+@traced_cache(st.cache_resource)
+def load_zip_lookup() -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan lookup koordinat per zip prefix sekali per proses.
+    Cleaning koordinat (latitude <= -35 dan longitude RJ <= -45) serta state_code setiap poin
+    (spatial join dengan STRtree) sudah dihitung di dalamnya.
+
+    Returns:
+        zip_lookup (dict): hasil create_zip_lookup
+    """
+
+    if shared.SHARED_DATA_DIR:
+        return shared.open_zip_lookup(load_shared_dataset())
+
+    return create_zip_lookup(df_geolocation, create_df_brazil().geometry)
+
 ### Mendapatkan df_geo_point_cust
+@traced
 def create_df_geo_point_cust(df_customer_merged: pd.DataFrame) -> gpd.GeoDataFrame:
 
     """
@@ -562,19 +701,17 @@ def create_df_geo_point_cust(df_customer_merged: pd.DataFrame) -> gpd.GeoDataFra
         gpd.GeoDataFrame (df_geo_point_cust):
         GeoPandas Data Frame df_geo_point_cust       
     """
-  
-    df_customer_merged = df_customer_merged.rename(columns={'customer_zip_code_prefix':'geolocation_zip_code_prefix'})
-    df_customer_merged = pd.merge(df_customer_merged, df_geolocation[['geolocation_zip_code_prefix','geolocation_lat', 'geolocation_lng']], on='geolocation_zip_code_prefix', how='inner')
 
-    # Convert geolocation_lat dan geolocation_lng menjadi point
-    df_geo_point_cust = gpd.GeoDataFrame(df_customer_merged, geometry = gpd.points_from_xy(df_customer_merged.geolocation_lng, df_customer_merged.geolocation_lat))
+    # Koordinat, state_code dan poin diambil dari lookup zip prefix
+    mask, columns = lookup_zip(load_zip_lookup(), df_customer_merged['customer_zip_code_prefix'], valid='valid_customer')
 
-    # Cleaning dikit Rio de Janeiro state
-    df_geo_point_cust.drop(df_geo_point_cust[df_geo_point_cust['customer_state'] == 'RJ'][df_geo_point_cust['geolocation_lng'] <= -45].index, inplace = True)
+    df_geo_point_cust = df_customer_merged[mask].assign(**{col: values for col, values in columns.items() if col != 'geometry'})
+    df_geo_point_cust = gpd.GeoDataFrame(df_geo_point_cust, geometry=gpd.GeoSeries(columns['geometry'], index=df_geo_point_cust.index))
 
     return df_geo_point_cust
 
 ### Mendapatkan df_geo_point_sel
+@traced
 def create_df_geo_point_sel(df_sellers_merged: pd.DataFrame) -> gpd.GeoDataFrame:
 
     """
@@ -587,34 +724,34 @@ def create_df_geo_point_sel(df_sellers_merged: pd.DataFrame) -> gpd.GeoDataFrame
         gpd.GeoDataFrame (df_geo_point_sel):
         GeoPandas Data Frame df_geo_point_sel       
     """
-  
-    df_sellers_merged = df_sellers_merged.rename(columns={'seller_zip_code_prefix':'geolocation_zip_code_prefix'})
-    df_sellers_merged = pd.merge(df_sellers_merged, df_geolocation[['geolocation_zip_code_prefix','geolocation_lat', 'geolocation_lng']], on='geolocation_zip_code_prefix', how='inner')
 
-    # Convert geolocation_lat dan geolocation_lng menjadi point
-    df_geo_point_sel = gpd.GeoDataFrame(df_sellers_merged, geometry = gpd.points_from_xy(df_sellers_merged.geolocation_lng, df_sellers_merged.geolocation_lat))
+    # Koordinat, state_code dan poin diambil dari lookup zip prefix
+    mask, columns = lookup_zip(load_zip_lookup(), df_sellers_merged['seller_zip_code_prefix'])
+
+    df_geo_point_sel = df_sellers_merged[mask].assign(**{col: values for col, values in columns.items() if col != 'geometry'})
+    df_geo_point_sel = gpd.GeoDataFrame(df_geo_point_sel, geometry=gpd.GeoSeries(columns['geometry'], index=df_geo_point_sel.index))
 
     return df_geo_point_sel
 
 ### Mendapatkan prod_demand_counts
-def create_prod_demand_counts(df_geo_point_cust: pd.DataFrame) -> pd.Series:
+@traced
+def create_prod_demand_counts(df_geo_point_cust: pd.DataFrame, category_matrices: dict) -> pd.DataFrame:
 
-    all_prod = []
-    for li in df_geo_point_cust['product_category_name_<lambda>']:
-      for i in li:
-        all_prod.append(i)
-    
-    # Membuat Series dari list dan menghitung nilai
-    prod_demand_counts = pd.Series(all_prod).value_counts()
+    # Jumlah item per kategori dari order-order yang ada di peta
+    counts = category_totals(category_matrices['order_id'], df_geo_point_cust['order_id'].to_numpy())
 
-    prod_demand_counts = prod_demand_counts.apply(lambda x: str(x))
-    prod_demand_counts.index  = prod_demand_counts.index.str.replace('_', ' ').str.title()
-    prod_demand_counts['index+count'] = prod_demand_counts.index + ' (' + prod_demand_counts + ' Items)'
+    prod_demand_counts = pd.DataFrame({'index': category_matrices['categories'], 'count': counts})
+    prod_demand_counts = prod_demand_counts[prod_demand_counts['count'] > 0].sort_values(by='count', ascending=False, kind='stable')
+
+    prod_demand_counts['count'] = prod_demand_counts['count'].apply(lambda x: str(x))
+    prod_demand_counts['index']  = prod_demand_counts['index'].str.replace('_', ' ').str.title()
+    prod_demand_counts['index+count'] = prod_demand_counts['index'] + ' (' + prod_demand_counts['count'] + ' Items)'
 
     return prod_demand_counts
 
 ### Mendapatkan df_product_demand
-def create_df_product_demand(prod_cat_demand_select: str, df_geo_point_cust: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+@traced
+def create_df_product_demand(prod_cat_demand_select: str, df_geo_point_cust: gpd.GeoDataFrame, category_matrices: dict) -> gpd.GeoDataFrame:
 
     """
     Fungsi ini bertujuan untuk menghasilkan GeoPandas Data Frame df_product_demand yang berisi poin-poin (letak) product yang diinginkan di peta brazil.
@@ -622,6 +759,7 @@ def create_df_product_demand(prod_cat_demand_select: str, df_geo_point_cust: gpd
     Parameters:
         df_geo_point_cust (GeoPandas DataFrame): GeoPandas Data Frame df_geo_point_cust
         prod_cat_demand_select (str): Product yang dipilih
+        category_matrices (dict): matriks order x kategori dari create_category_matrices
 
     Returns:
         gpd.GeoDataFrame (df_product_demand):
@@ -631,31 +769,27 @@ def create_df_product_demand(prod_cat_demand_select: str, df_geo_point_cust: gpd
     prod_cat_demand_select = prod_cat_demand_select.split('(')[0].strip()
     prod_cat_demand_select = prod_cat_demand_select.lower().replace(" ", "_")
 
-    df_product_demand = df_geo_point_cust[df_geo_point_cust['product_category_name_<lambda>'].apply(lambda x: find_prod(prod_cat_demand_select, x)) == True]
+    mask = category_mask(category_matrices['order_id'],
+                         df_geo_point_cust['order_id'].to_numpy(),
+                         category_matrices['categories'].get_loc(prod_cat_demand_select))
+
+    df_product_demand = df_geo_point_cust[mask]
     
     return df_product_demand
 
-### Mendapatkan prod_demand_counts
-def create_prod_supply_counts(df_geo_point_sel: pd.DataFrame) -> pd.Series:
+### Mendapatkan prod_supply_counts
+@traced
+def create_prod_supply_counts(df_geo_point_sel: pd.DataFrame, category_matrices: dict) -> pd.DataFrame:
 
-    all_prod = []
-    for li in df_geo_point_sel['product_category_name_<lambda>']:
-      for i in li:
-        all_prod.append(i)
-    
-    # Membuat Series dari list dan menghitung nilai
-    prod_supply_counts = pd.Series(all_prod).value_counts()
-
-    ### Hitung banyaknya seller yang menjual setiap produk
-    list_0 = []
-    for i in prod_supply_counts.index:
-        list_0.append(df_geo_point_sel['seller_id'][
-            df_geo_point_sel['product_category_name_<lambda>'].apply(
-                lambda x: find_prod(i, x)) == True].count())
-    
-    data = {'index': prod_supply_counts.index, 'count': list_0}
+    seller_ids = df_geo_point_sel['seller_id'].to_numpy()
+
+    # Urutan kategori berdasarkan jumlah item, yang ditampilkan adalah jumlah seller yang menjual kategori tersebut
+    data = {'index': category_matrices['categories'],
+            'items': category_totals(category_matrices['seller_id'], seller_ids),
+            'count': category_entity_counts(category_matrices['seller_id'], seller_ids)}
 
     prod_supply_counts = pd.DataFrame(data)
+    prod_supply_counts = prod_supply_counts[prod_supply_counts['items'] > 0].sort_values(by='items', ascending=False, kind='stable')
 
     prod_supply_counts['count'] = prod_supply_counts['count'].apply(lambda x: str(x))
     prod_supply_counts['index']  = prod_supply_counts['index'].apply(lambda x: (x).replace('_', ' ').title())
@@ -665,7 +799,8 @@ def create_prod_supply_counts(df_geo_point_sel: pd.DataFrame) -> pd.Series:
     return prod_supply_counts
 
 ### Mendapatkan df_product_supply
-def create_df_product_supply(prod_cat_supply_select: str, df_geo_point_sel: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+@traced
+def create_df_product_supply(prod_cat_supply_select: str, df_geo_point_sel: gpd.GeoDataFrame, category_matrices: dict) -> gpd.GeoDataFrame:
 
     """
     Fungsi ini bertujuan untuk menghasilkan GeoPandas Data Frame df_product_supply yang berisi poin-poin (letak) product yang diinginkan di peta brazil.
@@ -673,6 +808,7 @@ def create_df_product_supply(prod_cat_supply_select: str, df_geo_point_sel: gpd.
     Parameters:
         df_geo_point_sel (GeoPandas DataFrame): GeoPandas Data Frame df_geo_point_sel
         prod_cat_supply_select (str): Index dari product yang dipilih
+        category_matrices (dict): matriks seller x kategori dari create_category_matrices
 
     Returns:
         gpd.GeoDataFrame (df_product_supply):
@@ -682,50 +818,56 @@ def create_df_product_supply(prod_cat_supply_select: str, df_geo_point_sel: gpd.
     prod_cat_supply_select = prod_cat_supply_select.split('(')[0].strip()
     prod_cat_supply_select = prod_cat_supply_select.lower().replace(" ", "_")
 
-    df_product_supply = df_geo_point_sel[df_geo_point_sel['product_category_name_<lambda>'].apply(lambda x: find_prod(prod_cat_supply_select, x)) == True]
+    mask = category_mask(category_matrices['seller_id'],
+                         df_geo_point_sel['seller_id'].to_numpy(),
+                         category_matrices['categories'].get_loc(prod_cat_supply_select))
+
+    df_product_supply = df_geo_point_sel[mask]
     
     return df_product_supply
 
 ### Mendapatkan df_sellers_state_merge
-@st.cache_data
-def create_df_sellers_state_merged(df_sellers_merged: pd.DataFrame) -> pd.DataFrame:
+@traced_cache(st.cache_data)
+def create_df_sellers_state_merged(start_date, end_date) -> pd.DataFrame:
+
+    # Total price per state dihitung dari cube, jumlah seller aktif 8 state teratas dari sketch per state
+    df_sellers_state_merged = create_totals(start_date, end_date, by='seller_state')
+    df_sellers_state_merged = df_sellers_state_merged[df_sellers_state_merged['item_count'] > 0][['price']].rename(columns={'price': 'price_sum'})
+    df_sellers_state_merged = df_sellers_state_merged.iloc[top_n(df_sellers_state_merged['price_sum'], 8)]
 
-    df_sellers_state_merged = df_sellers_merged.groupby(by='seller_state').agg({
-                                'price_sum': 'sum',
-                                'product_category_name_<lambda>': 'sum',
-                                'seller_id': 'count'
-                                }).sort_values(by = ('price_sum'), ascending = False).head(8)
+    seller_counts = create_active_counts('seller_id', start_date, end_date, by_state=True)
+    df_sellers_state_merged['seller_id'] = seller_counts.reindex(df_sellers_state_merged.index.astype(str)).to_numpy()
 
     df_sellers_state_merged.seller_id = df_sellers_state_merged.seller_id.apply(lambda x: str(x))
-    df_sellers_state_merged['index+id'] = df_sellers_state_merged.index + ' (' + df_sellers_state_merged.seller_id + ' Sellers)'
+    df_sellers_state_merged['index+id'] = df_sellers_state_merged.index.astype(str) + ' (' + df_sellers_state_merged.seller_id + ' Sellers)'
 
     return df_sellers_state_merged
 
 ### Mendapatkan df_sellers_city_merged
-@st.cache_data
-def create_df_sellers_city_merged(df_sellers_merged: pd.DataFrame) -> pd.DataFrame:
+@traced_cache(st.cache_data)
+def create_df_sellers_city_merged(start_date, end_date) -> pd.DataFrame:
 
     """
-    Fungsi ini bertujuan untuk menghasilkan 8 kota berpenghasilan terbesar beserta kategori barang yang terjual 
+    Fungsi ini bertujuan untuk menghasilkan 8 kota berpenghasilan terbesar
     yang disajikan ke Data Frame create_df_sellers_city_merged
 
     Parameters:
-        df_sellers_merged (pandas DataFrame): Data Frame df_sellers_merged
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
 
     Returns:
         df_sellers_city_merged: Data Frame df_sellers_city_merged
     """    
 
-    df_sellers_city_merged = df_sellers_merged.groupby(by='seller_city').agg({
-                                                    'price_sum': 'sum',
-                                                    'product_category_name_<lambda>': 'sum'
-                                                    }).sort_values(by = ('price_sum'), ascending = False).head(8)
+    df_sellers_city_merged = create_totals(start_date, end_date, by='seller_city')
+    df_sellers_city_merged = df_sellers_city_merged[df_sellers_city_merged['item_count'] > 0][['price']].rename(columns={'price': 'price_sum'})
+    df_sellers_city_merged = df_sellers_city_merged.iloc[top_n(df_sellers_city_merged['price_sum'], 8)]
     
     return df_sellers_city_merged
 
 ### Mendapatkan kategori barang yang banyak dijual di kota berpenghasilan tertinggi
-@st.cache_data
-def return_kategori_di_kota_jual(df_sellers_city_merged: pd.DataFrame) -> list:
+@traced
+def return_kategori_di_kota_jual(df_sellers_city_merged: pd.DataFrame, category_matrices: dict) -> list:
     
     """
     Fungsi ini bertujuan untuk menghasilkan 10 kategori yang terjual terbanyak di 8 kota berpenghasilan terbesar
@@ -735,6 +877,7 @@ def return_kategori_di_kota_jual(df_sellers_city_merged: pd.DataFrame) -> list:
     
     Parameters:
         df_sellers_city_merged (pandas Data Frame): Data Frame df_sellers_city_merged
+        category_matrices (dict): matriks kota seller x kategori dari create_category_matrices
 
     Returns:
         penjualan_kategoribarang_di_kota (list): 
@@ -742,54 +885,55 @@ def return_kategori_di_kota_jual(df_sellers_city_merged: pd.DataFrame) -> list:
     """
 
     penjualan_kategoribarang_di_kota = []
-    for i in range(8):
-        df_temp = pd.DataFrame(df_sellers_city_merged['product_category_name_<lambda>'].iloc[i],
-                            columns=['product_category_name_<lambda>']
-                            ).value_counts().head(10)
-        penjualan_kategoribarang_di_kota.append([df_sellers_city_merged.index[i],df_temp])
+    for city in df_sellers_city_merged.index[:8]:
+        df_temp = top_categories(category_matrices['seller_city'],
+                                 category_matrices['labels']['seller_city'].get_loc(city),
+                                 category_matrices['categories'],
+                                 n=10).to_frame()
+        penjualan_kategoribarang_di_kota.append([city, df_temp])
 
     return penjualan_kategoribarang_di_kota
 
 ### Mendapatkan df_customer_state_merge
-@st.cache_data
-def create_df_customer_state_merged(df_customer_merged: pd.DataFrame) -> pd.DataFrame:
+@traced_cache(st.cache_data)
+def create_df_customer_state_merged(start_date, end_date) -> pd.DataFrame:
 
-    df_customer_state_merged = df_customer_merged.groupby(by='customer_state').agg({
-                                'payment_value_sum': 'sum',
-                                'product_category_name_<lambda>': 'sum',
-                                'customer_id': 'count'
-                                }).sort_values(by = ('payment_value_sum'), ascending = False).head(8)
+    # Total payment dan jumlah order per state dihitung dari cube
+    df_customer_state_merged = create_totals(start_date, end_date, by='customer_state')
+    df_customer_state_merged = df_customer_state_merged[df_customer_state_merged['order_count'] > 0][['payment_value', 'order_count']]
+    df_customer_state_merged.columns = ['payment_value_sum', 'customer_id']
+    df_customer_state_merged = df_customer_state_merged.iloc[top_n(df_customer_state_merged['payment_value_sum'], 8)]
 
     df_customer_state_merged.customer_id = df_customer_state_merged.customer_id.apply(lambda x: str(x))
-    df_customer_state_merged['index+id'] = df_customer_state_merged.index + ' (' + df_customer_state_merged.customer_id + ' Customers)'
+    df_customer_state_merged['index+id'] = df_customer_state_merged.index.astype(str) + ' (' + df_customer_state_merged.customer_id + ' Customers)'
 
     return df_customer_state_merged
 
 ### Mendapatkan df_customer_city_merged
-@st.cache_data
-def create_df_customer_city_merged(df_customer_merged: pd.DataFrame) -> pd.DataFrame:
+@traced_cache(st.cache_data)
+def create_df_customer_city_merged(start_date, end_date) -> pd.DataFrame:
 
     """
-    Fungsi ini bertujuan untuk menghasilkan 8 kota berpengeluaran terbesar beserta kategori barang yang dibeli 
+    Fungsi ini bertujuan untuk menghasilkan 8 kota berpengeluaran terbesar
     yang disajikan ke Data Frame create_df_customer_city_merged
 
     Parameters:
-        df_customer_merged (pandas DataFrame): Data Frame df_customer_merged
+        start_date (date): tanggal awal filter
+        end_date (date): tanggal akhir filter
 
     Returns:
         df_customer_city_merged (pandas DataFrame): Data Frame df_customer_city_merged
     """    
 
-    df_customer_city_merged = df_customer_merged.groupby(by='customer_city').agg({
-                                                        'payment_value_sum': 'sum',
-                                                        'product_category_name_<lambda>': 'sum'
-                                                        }).sort_values(by = ('payment_value_sum'), ascending = False).head(8)
+    df_customer_city_merged = create_totals(start_date, end_date, by='customer_city')
+    df_customer_city_merged = df_customer_city_merged[df_customer_city_merged['order_count'] > 0][['payment_value']].rename(columns={'payment_value': 'payment_value_sum'})
+    df_customer_city_merged = df_customer_city_merged.iloc[top_n(df_customer_city_merged['payment_value_sum'], 8)]
     
     return df_customer_city_merged
 
 ### Mendapatkan kategori barang yang banyak dibeli di kota berpengeluaran tertinggi
-@st.cache_data
-def return_kategori_di_kota_beli(df_customer_city_merged: pd.DataFrame) -> list:
+@traced
+def return_kategori_di_kota_beli(df_customer_city_merged: pd.DataFrame, category_matrices: dict) -> list:
     
     """
     Fungsi ini bertujuan untuk menghasilkan 10 kategori yang dibeli terbanyak di 8 kota berpengeluaran terbesar
@@ -799,6 +943,7 @@ def return_kategori_di_kota_beli(df_customer_city_merged: pd.DataFrame) -> list:
     
     Parameters:
         df_customer_city_merged (pandas Data Frame): Data Frame df_customer_city_merged
+        category_matrices (dict): matriks kota customer x kategori dari create_category_matrices
 
     Returns:
         pemberlian_kategoribarang_di_kota (list): 
@@ -806,11 +951,12 @@ def return_kategori_di_kota_beli(df_customer_city_merged: pd.DataFrame) -> list:
     """
 
     pemberlian_kategoribarang_di_kota = []
-    for i in range(8):
-        df_temp = pd.DataFrame(df_customer_city_merged['product_category_name_<lambda>'].iloc[i],
-                            columns=['product_category_name_<lambda>']
-                            ).value_counts().head(10)
-        pemberlian_kategoribarang_di_kota.append([df_customer_city_merged.index[i],df_temp])
+    for city in df_customer_city_merged.index[:8]:
+        df_temp = top_categories(category_matrices['customer_city'],
+                                 category_matrices['labels']['customer_city'].get_loc(city),
+                                 category_matrices['categories'],
+                                 n=10).to_frame()
+        pemberlian_kategoribarang_di_kota.append([city, df_temp])
 
     return pemberlian_kategoribarang_di_kota
 
@@ -907,225 +1053,129 @@ def return_kategori_di_kota_beli(df_customer_city_merged: pd.DataFrame) -> list:
 
 
 #### GRAFIK
-##### GRAFIK LINE CHART
+##### CACHE DAN RENDER GRAFIK
 @st.cache_resource
-def create_line_chart(data_frame: pd.DataFrame, column_: str, title_: str, ylabel_: str):
-
-    ## Plotting
-    ax = data_frame[column_].plot(
-        kind='line',
-        figsize=(8, 3.5),
-        marker='o',
-        color= '#7e74f1',
-    )
-
-    plt.gca().spines[['top', 'right']].set_visible(False)
-    plt.title(title_, fontproperties=custom_font)
-    plt.ylabel(ylabel_, fontproperties=custom_font)
-    plt.xlabel('Month-Year', fontproperties=custom_font)
-    plt.tick_params(axis='y')
-    plt.tick_params(axis='x')
-
-    ## Menambahkan anotasi untuk setiap titik
-    for idx, value in enumerate(data_frame[column_]):
-        ax.annotate(
-            f'{value:.0f}',
-            xy=(idx, value),
-            xytext=(0, 5),
-            textcoords='offset points',
-            ha='center',
-            fontsize=8,
-        )
-
-    # Mengatur font pada tick labels
-    for label in ax.get_xmajorticklabels():
-        (label.set_fontproperties(custom_font))
-
-    for label in ax.get_xminorticklabels():
-        (label.set_fontproperties(custom_font))
+def load_chart_cache() -> ChartCache:
 
-    for label in ax.get_yticklabels():
-        label.set_fontproperties(custom_font)
+    # Batas memori cache grafik (MB) bisa diatur dengan environment variable CHART_CACHE_MB
+    return ChartCache(int(os.environ.get('CHART_CACHE_MB', CHART_CACHE_MB)) * 1024 * 1024)
 
-    plt.tight_layout()
-    return st.pyplot(plt, clear_figure=True)
-
-##### GRAFIK BAR CHART
 @st.cache_resource
-def create_bar_chart(data_frame: pd.DataFrame, 
-                     _index_:list, 
-                     xlabel_: str, 
-                     ylabel_: str, 
-                     title_: str, 
-                     column_: str, 
-                     colors: list,
-                     slicer=3):
-
-    fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(8, 3.5))
-    
+def load_chart_pool():
 
-    for i in _index_:
+    # Jumlah worker render grafik bisa diatur dengan environment variable CHART_WORKERS,
+    # 0 atau 1 berarti grafik dirender langsung di proses ini
+    workers = int(os.environ.get('CHART_WORKERS', min(4, os.cpu_count() or 1)))
 
-        if len(i) > slicer:
+    return charts.create_chart_pool(workers) if workers > 1 else None
 
-            _index_ = [j[:slicer]+'...' for j in _index_]
-            break
+## Grafik yang sedang dirender oleh worker pada rerun ini: (placeholder, key, name, args, kwargs, future).
+## Grafik rerun sebelumnya yang belum ditampilkan (rerun dihentikan karena filter berubah) dibatalkan
+## agar worker tidak merender grafik untuk state filter yang sudah tidak dilihat
+for chart in st.session_state.get('pending_charts', []):
+    chart[-1].cancel()
+pending_charts = st.session_state['pending_charts'] = []
 
-    sns.barplot(y=_index_,
-                x=data_frame[column_],
-                data=data_frame,
-                palette=colors,
-                ax=ax
-                )
-                
-    ax.set_xlabel(xlabel_, fontproperties=custom_font)
-    ax.set_ylabel(ylabel_, fontproperties=custom_font)
-    ax.set_title(title_, fontproperties=custom_font)
-    ax.tick_params(axis='y', )
-    ax.tick_params(axis='x', )
+def cached_chart(chart_function):
 
-        # Mengatur font pada tick labels
-    for label in ax.get_xmajorticklabels():
-        (label.set_fontproperties(custom_font))
-
-    for label in ax.get_xminorticklabels():
-        (label.set_fontproperties(custom_font))
-
-    for label in ax.get_yticklabels():
-        label.set_fontproperties(custom_font)
-
-    plt.gca().spines[['top', 'right']].set_visible(False)
-
-    plt.tight_layout()
-    return st.pyplot(plt)
-
-##### GRAFIK PIE CHART
-@st.cache_resource
-def create_pie_chart(df_rfm_clustering: pd.DataFrame, title_):
-
-    klaster = df_rfm_clustering['klaster_rfm_score'].unique()
-    count = (df_rfm_clustering[df_rfm_clustering['klaster_rfm_score'] == klaster[0]]['order_id'].count(),
-             df_rfm_clustering[df_rfm_clustering['klaster_rfm_score'] == klaster[1]]['order_id'].count(),
-             df_rfm_clustering[df_rfm_clustering['klaster_rfm_score'] == klaster[2]]['order_id'].count(),
-             )
-      
-    colors = ("#03DAC6", "#7e74f1", "#5d51e8")
-    explode = (0.07, 0.03, 0.05)
-
-    fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(8, 3.5))
-
-    ax.pie(
-        x=count,
-        labels=klaster,
-        autopct='%1.1f%%',
-        colors=colors,
-        explode=explode,
-        wedgeprops = {'width': 0.5},
-        textprops={'fontproperties': custom_font}
-        )
-
-    plt.title(title_, fontproperties=custom_font)
-    plt.tight_layout()
-
-    return st.pyplot(plt)
-
-##### GRAFIK PETA BRAZIL
-@st.cache_resource
-def create_map_brazil(column_, _brazil_df, _df_geo_point, colors_map, title_):
-
-    axis = _brazil_df.plot(color = 'white', edgecolor='black', figsize=(10, 15))
-    _df_geo_point.sort_values(by=column_, ascending=True).plot(ax = axis, column=column_,  cmap=ListedColormap(colors_map), markersize = 5, legend=True)
-
-    # Menambah label provinsi
-    for city, coords in zip(_brazil_df.UF, _brazil_df.centroid):
-        plt.text(coords.x, coords.y, city, fontsize=15, ha='center', color='black', fontproperties=custom_font)
-
-    # Menambahkan judul
-    plt.title(title_, fontsize=25,fontproperties=custom_font)
-
-    plt.tight_layout()
-
-    return st.pyplot(plt, clear_figure=True)
-
-##### GRAFIK PETA STATE CUSTOMER
-@st.cache_resource
-def create_map_state_customer(state_map_select, _brazil_df, _df_geo_point, colors_map):
-
-    df_cities =  create_df_cities(state_map_select)
-    color_ = colors_map[int(_brazil_df.sort_values(by='UF', ascending=True)[_brazil_df['UF'] == state_map_select]['UF'].index[0])]
-
-    # Filter, hanya poin-poin yang ada di state yang dipilih saja
-    # _df_geo_point = _df_geo_point[_df_geo_point.geometry.within(_brazil_df[_brazil_df['UF'] == state_map_select].geometry.iloc[0])]
-
-    # Plot map
-    axis = df_cities.plot(color = 'white', edgecolor = 'black', figsize = (10, 10))
-    _df_geo_point[_df_geo_point.geometry.within(_brazil_df[_brazil_df['UF'] == state_map_select].geometry.iloc[0])].plot(ax = axis, color = color_, markersize = 5)
-    
-    plt.title(f'{state_map_select} State Map', fontproperties=custom_font, fontsize=15)
-
-    plt.tight_layout()
+    """
+    Decorator untuk fungsi grafik pada dashboard.charts. Key grafik adalah fingerprint isi semua argumen.
+    Jika gambar sudah ada di load_chart_cache() gambar langsung ditampilkan dengan st.image, jika belum
+    grafik dikirim ke process pool dan tempatnya dipesan dengan st.empty(); gambar ditampilkan oleh
+    flush_charts() begitu selesai dirender. Tanpa pool grafik dirender langsung.
+    """
 
-    return st.pyplot(plt, clear_figure=True)
+    name = chart_function.__name__
 
-##### GRAFIK PETA STATE SELLER
-@st.cache_resource
-def create_map_state_seller(state_map_select, _brazil_df, _df_geo_point, colors_map):
+    @functools.wraps(chart_function)
+    def wrapper(*args, **kwargs):
 
-    df_cities =  create_df_cities(state_map_select)
-    color_ = colors_map[int(_brazil_df.sort_values(by='UF', ascending=True)[_brazil_df['UF'] == state_map_select]['UF'].index[0])]
+        chart_cache = load_chart_cache()
+        key = fingerprint(name, args, kwargs)
 
-    # Filter, hanya poin-poin yang ada di state yang dipilih saja
-    # _df_geo_point = _df_geo_point[_df_geo_point.geometry.within(_brazil_df[_brazil_df['UF'] == state_map_select].geometry.iloc[0])]
+        image = chart_cache.get(key)
+        if image is not None:
+            mark_cache('hit')
+            return st.image(image, width='stretch')
 
-    # Plot map
-    axis = df_cities.plot(color = 'white', edgecolor = 'black', figsize = (10, 10))
-    _df_geo_point[_df_geo_point.geometry.within(_brazil_df[_brazil_df['UF'] == state_map_select].geometry.iloc[0])].plot(ax = axis, color = color_, markersize = 5)
-    
-    plt.title(f'{state_map_select} State Map', fontproperties=custom_font, fontsize=15)
+        mark_cache('miss')
 
-    plt.tight_layout()
+        chart_pool = load_chart_pool()
+        future = None
+        if chart_pool is not None:
+            try:
+                future = chart_pool.submit(charts.render_chart, name, args, kwargs)
+            except BrokenProcessPool:
+                # Pool rusak dibuat ulang pada rerun berikutnya
+                load_chart_pool.clear()
 
-    return st.pyplot(plt, clear_figure=True)
+        if future is None:
+            image = charts.render_chart(name, args, kwargs)
+            chart_cache.put(key, image)
+            return st.image(image, width='stretch')
 
-##### GRAFIK PETA BRAZIL PRODUCT DEMAND
-@st.cache_resource
-def create_map_brazil_product_dem(column_, _brazil_df, prod_cat_demand_select, _df_geo_point_cust, colors_map, title_):
+        placeholder = st.empty()
+        pending_charts.append((placeholder, key, name, args, kwargs, future))
 
-    _df_geo_point = create_df_product_demand(prod_cat_demand_select, _df_geo_point_cust)
+        return placeholder
 
-    axis = _brazil_df.plot(color = 'white', edgecolor='black', figsize=(10, 15))
-    _df_geo_point.sort_values(by=column_, ascending=True).plot(ax = axis, column=column_,  cmap=ListedColormap(colors_map), markersize = 5, legend=True)
+    return traced(wrapper)
 
-    # Menambah label provinsi
-    for city, coords in zip(_brazil_df.UF, _brazil_df.centroid):
-        plt.text(coords.x, coords.y, city, fontsize=15, ha='center', color='black', fontproperties=custom_font)
+@traced
+def flush_charts():
 
-    # Menambahkan judul
-    plt.title(title_, fontsize=25,fontproperties=custom_font)
+    """
+    Fungsi ini bertujuan untuk menampilkan grafik dari worker sesuai urutan selesainya,
+    lalu menyimpannya di cache grafik. Jika worker mati, grafik dirender langsung di proses ini.
+    """
 
-    plt.tight_layout()
+    futures = {chart[-1]: chart[:-1] for chart in pending_charts}
 
-    return st.pyplot(plt, clear_figure=True)
+    for future in as_completed(futures):
+        placeholder, key, name, args, kwargs = futures[future]
+        try:
+            image = future.result()
+        except BrokenProcessPool:
+            image = charts.render_chart(name, args, kwargs)
 
-##### GRAFIK PETA BRAZIL PRODUCT SUPPLY
-@st.cache_resource
-def create_map_brazil_product_sup(column_, _brazil_df, prod_cat_supply_select, _df_geo_point_cust, colors_map, title_):
+        load_chart_cache().put(key, image)
+        placeholder.image(image, width='stretch')
 
-    _df_geo_point = create_df_product_supply(prod_cat_supply_select, _df_geo_point_cust)
+    pending_charts.clear()
 
-    axis = _brazil_df.plot(color = 'white', edgecolor='black', figsize=(10, 15))
-    _df_geo_point.sort_values(by=column_, ascending=True).plot(ax = axis, column=column_,  cmap=ListedColormap(colors_map), markersize = 5, legend=True)
+def browser_chart(spec_function):
 
-    # Menambah label provinsi
-    for city, coords in zip(_brazil_df.UF, _brazil_df.centroid):
-        plt.text(coords.x, coords.y, city, fontsize=15, ha='center', color='black', fontproperties=custom_font)
+    """
+    Decorator untuk fungsi spec pada dashboard.vegacharts. Grafik digambar di browser dengan
+    st.vega_lite_chart dari spec dan data hasil agregasi, tanpa render di server.
+    """
 
-    # Menambahkan judul
-    plt.title(title_, fontsize=25,fontproperties=custom_font)
+    @functools.wraps(spec_function)
+    def wrapper(*args, **kwargs):
+        return st.vega_lite_chart(spec=spec_function(*args, **kwargs), width='stretch', theme=None)
+
+    return traced(wrapper)
+
+## Backend line chart dan bar chart bisa diatur dengan environment variable CHART_BACKEND:
+## 'matplotlib' (PNG dari server) atau 'vega' (digambar di browser)
+if os.environ.get('CHART_BACKEND', 'matplotlib') == 'vega':
+    create_line_chart = browser_chart(vegacharts.line_chart_spec)
+    create_bar_chart = browser_chart(vegacharts.bar_chart_spec)
+else:
+    create_line_chart = cached_chart(charts.create_line_chart)
+    create_bar_chart = cached_chart(charts.create_bar_chart)
+create_box_chart = cached_chart(charts.create_box_chart)
+create_pie_chart = cached_chart(charts.create_pie_chart)
+create_map_brazil = cached_chart(charts.create_map_brazil)
+create_map_state = cached_chart(charts.create_map_state)
 
-    plt.tight_layout()
+##### GRAFIK PETA STATE CUSTOMER
+def create_map_state_customer(state_map_select, brazil_df, df_geo_point, colors_map):
+    return create_map_state(create_df_cities(state_map_select), state_map_select, brazil_df, df_geo_point, colors_map)
 
-    return st.pyplot(plt, clear_figure=True)
+##### GRAFIK PETA STATE SELLER
+def create_map_state_seller(state_map_select, brazil_df, df_geo_point, colors_map):
+    return create_map_state(create_df_cities(state_map_select), state_map_select, brazil_df, df_geo_point, colors_map)
 
 ## MEMBUAT FILTER
 min_date = df_order["order_purchase_timestamp"].min()
@@ -1151,13 +1201,19 @@ with st.sidebar:
         default_index=0,  # optional
     )
 
-    # Mengambil start_date & end_date dari date_input
-    start_date, end_date = st.date_input(
-        label='Time Interval',
-        min_value=min_date,
-        max_value=max_date,
-        value=[min_date, max_date]
-    )
+    # Mengambil start_date & end_date dari date_input. Tanggal dipilih di dalam form sehingga
+    # rerun baru terjadi saat tombol Apply ditekan, bukan pada setiap klik kalender
+    with st.form('filter_form', border=False):
+        date_value = st.date_input(
+            label='Time Interval',
+            min_value=min_date,
+            max_value=max_date,
+            value=[min_date, max_date]
+        )
+        st.form_submit_button('Apply', width='stretch')
+
+    # Hanya tanggal awal yang dipilih berarti rentang satu hari
+    start_date, end_date = date_range(date_value, min_date, max_date)
 
     col1, col2, col3 = st.columns(spec=[0.23,0.37,0.37])
 
@@ -1258,43 +1314,56 @@ with st.sidebar:
         )
 
 ### Filter diterapkan
-df_order_update = df_order[(df_order["order_purchase_timestamp"] >= str(start_date)) &
-                           (df_order["order_purchase_timestamp"] <= str(end_date))]
-                           
-df_order_items_update = df_order_items[(df_order_items["shipping_limit_date"] >= str(start_date)) &
-                                       (df_order_items["shipping_limit_date"] <= str(end_date))]
+annotate(page=selected, start_date=start_date, end_date=end_date)
+
+## Data turunan didaftarkan sebagai node DAG dan baru dihitung saat dibutuhkan halaman yang dibuka
+## (sekali per rerun), sehingga halaman ringan tidak menghitung pivot, poin peta, dan kategori halaman lain
+datasets = DatasetGraph(start_date=start_date, end_date=end_date)
+
+if QUERY_BACKEND == 'duckdb':
+
+    # Filter tanggal dan status dijalankan di dalam query, df_fact dan cube harian tidak dibuat
+    datasets.add(('pivot_seller', 'pivot_order'), query_pivot_seller_and_order, 'start_date', 'end_date')
+
+    datasets.add('category_matrices', query_category_matrices, 'start_date', 'end_date')
+
+    datasets.add('rfm', query_rfm_analysis, 'start_date', 'end_date')
+
+else:
+
+    # df_fact terurut berdasarkan order_purchase_timestamp, jadi cukup di-slice (binary search)
+    datasets.add('df_fact_update', lambda start_date, end_date: slice_date_range(load_df_fact(), "order_purchase_timestamp",
+                                                                                 start_date, end_date),
+                 'start_date', 'end_date')
+
+    ### Data yang telah difilter diterapkan untuk membuat beberapa data frame
+    datasets.add(('pivot_seller', 'pivot_order'), create_pivot_seller_and_order, 'df_fact_update')
+
+    datasets.add('category_matrices', create_category_matrices, 'df_fact_update')
 
-### Data yang telah difilter diterapkan untuk membuat beberapa data frame
-pivot_seller, pivot_order = create_pivot_seller_and_order(df_order_items_update,
-                                                          df_product,
-                                                          df_order_payments,
-                                                          df_order_update)
+    datasets.add('rfm', create_rfm_analysis, 'df_fact_update')
 
-df_sellers_merged, df_customer_merged = create_df_sellers_and_customer_merged(pivot_seller,
-                                                                              df_sellers,
-                                                                              pivot_order,
-                                                                              df_order_update,
-                                                                              df_customer)
+datasets.add(('df_sellers_merged', 'df_customer_merged'), create_df_sellers_and_customer_merged, 'pivot_seller', 'pivot_order')
 
-brazil_df =  create_df_brazil()
+datasets.add('brazil_df', create_df_brazil)
 
-df_geo_point_cust =  create_df_geo_point_cust(df_customer_merged)
+datasets.add('df_geo_point_cust', create_df_geo_point_cust, 'df_customer_merged')
 
-prod_demand_counts = create_prod_demand_counts(df_geo_point_cust)
+datasets.add('prod_demand_counts', create_prod_demand_counts, 'df_geo_point_cust', 'category_matrices')
 
-df_geo_point_sel =  create_df_geo_point_sel(df_sellers_merged)
+datasets.add('df_geo_point_sel', create_df_geo_point_sel, 'df_sellers_merged')
 
-df_sellers_state_merged = create_df_sellers_state_merged(df_sellers_merged)
+datasets.add('df_sellers_state_merged', create_df_sellers_state_merged, 'start_date', 'end_date')
 
-df_sellers_city_merged = create_df_sellers_city_merged(df_sellers_merged)
+datasets.add('df_sellers_city_merged', create_df_sellers_city_merged, 'start_date', 'end_date')
 
-penjualan_kategoribarang_di_kota = return_kategori_di_kota_jual(df_sellers_city_merged)
+datasets.add('df_customer_state_merged', create_df_customer_state_merged, 'start_date', 'end_date')
 
-df_customer_state_merged = create_df_customer_state_merged(df_customer_merged)
+datasets.add('df_customer_city_merged', create_df_customer_city_merged, 'start_date', 'end_date')
 
-df_customer_city_merged = create_df_customer_city_merged(df_customer_merged)
+datasets.add('penjualan_kategoribarang_di_kota', return_kategori_di_kota_jual, 'df_sellers_city_merged', 'category_matrices')
 
-pembelian_kategoribarang_di_kota = return_kategori_di_kota_jual(df_customer_city_merged)
+datasets.add('pembelian_kategoribarang_di_kota', return_kategori_di_kota_beli, 'df_customer_city_merged', 'category_matrices')
 
 # df_customer_klaster = create_klaster_customer(df_customer_merged)
 
@@ -1307,30 +1376,34 @@ pembelian_kategoribarang_di_kota = return_kategori_di_kota_jual(df_customer_city
 if selected == "OVERVIEW" or selected == "SHOW ALL":
     ## OVERVIEW
     st.html('<h4><span>OVERVIEW</span></h4>')
+
     col1, col2 = st.columns(spec=[0.4, 0.6])
 
+    # Total pada rentang tanggal dari cube (dua prefix sum)
+    overview_totals = create_totals(start_date, end_date)
+
     with col1:
 
         # Revenue
-        value_ = format_number(df_customer_merged['payment_value_sum'].sum())
+        value_ = format_number(overview_totals['payment_value'])
         st.metric(label=("Total Revenue"),
                 value=(f"{value_} BRL"),
                 border=True)
         
         # Transaksi
-        value_ = format_number(len(df_order_items_update[df_order_items_update['order_id'].isin(kelompok_seller)].index))
+        value_ = format_number(overview_totals['item_count'])
         st.metric(label="Total Transactions",
                 value=(f"{value_} Transactions"),
                 border=True)
         
         # Active Users
-        value_ = format_number(df_customer_merged['customer_id'].iloc[:-1].nunique())
+        value_ = format_number(create_active_counts('customer_id', start_date, end_date))
         st.metric(label="Active Users",
                 value=(f"{value_} Users"),
                 border=True)
         
         # Active Sellers
-        value_ = format_number(df_sellers_merged['seller_id'].nunique())
+        value_ = format_number(create_active_counts('seller_id', start_date, end_date))
         st.metric(label="Active Sellers",
                 value=(f"{value_} Sellers"),
                 border=True)
@@ -1338,22 +1411,52 @@ if selected == "OVERVIEW" or selected == "SHOW ALL":
     with col2:
 
         # Total Revenue Graphic
-        monthly_summary = create_monthly_summary(df_customer_merged)
+        monthly_summary = create_monthly_summary(start_date, end_date)
 
         create_line_chart(monthly_summary, 'payment_value_sum', 'Monthly Revenue Trend', 'Revenue (BRL)')
         
         plt.close('all')
 
         # Total Transaksi Graphic
-        monthly_transactions, daily_transactions = create_monthly_transactions(df_order_items_update)
+        monthly_transactions = create_monthly_transactions(start_date, end_date)
         
-        create_line_chart(monthly_transactions, 'seller_id', 'Monthly Transactions Trend', 'Transactions')
+        create_line_chart(monthly_transactions, 'item_count', 'Monthly Transactions Trend', 'Transactions')
         
         plt.close('all')
 
+    # Kuantil pada rentang tanggal dari sketch harian
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+
+        # Median Order Value
+        value_ = format_value(create_quantiles('order_value', start_date, end_date, (0.5,))[0.5])
+        st.metric(label="Median Order Value",
+                value=(f"{value_} BRL"),
+                border=True)
+
+    with col2:
+
+        # P90 Freight
+        value_ = format_value(create_quantiles('freight_value', start_date, end_date, (0.9,))[0.9])
+        st.metric(label="P90 Freight Value",
+                value=(f"{value_} BRL"),
+                border=True)
+
+    with col3:
+
+        # P95 Item Price
+        value_ = format_value(create_quantiles('price', start_date, end_date, (0.95,))[0.95])
+        st.metric(label="P95 Item Price",
+                value=(f"{value_} BRL"),
+                border=True)
+
 if selected == "SALES ANALYSIS" or selected == "SHOW ALL":
     ## Sales Analysis
     st.html('<h4><span>SALES </span>ANALYSIS</h4>')
+
+    df_sellers_state_merged, df_sellers_city_merged = datasets.get('df_sellers_state_merged', 'df_sellers_city_merged')
+
     col1, col2 = st.columns(2)
 
     with col1:
@@ -1383,12 +1486,10 @@ if selected == "SALES ANALYSIS" or selected == "SHOW ALL":
 
         plt.close('all')
 
-        df_0 = df_sellers_merged.groupby(by='seller_id').agg({
-                                                            'price_sum': 'sum'
-                                                            }).sort_values(by = ('price_sum'), ascending = False).head(5)
+        df_0 = create_df_top_entities('seller_id', start_date, end_date, n=5)
         
         create_bar_chart(df_0,
-                        df_0.index,
+                        decode_ids(df_0.index, 'seller_id', id_labels),
                         "Total Incomes (BRL)",
                         "Seller's ID",
                         "Top 5 Seller's Total Incomes",
@@ -1398,6 +1499,17 @@ if selected == "SALES ANALYSIS" or selected == "SHOW ALL":
         
         plt.close('all')
 
+        df_price_quantiles = create_quantiles('price', start_date, end_date, BOX_QUANTILES, by='seller_state')
+
+        create_box_chart(df_price_quantiles.loc[df_sellers_state_merged.head(5).index],
+                        BOX_QUANTILES,
+                        "Item Price (BRL, P5 - P95)",
+                        "State's Name",
+                        "Item Price Distribution in Top 5 Seller States"
+                        )
+
+        plt.close('all')
+
     with col2:
         
         col_1, col_2 = st.columns(spec=[0.5, 0.5])
@@ -1415,7 +1527,7 @@ if selected == "SALES ANALYSIS" or selected == "SHOW ALL":
                 label_visibility='collapsed'
             )
 
-        df_monthly_seller_state = create_df_monthly_seller_state(state, df_order_items_update, df_sellers, df_order)
+        df_monthly_seller_state = create_df_monthly_seller_state(state, start_date, end_date)
 
         create_line_chart(df_monthly_seller_state, 
                         'price', 
@@ -1440,7 +1552,7 @@ if selected == "SALES ANALYSIS" or selected == "SHOW ALL":
                 label_visibility='collapsed'
             ).lower()
 
-        df_monthly_seller_city = create_df_monthly_seller_city(city, df_order_items_update, df_sellers, df_order)
+        df_monthly_seller_city = create_df_monthly_seller_city(city, start_date, end_date)
 
         create_line_chart(df_monthly_seller_city, 
                         'price', 
@@ -1453,6 +1565,9 @@ if selected == "SALES ANALYSIS" or selected == "SHOW ALL":
 if selected == "CUSTOMER ANALYSIS" or selected == "SHOW ALL":
     ## Customer Analysis
     st.html('<h4><span>CUSTOMER </span>ANALYSIS</h4>')
+
+    df_customer_state_merged, df_customer_city_merged = datasets.get('df_customer_state_merged', 'df_customer_city_merged')
+
     col1, col2 = st.columns(2)
 
     with col1:
@@ -1487,12 +1602,10 @@ if selected == "CUSTOMER ANALYSIS" or selected == "SHOW ALL":
 
         plt.close('all')
         
-        df_0 = df_customer_merged.groupby(by='customer_id').agg({
-                                                            'payment_value_sum': 'sum'
-                                                            }).sort_values(by = ('payment_value_sum'), ascending = False).head(5)
+        df_0 = create_df_top_entities('customer_id', start_date, end_date, n=5)
 
         create_bar_chart(df_0,
-                        df_0.index,
+                        decode_ids(df_0.index, 'customer_id', id_labels),
                         "Total Expenses (BRL)",
                         "Customer's ID",
                         "Top 5 Total Expenses by All Customers in Each City",
@@ -1502,6 +1615,17 @@ if selected == "CUSTOMER ANALYSIS" or selected == "SHOW ALL":
 
         plt.close('all')
 
+        df_order_value_quantiles = create_quantiles('order_value', start_date, end_date, BOX_QUANTILES, by='customer_state')
+
+        create_box_chart(df_order_value_quantiles.loc[df_customer_state_merged.head(5).index],
+                        BOX_QUANTILES,
+                        "Order Value (BRL, P5 - P95)",
+                        "State's Name",
+                        "Order Value Distribution in Top 5 Customer States"
+                        )
+
+        plt.close('all')
+
     with col2:
 
         col_1, col_2 = st.columns(spec=[0.5, 0.5])
@@ -1518,7 +1642,7 @@ if selected == "CUSTOMER ANALYSIS" or selected == "SHOW ALL":
                 label_visibility='collapsed'
             )
 
-        df_monthly_customer_state = create_df_monthly_customer_state(state, df_order_update, df_order_payments, df_customer)
+        df_monthly_customer_state = create_df_monthly_customer_state(state, start_date, end_date)
         
         create_line_chart(df_monthly_customer_state, 
                         'payment_value', 
@@ -1543,7 +1667,7 @@ if selected == "CUSTOMER ANALYSIS" or selected == "SHOW ALL":
                 label_visibility='collapsed'
             ).lower()
 
-        df_monthly_customer_city = create_df_monthly_customer_city(city, df_order_update, df_order_payments, df_customer)
+        df_monthly_customer_city = create_df_monthly_customer_city(city, start_date, end_date)
         
         create_line_chart(df_monthly_customer_city, 
                         'payment_value', 
@@ -1559,36 +1683,32 @@ if selected == "RFM ANALYSIS" or selected == "SHOW ALL":
 
     col1, col2= st.columns(spec=[.4,0.6])
 
-    monthly_transactions, daily_transactions = create_monthly_transactions(df_order_items_update)
+    rfm = datasets.get('rfm')
 
     with col1:
-        st.html(f"<p><span>Select Period:</span> (Today: {daily_transactions['year_month_day'].max()})</p>")
+        st.html(f"<p><span>Select Period:</span> (Today: {rfm['today']})</p>")
 
     with col2:
         
-        period = int((st.selectbox(label=f"Select Period: (today: {daily_transactions['year_month_day'].max()})",
-                                    options=("30 days ago", "60 days ago", "90 days ago"),
+        period = int((st.selectbox(label=f"Select Period: (today: {rfm['today']})",
+                                    options=tuple(f"{p} days ago" for p in RFM_PERIODS),
                                     index=0,
                                     label_visibility='collapsed'))[:2])
 
+    rfm_period = rfm[period]
+
     col1, col2, col3 = st.columns(3)
 
     with col1:
 
-        rec_pivot_org = create_rec_pivot_org(period, daily_transactions)
-        
-        recency = int(str(rec_pivot_org['year_month_day'].sum())[1:-8])/rec_pivot_org['year_month_day'].count()
-        
-        value_ = math.floor(recency)
+        value_ = math.floor(rfm_period['recency'])
         st.metric(label=("Average Recency"),
                 value=(f"{value_} Days ago"),
                 border=True)
 
     with col2:
 
-        freq_pivot_org = create_freq_pivot_org(period, daily_transactions)
-
-        value_ = math.ceil(freq_pivot_org.sum()/freq_pivot_org.count())
+        value_ = math.ceil(rfm_period['frequency'])
 
         st.metric(label=("Average Frequency"),
                 value=(f"{value_} Transactions"),
@@ -1596,9 +1716,7 @@ if selected == "RFM ANALYSIS" or selected == "SHOW ALL":
 
     with col3:
 
-        monet_pivot_org = create_monet_pivot_org(period, df_customer_merged)
-
-        value_ = math.ceil(monet_pivot_org.sum()/monet_pivot_org.count())
+        value_ = math.ceil(rfm_period['monetary'])
 
         st.metric(label=("Average Frequency"),
                 value=(f"{value_} BRL"),
@@ -1608,7 +1726,7 @@ if selected == "RFM ANALYSIS" or selected == "SHOW ALL":
 
     with col1:
         
-        df_rfm_clustering = create_df_rfm_clustering(period, rec_pivot_org, freq_pivot_org, monet_pivot_org)
+        df_rfm_clustering = rfm_period['df_rfm']
 
         create_pie_chart(df_rfm_clustering, "Customer Priority Cluster")
 
@@ -1624,6 +1742,9 @@ if selected == "PRODUCT ANALYSIS" or selected == "SHOW ALL":
     ## PRODUCT Analysis
     st.html('<h4><span>PRODUCT </span>ANALYSIS</h4>')
 
+    penjualan_kategoribarang_di_kota, pembelian_kategoribarang_di_kota = datasets.get('penjualan_kategoribarang_di_kota',
+                                                                                      'pembelian_kategoribarang_di_kota')
+
     col1, col2 = st.columns(spec=[0.45, 0.55])
     
     with col1:
@@ -1663,17 +1784,15 @@ if selected == "PRODUCT ANALYSIS" or selected == "SHOW ALL":
 
     with col1:
         
-        for i in range (input_kota):
+        for i in range (min(input_kota, len(penjualan_kategoribarang_di_kota))):
 
-            fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(8, 3.5))    
-            
             penjualan_kategoribarang_di_kota[i][1] = penjualan_kategoribarang_di_kota[i][1].reset_index().sort_values(by = ('count'), ascending = False)
             penjualan_kategoribarang_di_kota[i][1] = penjualan_kategoribarang_di_kota[i][1].head(input_barang)
             
-            penjualan_kategoribarang_di_kota[i][1]['product_category_name_<lambda>'] = [i[:12]+'...' for i in penjualan_kategoribarang_di_kota[i][1]['product_category_name_<lambda>']]
+            penjualan_kategoribarang_di_kota[i][1]['product_category_name'] = [i[:12]+'...' for i in penjualan_kategoribarang_di_kota[i][1]['product_category_name']]
             
             create_bar_chart(penjualan_kategoribarang_di_kota[i][1],
-                            penjualan_kategoribarang_di_kota[i][1]['product_category_name_<lambda>'],
+                            penjualan_kategoribarang_di_kota[i][1]['product_category_name'],
                             "Total Sales of Product (Units)",
                             "Product Category",
                             "Top 10 Sales by Product Category in " + penjualan_kategoribarang_di_kota[i][0].title(),
@@ -1685,17 +1804,15 @@ if selected == "PRODUCT ANALYSIS" or selected == "SHOW ALL":
 
     with col2:
         
-        for i in range (input_kota):
+        for i in range (min(input_kota, len(pembelian_kategoribarang_di_kota))):
 
-            fig, ax = plt.subplots(nrows=1, ncols=1, figsize=(8, 3.5))    
-                
             pembelian_kategoribarang_di_kota[i][1] = pembelian_kategoribarang_di_kota[i][1].reset_index().sort_values(by = ('count'), ascending = False)
             pembelian_kategoribarang_di_kota[i][1] = pembelian_kategoribarang_di_kota[i][1].head(input_barang)
             
-            pembelian_kategoribarang_di_kota[i][1]['product_category_name_<lambda>'] = [i[:12]+'...' for i in pembelian_kategoribarang_di_kota[i][1]['product_category_name_<lambda>']]
+            pembelian_kategoribarang_di_kota[i][1]['product_category_name'] = [i[:12]+'...' for i in pembelian_kategoribarang_di_kota[i][1]['product_category_name']]
 
             create_bar_chart(pembelian_kategoribarang_di_kota[i][1],
-                            pembelian_kategoribarang_di_kota[i][1]['product_category_name_<lambda>'],
+                            pembelian_kategoribarang_di_kota[i][1]['product_category_name'],
                             "Total Purchases of Product (Units)",
                             "Product Category",
                             "Top 10 Purchases by Product Category in"+ " " + pembelian_kategoribarang_di_kota[i][0].title(),
@@ -1709,6 +1826,13 @@ if selected == "GEOSPATIAL ANALYSIS" or selected == "SHOW ALL":
     ## GEOSPATIAL Analysis
     st.html('<h4><span>GEOSPATIAL </span>ANALYSIS</h4>')
 
+    (brazil_df, df_geo_point_cust, prod_demand_counts, df_geo_point_sel,
+     df_customer_state_merged, df_sellers_state_merged, category_matrices) = datasets.get('brazil_df', 'df_geo_point_cust',
+                                                                                          'prod_demand_counts', 'df_geo_point_sel',
+                                                                                          'df_customer_state_merged',
+                                                                                          'df_sellers_state_merged',
+                                                                                          'category_matrices')
+
     col1, col2 = st.columns(2)
 
     with col1:
@@ -1739,7 +1863,7 @@ if selected == "GEOSPATIAL ANALYSIS" or selected == "SHOW ALL":
             index=0,
         )[:2]
 
-        create_map_state_customer(state_map_select_cust, brazil_df[['geometry', 'UF']], df_geo_point_cust['geometry'], colors_map_cust)
+        create_map_state_customer(state_map_select_cust, brazil_df[['geometry', 'UF']], df_geo_point_cust[['geometry', 'state_code']], colors_map_cust)
 
         plt.close('all')
 
@@ -1755,12 +1879,11 @@ if selected == "GEOSPATIAL ANALYSIS" or selected == "SHOW ALL":
             index=0,
         )
 
-        # df_product_demand = create_df_product_demand(prod_cat_demand_select, df_geo_point_cust)
+        df_product_demand = create_df_product_demand(prod_cat_demand_select, df_geo_point_cust, category_matrices)
 
-        create_map_brazil_product_dem('customer_state',
+        create_map_brazil('customer_state',
                                       brazil_df, 
-                                      prod_cat_demand_select, 
-                                      df_geo_point_cust, 
+                                      df_product_demand, 
                                       colors_map_cust,
                                       f"{prod_cat_demand_select} Demand in Brazil")
 
@@ -1794,7 +1917,7 @@ if selected == "GEOSPATIAL ANALYSIS" or selected == "SHOW ALL":
             index=0,
         )[:2]
 
-        create_map_state_seller(state_map_select_sel, brazil_df[['geometry', 'UF']], df_geo_point_sel['geometry'], colors_map_cust)
+        create_map_state_seller(state_map_select_sel, brazil_df[['geometry', 'UF']], df_geo_point_sel[['geometry', 'state_code']], colors_map_cust)
 
         plt.close('all')
 
@@ -1802,7 +1925,7 @@ if selected == "GEOSPATIAL ANALYSIS" or selected == "SHOW ALL":
 
         st.html('<h5>PRODUCT<span> SUPPLY </span>SECTION</h5>')
 
-        prod_supply_counts = create_prod_supply_counts(df_geo_point_sel)
+        prod_supply_counts = create_prod_supply_counts(df_geo_point_sel, category_matrices)
 
         # st.html("<p>Choose <span>Product Category</span>:</p>")
 
@@ -1812,10 +1935,11 @@ if selected == "GEOSPATIAL ANALYSIS" or selected == "SHOW ALL":
             index=0,
         )
 
-        create_map_brazil_product_sup('seller_state',
+        df_product_supply = create_df_product_supply(prod_cat_supply_select, df_geo_point_sel, category_matrices)
+
+        create_map_brazil('seller_state',
                                       brazil_df, 
-                                      prod_cat_supply_select, 
-                                      df_geo_point_sel, 
+                                      df_product_supply, 
                                       colors_map_cust,
                                       f"{prod_cat_supply_select} Supplier in Brazil")
 
@@ -1892,3 +2016,17 @@ if selected == "GEOSPATIAL ANALYSIS" or selected == "SHOW ALL":
 #     # plt.tight_layout()
 #     st.pyplot(fig)
 #     plt.close('all')
+
+## Menampilkan grafik yang dirender oleh worker
+flush_charts()
+
+## Panel debug instrumentasi (DASHBOARD_TRACE=1)
+trace_record = finish_rerun()
+
+if trace_record is not None:
+    with st.sidebar.expander('Debug: Rerun Trace'):
+        spans = trace_record['spans']
+        st.html(f"<p>Rerun <span>{trace_record['seconds']:.2f} s</span>, "
+                f"cache hit {sum(span['cache'] == 'hit' for span in spans)} / "
+                f"miss {sum(span['cache'] == 'miss' for span in spans)}</p>")
+        st.dataframe(summarize_spans(spans), width='stretch')
@@ -0,0 +1,6 @@
+"""
+Modul-modul pendukung E-Commerce Data Analysis Dashboard.
+
+Semua modul di dalam package ini tidak bergantung pada Streamlit sehingga bisa dipakai
+oleh dashboard-app.py maupun oleh script build di luar aplikasi.
+"""
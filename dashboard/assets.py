@@ -0,0 +1,68 @@
+"""
+Aset lokal dashboard (font dan ikon).
+
+Font Roboto dan ikon halaman disimpan di repository sehingga dashboard tidak perlu mengunduh
+apa pun saat berjalan. File di folder static/ disajikan oleh Streamlit pada URL app/static/
+(server.enableStaticServing) dan dipakai oleh @font-face pada CSS. Font untuk matplotlib
+didaftarkan sekali per proses melalui register_font.
+"""
+
+import os
+
+from matplotlib import font_manager
+from matplotlib import rcParams
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATIC_DIR = os.path.join(ROOT_DIR, 'static')
+STATIC_URL = 'app/static'
+
+FONT_FILE = 'Roboto-Medium.ttf'
+FONT_BOLD_FILE = 'Roboto-Bold.ttf'
+
+PAGE_ICON = os.path.join(ROOT_DIR, 'img_icon_.ico')
+
+### Mendaftarkan font ke matplotlib
+def register_font(font_file: str = FONT_FILE) -> font_manager.FontProperties:
+
+    """
+    Fungsi ini bertujuan untuk mendaftarkan font lokal ke matplotlib dan menjadikannya font default.
+
+    Parameters:
+        font_file (str): nama file font di folder static/
+
+    Returns:
+        custom_font (FontProperties): font yang dipakai pada grafik
+    """
+
+    font_path = os.path.join(STATIC_DIR, font_file)
+
+    font_manager.fontManager.addfont(font_path)
+    custom_font = font_manager.FontProperties(fname=font_path)
+
+    rcParams['font.family'] = custom_font.get_name()
+
+    return custom_font
+
+### CSS @font-face untuk font lokal
+def font_face_css(static_url: str = STATIC_URL) -> str:
+
+    medium = f"url('{static_url}/{FONT_FILE}') format(\"truetype\")"
+    bold = f"url('{static_url}/{FONT_BOLD_FILE}') format(\"truetype\")"
+
+    return f"""
+        @font-face {{
+        font-family: "Source Sans Pro";
+        src: {medium};
+        }}
+        @font-face {{
+        font-family: "Roboto";
+        src: {medium};
+        }}
+        @font-face {{
+        font-family: "Roboto";
+        font-weight: 700 900;
+        src: {bold};
+        }}
+        """
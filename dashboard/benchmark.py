@@ -0,0 +1,440 @@
+"""
+Benchmark fungsi-fungsi analitik dan render halaman dashboard pada data sintetis.
+
+Untuk setiap skala (kelipatan ukuran Olist) dataset sintetis dibuat sekali dengan dashboard.synthetic
+di data/bench/<skala>x/ lalu dikonversi ke Parquet. Benchmark lalu:
+- menjalankan fungsi-fungsi pada dashboard-app.py (read_csv, df_fact, cube, pivot, category matrix,
+  create_df_monthly_*, RFM, poin peta, leaderboard, kuantil) dan render setiap grafik, dengan urutan dan
+  argumen yang sama seperti script dashboard. Fungsi yang memakai st.cache_* dijalankan tanpa cache.
+  Run pertama dipakai untuk mengukur puncak alokasi memori (tracemalloc), run berikutnya untuk waktu.
+- merender halaman penuh untuk setiap pilihan Navigation Menu dengan AppTest, sekali dengan cache
+  kosong (cold) dan sekali lagi dengan cache terisi (warm), beserta RSS proses.
+
+Hasil ditampilkan sebagai tabel dan bisa disimpan ke JSON, lalu dibandingkan dengan hasil sebelumnya
+untuk menangkap regresi performa:
+
+    python -m dashboard.benchmark --scales 1 10 --output bench.json
+    python -m dashboard.benchmark --scales 1 --baseline bench.json
+"""
+
+import argparse
+import ast
+import contextlib
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+from matplotlib import colormaps
+from matplotlib.colors import to_hex
+
+from dashboard import sqlengine
+from dashboard.assets import ROOT_DIR
+from dashboard.charts import render_chart
+from dashboard.geodata import GEO_DIR, STATES
+from dashboard.quantile import BOX_QUANTILES
+from dashboard.store import DATA_DIR, TABLES, convert_csv_to_parquet, csv_path
+from dashboard.synthetic import generate_dataset
+
+
+APP_PATH = os.path.join(ROOT_DIR, 'dashboard-app.py')
+
+BENCH_DIR = os.path.join(ROOT_DIR, DATA_DIR, 'bench')
+
+## Batas rasio waktu terhadap baseline yang dianggap regresi
+REGRESSION_RATIO = 1.25
+
+## Warna bar chart (sama seperti dashboard) dan warna peta (satu warna per state)
+BAR_COLORS = ['#7e74f1'] + ['#F5F3FE'] * 4
+MAP_COLORS = [to_hex(colormaps['hsv'](i / len(STATES))) for i in range(len(STATES))]
+
+### Membaca fungsi-fungsi dashboard tanpa menjalankan halamannya
+def load_app_functions(app_path: str = APP_PATH) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk mengeksekusi hanya import dan definisi fungsi pada script dashboard.
+
+    Returns:
+        namespace (dict): namespace modul, variabel global (df_order, kelompok_seller, dll.)
+        diisi oleh benchmark sebelum fungsi yang memakainya dipanggil
+    """
+
+    with open(app_path, encoding='utf-8') as file:
+        tree = ast.parse(file.read(), filename=app_path)
+
+    body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+
+    namespace = {'__name__': 'dashboard_app', '__file__': app_path}
+    exec(compile(ast.Module(body=body, type_ignores=[]), app_path, 'exec'), namespace)
+
+    return namespace
+
+### Pilihan Navigation Menu pada script dashboard
+def navigation_options(app_path: str = APP_PATH) -> list:
+
+    with open(app_path, encoding='utf-8') as file:
+        tree = ast.parse(file.read(), filename=app_path)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'option_menu':
+            for keyword in node.keywords:
+                if keyword.arg == 'options':
+                    return ast.literal_eval(keyword.value)
+
+    return []
+
+### RSS maksimum proses (MB)
+def max_rss_mb() -> float:
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam KB di Linux dan byte di macOS
+    return rss / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+### Menjalankan dan mengukur satu fungsi
+class FunctionBench:
+
+    """
+    Pengukur waktu dan memori fungsi. Setiap pemanggilan menjalankan fungsi sekali dengan tracemalloc
+    (puncak alokasi) lalu repeat kali untuk waktu, dan mengembalikan hasil run terakhir.
+    """
+
+    def __init__(self, scale: float, repeat: int = 3):
+        self.scale = scale
+        self.repeat = repeat
+        self.results = []
+
+    def __call__(self, name: str, function, *args, **kwargs):
+
+        # Fungsi st.cache_* dijalankan tanpa cache
+        function = getattr(function, '__wrapped__', function)
+
+        tracemalloc.start()
+        result = function(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        seconds = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            seconds.append(time.perf_counter() - start)
+
+        self.results.append({
+            'scale': self.scale,
+            'kind': 'function',
+            'name': name,
+            'seconds': min(seconds),
+            'seconds_median': statistics.median(seconds),
+            'peak_mb': peak / 2**20,
+        })
+
+        return result
+
+### Membuat dataset sintetis satu skala
+def prepare_dataset(scale: float, bench_dir: str = BENCH_DIR, seed: int = 0) -> str:
+
+    """
+    Fungsi ini bertujuan untuk membuat (sekali) dataset sintetis skala scale beserta Parquet-nya.
+
+    Returns:
+        root (str): folder yang berisi data/, dipakai sebagai working directory dashboard
+    """
+
+    root = os.path.join(bench_dir, f'{scale:g}x')
+    data_dir = os.path.join(root, DATA_DIR)
+
+    if not all(os.path.exists(csv_path(name, data_dir)) for name in TABLES):
+        generate_dataset(data_dir, scale, seed)
+        convert_csv_to_parquet(data_dir, os.path.join(data_dir, 'parquet'))
+
+    # Bundle peta dipakai bersama
+    geo_dir = os.path.join(ROOT_DIR, GEO_DIR)
+    if os.path.isdir(geo_dir) and not os.path.exists(os.path.join(data_dir, 'geo')):
+        os.symlink(geo_dir, os.path.join(data_dir, 'geo'))
+
+    return root
+
+### Working directory sementara
+@contextlib.contextmanager
+def working_directory(path: str):
+
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+### Benchmark fungsi-fungsi analitik
+def bench_functions(scale: float, root: str, repeat: int = 3) -> list:
+
+    """
+    Fungsi ini bertujuan untuk mengukur setiap fungsi analitik dashboard dengan urutan dan argumen
+    yang sama seperti script dashboard pada rentang tanggal penuh.
+
+    Returns:
+        results (list): list dict hasil pengukuran
+    """
+
+    import streamlit as st
+
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    app = load_app_functions()
+    bench = FunctionBench(scale, repeat)
+
+    with working_directory(root):
+
+        ## Data dan tabel fakta
+        tables = bench('read_csv', app['read_csv'])
+        names = ('df_customer', 'df_order', 'df_order_items', 'df_order_payments',
+                 'df_product', 'df_sellers', 'df_geolocation', 'id_labels')
+        app.update(zip(names, tables))
+
+        kelompok = bench('load_kelompok_order', app['load_kelompok_order'])
+        app.update(zip(('kelompok_cancel_unav', 'kelompok_seller', 'kelompok_customer'), kelompok))
+
+        df_fact = bench('load_df_fact', app['load_df_fact'])
+        app['load_df_fact']()
+        bench('load_daily_cubes', app['load_daily_cubes'])
+        app['load_daily_cubes']()
+
+        start_date = app['df_order']['order_purchase_timestamp'].min().date()
+        end_date = app['df_order']['order_purchase_timestamp'].max().date()
+
+        df_fact_update = bench('slice_date_range', app['slice_date_range'],
+                               df_fact, 'order_purchase_timestamp', start_date, end_date)
+
+        ## Pivot dan matriks kategori
+        pivot_seller, pivot_order = bench('create_pivot_seller_and_order', app['create_pivot_seller_and_order'],
+                                          df_fact_update)
+        df_sellers_merged, df_customer_merged = bench('create_df_sellers_and_customer_merged',
+                                                      app['create_df_sellers_and_customer_merged'],
+                                                      pivot_seller, pivot_order)
+        category_matrices = bench('create_category_matrices', app['create_category_matrices'], df_fact_update)
+
+        ## Poin peta dan kategori per lokasi
+        brazil_df = bench('create_df_brazil', app['create_df_brazil'])
+        bench('load_zip_lookup', app['load_zip_lookup'])
+        app['load_zip_lookup']()
+
+        df_geo_point_cust = bench('create_df_geo_point_cust', app['create_df_geo_point_cust'], df_customer_merged)
+        df_geo_point_sel = bench('create_df_geo_point_sel', app['create_df_geo_point_sel'], df_sellers_merged)
+
+        prod_demand_counts = bench('create_prod_demand_counts', app['create_prod_demand_counts'],
+                                   df_geo_point_cust, category_matrices)
+        df_product_demand = bench('create_df_product_demand', app['create_df_product_demand'],
+                                  prod_demand_counts['index+count'].iloc[0], df_geo_point_cust, category_matrices)
+        prod_supply_counts = bench('create_prod_supply_counts', app['create_prod_supply_counts'],
+                                   df_geo_point_sel, category_matrices)
+        bench('create_df_product_supply', app['create_df_product_supply'],
+              prod_supply_counts['index+count'].iloc[0], df_geo_point_sel, category_matrices)
+
+        ## Leaderboard
+        app['QUERY_BACKEND'] = 'pandas'
+        bench('load_distinct_counters', app['load_distinct_counters'])
+        app['load_distinct_counters']()
+        bench('create_active_counts', app['create_active_counts'], 'customer_id', start_date, end_date)
+        df_sellers_state_merged = bench('create_df_sellers_state_merged', app['create_df_sellers_state_merged'],
+                                        start_date, end_date)
+        df_sellers_city_merged = bench('create_df_sellers_city_merged', app['create_df_sellers_city_merged'],
+                                       start_date, end_date)
+        bench('return_kategori_di_kota_jual', app['return_kategori_di_kota_jual'],
+              df_sellers_city_merged, category_matrices)
+        df_customer_state_merged = bench('create_df_customer_state_merged', app['create_df_customer_state_merged'],
+                                         start_date, end_date)
+        df_customer_city_merged = bench('create_df_customer_city_merged', app['create_df_customer_city_merged'],
+                                        start_date, end_date)
+        bench('return_kategori_di_kota_beli', app['return_kategori_di_kota_beli'],
+              df_customer_city_merged, category_matrices)
+
+        # Top-N seller dan customer dari leaderboard (jalur pandas)
+        bench('load_leaderboards', app['load_leaderboards'])
+        app['load_leaderboards']()
+        bench('create_df_top_entities (seller_id)', app['create_df_top_entities'], 'seller_id', start_date, end_date)
+        bench('create_df_top_entities (customer_id)', app['create_df_top_entities'], 'customer_id', start_date, end_date)
+
+        # Kuantil dari sketch harian (jalur pandas)
+        bench('load_quantile_sketches', app['load_quantile_sketches'])
+        app['load_quantile_sketches']()
+        bench('create_quantiles', app['create_quantiles'], 'order_value', start_date, end_date)
+        df_price_quantiles = bench('create_quantiles (seller_state)', app['create_quantiles'], 'price',
+                                   start_date, end_date, BOX_QUANTILES, 'seller_state')
+
+        ## Tren bulanan
+        monthly_summary = bench('create_monthly_summary', app['create_monthly_summary'], start_date, end_date)
+        bench('create_monthly_transactions', app['create_monthly_transactions'], start_date, end_date)
+        bench('create_df_monthly_seller_state', app['create_df_monthly_seller_state'],
+              df_sellers_state_merged.index[0], start_date, end_date)
+        bench('create_df_monthly_seller_city', app['create_df_monthly_seller_city'],
+              df_sellers_city_merged.index[0], start_date, end_date)
+        bench('create_df_monthly_customer_state', app['create_df_monthly_customer_state'],
+              df_customer_state_merged.index[0], start_date, end_date)
+        bench('create_df_monthly_customer_city', app['create_df_monthly_customer_city'],
+              df_customer_city_merged.index[0], start_date, end_date)
+
+        ## RFM
+        rfm = bench('create_rfm_analysis', app['create_rfm_analysis'], df_fact_update)
+
+        ## Backend DuckDB (QUERY_BACKEND=duckdb), jika terpasang
+        if sqlengine.duckdb is not None:
+            engine = bench('load_sql_engine', app['load_sql_engine'])
+            app['load_sql_engine']()
+
+            bench('query_pivot_seller_and_order', app['query_pivot_seller_and_order'], start_date, end_date)
+            bench('query_category_matrices', app['query_category_matrices'], start_date, end_date)
+            bench('query_totals_sql', app['query_totals_sql'], engine, start_date, end_date, 'customer_city')
+            bench('query_monthly_sql', app['query_monthly_sql'], engine, start_date, end_date)
+            bench('query_rfm_analysis', app['query_rfm_analysis'], start_date, end_date)
+            bench('query_top_sql', app['query_top_sql'], engine, start_date, end_date, 'customer_id')
+            bench('query_distinct_sql', app['query_distinct_sql'], engine, start_date, end_date, 'customer_id')
+            bench('query_quantiles_sql', app['query_quantiles_sql'], engine, start_date, end_date, 'price',
+                  BOX_QUANTILES, 'seller_state')
+
+        ## Render grafik
+        state = df_customer_state_merged.index[0]
+        bench('render line chart', render_chart, 'create_line_chart',
+              (monthly_summary, 'payment_value_sum', 'Monthly Revenue Trend', 'Revenue (BRL)'), {})
+        bench('render bar chart', render_chart, 'create_bar_chart',
+              (df_sellers_state_merged.head(5), df_sellers_state_merged.head(5).index, 'Total Incomes (Million BRL)',
+               "State's Name", 'Top 5 Total Incomes by All Sellers in Each State', 'price_sum', BAR_COLORS), {})
+        bench('render box chart', render_chart, 'create_box_chart',
+              (df_price_quantiles.loc[df_sellers_state_merged.head(5).index], BOX_QUANTILES,
+               'Item Price (BRL, P5 - P95)', "State's Name", 'Item Price Distribution in Top 5 Seller States'), {})
+        bench('render pie chart', render_chart, 'create_pie_chart',
+              (rfm[min(key for key in rfm if key != 'today')]['df_rfm'], 'Customer Priority Cluster'), {})
+        bench('render map brazil (customers)', render_chart, 'create_map_brazil',
+              ('customer_state', brazil_df, df_geo_point_cust, MAP_COLORS, 'Customers Location Distribution'), {})
+        bench('render map brazil (demand)', render_chart, 'create_map_brazil',
+              ('customer_state', brazil_df, df_product_demand, MAP_COLORS, 'Demand in Brazil'), {})
+        bench('render map state', render_chart, 'create_map_state',
+              (app['create_df_cities'](state), state, brazil_df[['geometry', 'UF']],
+               df_geo_point_cust[['geometry', 'state_code']], MAP_COLORS), {})
+
+    return bench.results
+
+### Benchmark render halaman penuh
+def bench_pages(scale: float, root: str, pages: list = None, timeout: float = 3600) -> list:
+
+    """
+    Fungsi ini bertujuan untuk merender script dashboard dengan AppTest untuk setiap pilihan
+    Navigation Menu, sekali dengan cache kosong (cold) dan sekali dengan cache terisi (warm).
+
+    Returns:
+        results (list): list dict hasil pengukuran
+    """
+
+    import streamlit as st
+    import streamlit_option_menu
+    from streamlit.testing.v1 import AppTest
+
+    option_menu = streamlit_option_menu.option_menu
+    results = []
+
+    with working_directory(root):
+        try:
+            for page in pages or navigation_options():
+
+                # option_menu adalah custom component, pilihan halaman diganti langsung
+                streamlit_option_menu.option_menu = lambda *args, page=page, **kwargs: page
+
+                st.cache_data.clear()
+                st.cache_resource.clear()
+
+                for cache in ('cold', 'warm'):
+                    app_test = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+                    start = time.perf_counter()
+                    app_test.run()
+                    seconds = time.perf_counter() - start
+
+                    results.append({
+                        'scale': scale,
+                        'kind': 'page',
+                        'name': f'{page} ({cache})',
+                        'seconds': seconds,
+                        'exceptions': len(app_test.exception),
+                        'rss_mb': max_rss_mb(),
+                    })
+        finally:
+            streamlit_option_menu.option_menu = option_menu
+
+    return results
+
+### Menampilkan hasil
+def format_results(results: list, baseline: list = None) -> str:
+
+    baseline = {(row['scale'], row['kind'], row['name']): row for row in baseline or []}
+    lines = [f"{'scale':>6}  {'name':<44} {'seconds':>9} {'memory MB':>10} {'vs base':>8}"]
+
+    for row in results:
+        memory = row.get('peak_mb', row.get('rss_mb'))
+        base = baseline.get((row['scale'], row['kind'], row['name']))
+        ratio = f"{row['seconds'] / base['seconds']:.2f}x" if base and base['seconds'] > 0 else ''
+        lines.append(f"{row['scale']:>5g}x  {row['name']:<44} {row['seconds']:>9.3f} {memory:>10.1f} {ratio:>8}")
+
+    return '\n'.join(lines)
+
+### Mencari regresi terhadap baseline
+def find_regressions(results: list, baseline: list, ratio: float = REGRESSION_RATIO) -> list:
+
+    """
+    Fungsi ini bertujuan untuk mencari pengukuran yang lebih lambat dari ratio kali baseline-nya.
+
+    Returns:
+        regressions (list): list (hasil, baseline)
+    """
+
+    baseline = {(row['scale'], row['kind'], row['name']): row for row in baseline}
+
+    regressions = []
+    for row in results:
+        base = baseline.get((row['scale'], row['kind'], row['name']))
+        if base and row['seconds'] > ratio * base['seconds']:
+            regressions.append((row, base))
+
+    return regressions
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark dashboard pada data sintetis berbentuk Olist.')
+    parser.add_argument('--scales', type=float, nargs='+', default=[1.0], help='kelipatan ukuran Olist, misalnya 1 10 100')
+    parser.add_argument('--repeat', type=int, default=3, help='jumlah run waktu setiap fungsi')
+    parser.add_argument('--pages', nargs='*', help='pilihan Navigation Menu yang dirender (default semua)')
+    parser.add_argument('--skip-functions', action='store_true', help='tidak menjalankan benchmark fungsi')
+    parser.add_argument('--skip-pages', action='store_true', help='tidak menjalankan benchmark halaman')
+    parser.add_argument('--bench-dir', default=BENCH_DIR, help='folder dataset sintetis')
+    parser.add_argument('--output', help='file JSON tujuan hasil')
+    parser.add_argument('--baseline', help='file JSON hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+
+    results = []
+    for scale in args.scales:
+        root = prepare_dataset(scale, args.bench_dir)
+
+        if not args.skip_functions:
+            results += bench_functions(scale, root, args.repeat)
+        if not args.skip_pages:
+            results += bench_pages(scale, root, args.pages)
+
+    print(format_results(results, baseline))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'python': sys.version, 'cpu_count': os.cpu_count(), 'results': results}, file, indent=2)
+
+    if baseline:
+        regressions = find_regressions(results, baseline)
+        for row, base in regressions:
+            print(f"REGRESSION {row['scale']:g}x {row['name']}: {base['seconds']:.3f}s -> {row['seconds']:.3f}s")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,99 @@
+"""
+Matriks jumlah entity x kategori product dalam bentuk sparse (scipy CSR).
+
+Menggantikan kolom tuple 'product_category_name_<lambda>'. Setiap baris matriks adalah satu entity
+(seller, order, kota, atau state) dan setiap kolom adalah satu kategori product, isinya jumlah item.
+Jumlah per kategori, top-N kategori, dan mask keanggotaan dihitung dengan operasi vektor pada matriks.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+
+### Mendapatkan kode integer dari sebuah kolom
+def entity_codes(column: pd.Series) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan kode baris matriks dari kolom entity.
+    Kolom categorical memakai kode kategorinya, kolom integer (ID hasil encode_ids) dipakai apa adanya.
+
+    Returns:
+        tuple(codes, n_rows)
+    """
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy().astype(np.int64), len(column.cat.categories)
+
+    codes = column.to_numpy().astype(np.int64)
+    return codes, int(codes.max()) + 1 if len(codes) else 0
+
+### Mendapatkan matriks entity x kategori
+def create_category_matrix(entity: pd.Series, category: pd.Series, n_rows: int = None) -> sp.csr_matrix:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan matriks sparse jumlah item per entity per kategori.
+
+    Parameters:
+        entity (pandas Series): kolom entity per item (categorical atau kode integer)
+        category (pandas Series): kolom product_category_name per item (categorical)
+        n_rows (int): jumlah baris matriks, default jumlah kategori / kode terbesar + 1
+
+    Returns:
+        scipy csr_matrix dengan shape (n_rows, jumlah kategori)
+    """
+
+    rows, n_entities = entity_codes(entity)
+    cols = category.cat.codes.to_numpy().astype(np.int64)
+    n_rows = n_entities if n_rows is None else n_rows
+
+    valid = (rows >= 0) & (cols >= 0)
+
+    # Duplikat (entity, kategori) otomatis dijumlahkan saat konversi ke CSR
+    return sp.coo_matrix((np.ones(valid.sum(), dtype=np.int64), (rows[valid], cols[valid])),
+                         shape=(n_rows, len(category.cat.categories))).tocsr()
+
+### Jumlah item per kategori pada sekumpulan entity
+def category_totals(matrix: sp.csr_matrix, rows: np.ndarray = None) -> np.ndarray:
+
+    if rows is not None:
+        matrix = matrix[rows]
+
+    return np.asarray(matrix.sum(axis=0)).ravel()
+
+### Jumlah entity yang memiliki setiap kategori
+def category_entity_counts(matrix: sp.csr_matrix, rows: np.ndarray = None) -> np.ndarray:
+
+    if rows is not None:
+        matrix = matrix[rows]
+
+    return np.bincount(matrix.indices, minlength=matrix.shape[1])
+
+### Mask entity yang memiliki kategori tertentu
+def category_mask(matrix: sp.csr_matrix, rows: np.ndarray, category_index: int) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan mask boolean: True jika entity pada rows memiliki
+    minimal satu item dengan kategori category_index.
+    """
+
+    column = matrix[:, category_index].toarray().ravel() > 0
+
+    return column[rows]
+
+### Top-N kategori pada satu entity
+def top_categories(matrix: sp.csr_matrix, row: int, categories: pd.Index, n: int = 10) -> pd.Series:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan n kategori dengan jumlah item terbanyak pada satu baris matriks.
+
+    Returns:
+        pandas Series 'count' yang diindeks oleh product_category_name, urut menurun
+    """
+
+    start, end = matrix.indptr[row], matrix.indptr[row + 1]
+    counts = pd.Series(matrix.data[start:end],
+                       index=pd.Index(categories[matrix.indices[start:end]], name='product_category_name'),
+                       name='count')
+
+    return counts.sort_values(ascending=False, kind='stable').head(n)
@@ -0,0 +1,136 @@
+"""
+Cache grafik yang sudah dirender (bytes PNG/SVG) dengan key berupa fingerprint isi data.
+
+Key dihitung dari isi argumen grafik (DataFrame, GeoDataFrame, array, list, dan nilai biasa),
+bukan dari identitas objek, sehingga data yang sama menghasilkan key yang sama dan data yang
+berbeda tidak pernah memakai gambar lama. Gambar disimpan dalam ChartCache yang membuang entri
+yang paling lama tidak dipakai (LRU) jika total ukurannya melebihi batas memori.
+"""
+
+import hashlib
+import io
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import shapely
+
+
+CHART_CACHE_MB = 256
+
+### Fingerprint isi argumen
+def _update_fingerprint(digest, obj) -> None:
+
+    if isinstance(obj, pd.DataFrame):
+        digest.update(b'DataFrame')
+        _update_fingerprint(digest, obj.index)
+        for col in obj.columns:
+            _update_fingerprint(digest, str(col))
+            _update_fingerprint(digest, obj[col])
+
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        digest.update(type(obj).__name__.encode() + str(obj.dtype).encode())
+        if str(obj.dtype) == 'geometry':
+            # Geometry di-hash dari koordinat dan tipe geometrinya
+            values = np.asarray(obj.values)
+            digest.update(shapely.get_type_id(values).tobytes())
+            digest.update(shapely.get_num_coordinates(values).tobytes())
+            digest.update(shapely.get_coordinates(values).tobytes())
+        else:
+            try:
+                digest.update(pd.util.hash_pandas_object(obj, index=False).to_numpy().tobytes())
+            except (TypeError, ValueError):
+                digest.update(pickle.dumps(list(obj)))
+
+    elif isinstance(obj, np.ndarray):
+        digest.update(str(obj.dtype).encode() + str(obj.shape).encode())
+        digest.update(obj.tobytes() if obj.dtype != object else pickle.dumps(obj.tolist()))
+
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f'{type(obj).__name__}{len(obj)}'.encode())
+        for item in obj:
+            _update_fingerprint(digest, item)
+
+    elif isinstance(obj, dict):
+        digest.update(f'dict{len(obj)}'.encode())
+        for key in sorted(obj, key=repr):
+            _update_fingerprint(digest, key)
+            _update_fingerprint(digest, obj[key])
+
+    else:
+        digest.update(f'{type(obj).__name__}:{obj!r}'.encode())
+
+def fingerprint(*args, **kwargs) -> str:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan fingerprint (hex) dari isi semua argumen.
+
+    Returns:
+        str: digest blake2b 32 byte
+    """
+
+    digest = hashlib.blake2b(digest_size=32)
+    _update_fingerprint(digest, args)
+    _update_fingerprint(digest, kwargs)
+
+    return digest.hexdigest()
+
+### Render figure matplotlib menjadi bytes
+def render_figure(fig, fmt: str = 'png', dpi: int = 200) -> bytes:
+
+    """
+    Fungsi ini bertujuan untuk menyimpan figure ke bytes dengan pengaturan yang sama seperti st.pyplot
+    (bbox_inches='tight', dpi=200).
+    """
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+
+    return buffer.getvalue()
+
+### Cache LRU bytes grafik
+class ChartCache:
+
+    """
+    Cache LRU {fingerprint: bytes gambar} dengan batas total ukuran max_bytes.
+    Aman dipakai bersamaan oleh beberapa session (thread) Streamlit.
+    """
+
+    def __init__(self, max_bytes: int = CHART_CACHE_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key: str, image: bytes) -> None:
+        with self._lock:
+            if key in self._entries:
+                self.n_bytes -= len(self._entries.pop(key))
+
+            # Gambar yang lebih besar dari batas tidak disimpan
+            if len(image) > self.max_bytes:
+                return
+
+            self._entries[key] = image
+            self.n_bytes += len(image)
+
+            while self.n_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.n_bytes -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
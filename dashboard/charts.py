@@ -0,0 +1,312 @@
+"""
+Fungsi-fungsi grafik dashboard dengan API object-oriented matplotlib (Figure + FigureCanvasAgg).
+
+Setiap fungsi membuat Figure sendiri tanpa memakai state global pyplot, sehingga grafik bisa
+dirender bersamaan di beberapa worker process (create_chart_pool + render_chart). Hasil render
+berupa bytes PNG yang ditampilkan dashboard dengan st.image.
+"""
+
+import functools
+import importlib.util
+import multiprocessing
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from dashboard.assets import register_font
+from dashboard.chartcache import render_figure
+from dashboard.maprender import plot_points
+
+
+### Font grafik, didaftarkan sekali per proses (termasuk di setiap worker)
+@functools.cache
+def chart_font():
+    return register_font()
+
+### Figure baru dengan canvas Agg
+def new_figure(figsize: tuple) -> Figure:
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+
+    return fig
+
+### Mengatur font tick labels
+def set_tick_font(ax, custom_font) -> None:
+
+    for label in ax.get_xmajorticklabels():
+        (label.set_fontproperties(custom_font))
+
+    for label in ax.get_xminorticklabels():
+        (label.set_fontproperties(custom_font))
+
+    for label in ax.get_yticklabels():
+        label.set_fontproperties(custom_font)
+
+##### GRAFIK LINE CHART
+def create_line_chart(data_frame, column_: str, title_: str, ylabel_: str) -> Figure:
+
+    custom_font = chart_font()
+    fig = new_figure((8, 3.5))
+    ax = fig.add_subplot()
+
+    ## Plotting
+    data_frame[column_].plot(
+        kind='line',
+        ax=ax,
+        marker='o',
+        color= '#7e74f1',
+    )
+
+    ax.spines[['top', 'right']].set_visible(False)
+    ax.set_title(title_, fontproperties=custom_font)
+    ax.set_ylabel(ylabel_, fontproperties=custom_font)
+    ax.set_xlabel('Month-Year', fontproperties=custom_font)
+
+    ## Menambahkan anotasi untuk setiap titik
+    for idx, value in enumerate(data_frame[column_]):
+        ax.annotate(
+            f'{value:.0f}',
+            xy=(idx, value),
+            xytext=(0, 5),
+            textcoords='offset points',
+            ha='center',
+            fontsize=8,
+        )
+
+    # Mengatur font pada tick labels
+    set_tick_font(ax, custom_font)
+
+    fig.tight_layout()
+    return fig
+
+##### GRAFIK BAR CHART
+def create_bar_chart(data_frame,
+                     index_: list,
+                     xlabel_: str,
+                     ylabel_: str,
+                     title_: str,
+                     column_: str,
+                     colors: list,
+                     slicer=3) -> Figure:
+
+    custom_font = chart_font()
+    fig = new_figure((8, 3.5))
+    ax = fig.add_subplot()
+
+    for i in index_:
+
+        if len(i) > slicer:
+
+            index_ = [j[:slicer]+'...' for j in index_]
+            break
+
+    sns.barplot(y=index_,
+                x=data_frame[column_],
+                data=data_frame,
+                palette=colors,
+                ax=ax
+                )
+
+    ax.set_xlabel(xlabel_, fontproperties=custom_font)
+    ax.set_ylabel(ylabel_, fontproperties=custom_font)
+    ax.set_title(title_, fontproperties=custom_font)
+
+    # Mengatur font pada tick labels
+    set_tick_font(ax, custom_font)
+
+    ax.spines[['top', 'right']].set_visible(False)
+
+    fig.tight_layout()
+    return fig
+
+##### GRAFIK BOX CHART
+def create_box_chart(data_frame, quantiles: tuple, xlabel_: str, ylabel_: str, title_: str) -> Figure:
+
+    # Box dari kuantil yang sudah dihitung (whisker, Q1, median, Q3, whisker), satu box per baris data_frame
+    custom_font = chart_font()
+    fig = new_figure((8, 3.5))
+    ax = fig.add_subplot()
+
+    whislo, q1, med, q3, whishi = quantiles
+    stats = [{'label': str(label), 'whislo': row[whislo], 'q1': row[q1], 'med': row[med], 'q3': row[q3],
+              'whishi': row[whishi], 'fliers': []}
+             for label, row in data_frame[list(quantiles)].iterrows()]
+
+    ax.bxp(stats[::-1], orientation='horizontal', widths=0.6, patch_artist=True,
+           boxprops={'facecolor': '#F5F3FE', 'edgecolor': '#7e74f1'},
+           medianprops={'color': '#7e74f1', 'linewidth': 2},
+           whiskerprops={'color': '#7e74f1'},
+           capprops={'color': '#7e74f1'})
+
+    ax.set_xlabel(xlabel_, fontproperties=custom_font)
+    ax.set_ylabel(ylabel_, fontproperties=custom_font)
+    ax.set_title(title_, fontproperties=custom_font)
+
+    # Mengatur font pada tick labels
+    set_tick_font(ax, custom_font)
+
+    ax.spines[['top', 'right']].set_visible(False)
+
+    fig.tight_layout()
+    return fig
+
+##### GRAFIK PIE CHART
+def create_pie_chart(df_rfm_clustering, title_) -> Figure:
+
+    custom_font = chart_font()
+
+    klaster_count = df_rfm_clustering['klaster_rfm_score'].value_counts().sort_index()
+    klaster = klaster_count.index
+    count = klaster_count.to_numpy()
+
+    colors = ("#03DAC6", "#7e74f1", "#5d51e8")[:len(klaster)]
+    explode = (0.07, 0.03, 0.05)[:len(klaster)]
+
+    fig = new_figure((8, 3.5))
+    ax = fig.add_subplot()
+
+    ax.pie(
+        x=count,
+        labels=klaster,
+        autopct='%1.1f%%',
+        colors=colors,
+        explode=explode,
+        wedgeprops = {'width': 0.5},
+        textprops={'fontproperties': custom_font}
+        )
+
+    ax.set_title(title_, fontproperties=custom_font)
+    fig.tight_layout()
+
+    return fig
+
+##### GRAFIK PETA BRAZIL
+def create_map_brazil(column_, brazil_df, df_geo_point, colors_map, title_) -> Figure:
+
+    custom_font = chart_font()
+    fig = new_figure((10, 15))
+    axis = fig.add_subplot()
+
+    brazil_df.plot(ax=axis, color = 'white', edgecolor='black')
+
+    # Per poin jika poin sedikit, raster kepadatan jika banyak
+    plot_points(axis, df_geo_point, column_, colors_map)
+
+    # Menambah label provinsi
+    for city, coords in zip(brazil_df['UF'], brazil_df['centroid']):
+        axis.text(coords.x, coords.y, city, fontsize=15, ha='center', color='black', fontproperties=custom_font)
+
+    # Menambahkan judul
+    axis.set_title(title_, fontsize=25,fontproperties=custom_font)
+
+    fig.tight_layout()
+
+    return fig
+
+##### GRAFIK PETA STATE
+def create_map_state(df_cities, state_map_select, brazil_df, df_geo_point, colors_map) -> Figure:
+
+    custom_font = chart_font()
+
+    state_code = int(np.flatnonzero(brazil_df['UF'].to_numpy() == state_map_select)[0])
+    color_ = colors_map[state_code]
+
+    # Filter, hanya poin-poin yang ada di state yang dipilih saja (state_code dari lookup zip prefix)
+    df_geo_point = df_geo_point[df_geo_point['state_code'].to_numpy() == state_code]
+
+    # Plot map
+    fig = new_figure((10, 10))
+    axis = fig.add_subplot()
+
+    df_cities.plot(ax=axis, color = 'white', edgecolor = 'black')
+    # GeoPandas gagal memplot GeoDataFrame kosong dengan markersize
+    if len(df_geo_point):
+        df_geo_point.plot(ax = axis, color = color_, markersize = 5)
+
+    axis.set_title(f'{state_map_select} State Map', fontproperties=custom_font, fontsize=15)
+
+    fig.tight_layout()
+
+    return fig
+
+### Daftar grafik yang bisa dirender oleh worker
+CHARTS = {chart.__name__: chart for chart in (create_line_chart,
+                                               create_bar_chart,
+                                               create_box_chart,
+                                               create_pie_chart,
+                                               create_map_brazil,
+                                               create_map_state)}
+
+### Render grafik menjadi bytes PNG
+def render_chart(name: str, args: tuple, kwargs: dict) -> bytes:
+
+    """
+    Fungsi ini bertujuan untuk membuat grafik CHARTS[name] lalu merendernya menjadi bytes PNG.
+    Dipanggil langsung atau di dalam worker process.
+    """
+
+    return render_figure(CHARTS[name](*args, **kwargs))
+
+### Process pool untuk render grafik
+## Pembuatan pool (penukaran sys.modules['__main__']) hanya dilakukan satu thread pada satu waktu
+_POOL_LOCK = threading.Lock()
+
+## Jumlah percobaan membuat pool jika rerun lain mengganti __main__ saat worker dibuat
+POOL_ATTEMPTS = 3
+
+def create_chart_pool(workers: int) -> ProcessPoolExecutor:
+
+    """
+    Fungsi ini bertujuan untuk membuat process pool render grafik. Worker dibuat dengan metode spawn
+    (aman untuk server Streamlit yang multi-thread) dan mendaftarkan font saat mulai.
+
+    Spawn menyiapkan modul __main__ worker dari sys.modules['__main__'] proses ini, yang oleh
+    Streamlit diisi modul script dashboard pada awal setiap rerun. Karena itu semua worker dibuat
+    sekarang juga dengan __main__ sementara yang __spec__-nya menunjuk ke dashboard.charts, sehingga
+    worker hanya meng-import modul ini dan tidak menjalankan script dashboard.
+
+    Asumsi threading: fungsi ini boleh dipanggil dari thread session mana pun (lewat st.cache_resource),
+    pembuatan pool diserialkan dengan _POOL_LOCK. Thread ScriptRunner session lain tetap bisa mengganti
+    sys.modules['__main__'] kapan saja tanpa lock. Jika hal itu terjadi selama worker dibuat, pool
+    tersebut dibuang dan dibuat ulang, dan __main__ milik session lain tidak dikembalikan ke nilai lama.
+
+    Parameters:
+        workers (int): jumlah worker process
+
+    Returns:
+        ProcessPoolExecutor, atau None jika pool gagal dibuat (grafik dirender langsung)
+    """
+
+    with _POOL_LOCK:
+        for _ in range(POOL_ATTEMPTS):
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=chart_font)
+
+            main_module = sys.modules['__main__']
+            temp_module = types.ModuleType('__main__')
+            temp_module.__spec__ = importlib.util.find_spec(__name__)
+            sys.modules['__main__'] = temp_module
+            try:
+                # Setiap submit saat belum ada worker yang idle membuat satu worker baru
+                for _ in range(workers):
+                    pool.submit(chart_font)
+            finally:
+                # Masih modul sementara berarti tidak ada rerun yang mengganti __main__ selama worker dibuat
+                replaced = sys.modules['__main__'] is not temp_module
+                if not replaced:
+                    sys.modules['__main__'] = main_module
+
+            if not replaced:
+                return pool
+
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return None
@@ -0,0 +1,252 @@
+"""
+Cube harian yang sudah diagregasi (hari x seller state x seller city x customer state x customer city x kategori).
+
+Setiap sel (kombinasi dimensi) menyimpan nilai harian price, freight_value, item_count, payment_value
+dan order_count. Entri (sel, hari) diurutkan dengan key = sel * n_days + hari lalu disimpan sebagai
+jumlah kumulatif (prefix sum). Total untuk rentang [start_date, end_date] setiap sel didapat dari selisih
+dua prefix sum yang dicari dengan searchsorted, sehingga waktu query tidak bergantung pada jumlah
+order item, hanya pada jumlah sel.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+CUBE_DIMS = ('seller_state', 'seller_city', 'customer_state', 'customer_city', 'product_category_name')
+
+## Rollup yang dipakai dashboard, () untuk total keseluruhan
+CUBE_ROLLUPS = ((), ('seller_state',), ('seller_city',), ('customer_state',), ('customer_city',))
+
+CUBE_MEASURES = ('price', 'freight_value', 'item_count', 'payment_value', 'order_count')
+
+COUNT_MEASURES = ('item_count', 'order_count')
+
+### Mendapatkan kode sel dari kombinasi dimensi
+def factorize_cells(data_frame: pd.DataFrame, dims: tuple) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk memberi kode sel pada setiap baris berdasarkan kombinasi nilai dims.
+    Nilai kosong (NaN) tetap menjadi sel tersendiri.
+
+    Parameters:
+        data_frame (pandas DataFrame): Data Frame yang memuat kolom-kolom dims
+        dims (tuple): nama kolom dimensi
+
+    Returns:
+        tuple(cell, cells):
+        numpy array kode sel per baris dan Data Frame cells (satu baris per sel, kolom categorical)
+    """
+
+    if not dims:
+        return np.zeros(len(data_frame), dtype=np.int64), pd.DataFrame(index=pd.RangeIndex(1))
+
+    columns = [data_frame[d] if isinstance(data_frame[d].dtype, pd.CategoricalDtype) else data_frame[d].astype('category')
+               for d in dims]
+
+    codes = [col.cat.codes.to_numpy().astype(np.int64) + 1 for col in columns]
+    shape = [len(col.cat.categories) + 1 for col in columns]
+
+    unique_cells, cell = np.unique(np.ravel_multi_index(codes, shape), return_inverse=True)
+
+    cells = pd.DataFrame({
+        d: pd.Categorical.from_codes(c - 1, categories=col.cat.categories)
+        for d, col, c in zip(dims, columns, np.unravel_index(unique_cells, shape))
+    })
+
+    return cell, cells
+
+### Menyusun prefix sum dari entri (sel, hari)
+def build_daily_cube(cell: np.ndarray, day: np.ndarray, values: pd.DataFrame,
+                     cells: pd.DataFrame, day0: pd.Timestamp, n_days: int) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk mengagregasi entri (sel, hari) lalu menyimpannya sebagai prefix sum.
+
+    Returns:
+        daily_cube (dict): dict berisi dims, cells, key, cumsum, day0, dan n_days
+    """
+
+    key = cell.astype(np.int64) * n_days + day.astype(np.int64)
+    agg = values.groupby(key).sum()
+
+    cumsum = np.zeros((len(agg) + 1, len(CUBE_MEASURES)))
+    cumsum[1:] = agg[list(CUBE_MEASURES)].to_numpy(dtype=np.float64).cumsum(axis=0)
+
+    return {
+        'dims': tuple(cells.columns),
+        'cells': cells,
+        'key': agg.index.to_numpy(dtype=np.int64),
+        'cumsum': cumsum,
+        'day0': day0,
+        'n_days': n_days,
+    }
+
+### Mendapatkan daily_cube
+def create_daily_cube(df_fact: pd.DataFrame, dims: tuple = CUBE_DIMS) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan cube harian dari df_fact.
+
+    price, freight_value dan item_count dihitung dari baris kelompok_seller, sedangkan payment_value
+    dan order_count dari baris kelompok_customer. Satu order dihitung sekali (pada item pertamanya).
+
+    Parameters:
+        df_fact (pandas DataFrame): Data Frame df_fact
+        dims (tuple): kolom dimensi cube
+
+    Returns:
+        daily_cube (dict): cube harian
+    """
+
+    df_temp = df_fact[df_fact['kelompok_seller'] | df_fact['kelompok_customer']]
+
+    day0 = df_fact['order_purchase_timestamp'].min().normalize()
+    day = ((df_temp['order_purchase_timestamp'] - day0) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    n_days = int(day.max()) + 1 if len(day) else 1
+
+    seller = df_temp['kelompok_seller'].to_numpy()
+    customer = df_temp['kelompok_customer'].to_numpy()
+
+    values = pd.DataFrame({
+        'price': np.where(seller, df_temp['price'], 0.0),
+        'freight_value': np.where(seller, df_temp['freight_value'], 0.0),
+        'item_count': seller.astype(np.int64),
+        'payment_value': np.where(customer, df_temp['payment_value'], 0.0),
+        'order_count': (customer & ~df_temp['order_id'].duplicated().to_numpy()).astype(np.int64),
+    })
+
+    cell, cells = factorize_cells(df_temp, tuple(dims))
+
+    return build_daily_cube(cell, day, values, cells, day0, n_days)
+
+### Mendapatkan cube dengan dimensi yang lebih sedikit
+def rollup_daily_cube(daily_cube: dict, dims: tuple) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan cube baru yang hanya memakai sebagian dimensi (dims)
+    dari daily_cube, tanpa perlu membaca df_fact lagi.
+
+    Parameters:
+        daily_cube (dict): cube hasil create_daily_cube
+        dims (tuple): subset dari dimensi daily_cube
+
+    Returns:
+        daily_cube (dict): cube hasil rollup
+    """
+
+    n_days = daily_cube['n_days']
+    values = pd.DataFrame(np.diff(daily_cube['cumsum'], axis=0), columns=list(CUBE_MEASURES))
+
+    old_cell = daily_cube['key'] // n_days
+    day = daily_cube['key'] % n_days
+
+    new_cell_of_old, cells = factorize_cells(daily_cube['cells'], tuple(dims))
+
+    return build_daily_cube(new_cell_of_old[old_cell], day, values, cells, daily_cube['day0'], n_days)
+
+### Mengubah tanggal menjadi indeks hari pada cube
+def day_index(daily_cube: dict, date) -> int:
+
+    day = (pd.Timestamp(date).normalize() - daily_cube['day0']) // pd.Timedelta(days=1)
+
+    return int(np.clip(day, 0, daily_cube['n_days']))
+
+### Prefix sum per sel sebelum hari tertentu
+def prefix_sums(daily_cube: dict, cell_ids: np.ndarray, days: np.ndarray) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan jumlah setiap measure untuk hari < days pada setiap sel.
+
+    Parameters:
+        daily_cube (dict): cube harian
+        cell_ids (numpy array): kode sel, shape (n,)
+        days (numpy array): indeks hari batas (eksklusif), shape (k,)
+
+    Returns:
+        numpy array dengan shape (n, k, jumlah measure)
+    """
+
+    query = (cell_ids[:, None] * daily_cube['n_days'] + days[None, :]).ravel()
+    position = np.searchsorted(daily_cube['key'], query, side='left')
+
+    return daily_cube['cumsum'][position].reshape(len(cell_ids), len(days), -1)
+
+### Memilih sel berdasarkan filter dimensi
+def select_cells(daily_cube: dict, where: dict = None) -> np.ndarray:
+
+    mask = np.ones(len(daily_cube['cells']), dtype=bool)
+    for dim, value in (where or {}).items():
+        mask &= (daily_cube['cells'][dim] == value).to_numpy()
+
+    return np.flatnonzero(mask)
+
+### Mengubah array measure menjadi Data Frame
+def to_measure_frame(values: np.ndarray, index=None) -> pd.DataFrame:
+
+    data_frame = pd.DataFrame(values, columns=list(CUBE_MEASURES), index=index)
+    for col in COUNT_MEASURES:
+        data_frame[col] = data_frame[col].round().astype(np.int64)
+
+    return data_frame
+
+### Total pada rentang tanggal
+def query_totals(daily_cube: dict, start_date, end_date, by=None, where: dict = None):
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan total setiap measure pada rentang [start_date, end_date]
+    (kedua tanggal inklusif), dengan dua prefix sum per sel.
+
+    Parameters:
+        daily_cube (dict): cube harian
+        start_date (date): tanggal awal
+        end_date (date): tanggal akhir
+        by (str/list): dimensi pengelompokan, None untuk total keseluruhan
+        where (dict): filter {dimensi: nilai}
+
+    Returns:
+        pandas Series (jika by None) atau pandas DataFrame yang diindeks oleh by
+    """
+
+    cell_ids = select_cells(daily_cube, where)
+    days = np.array([day_index(daily_cube, start_date), day_index(daily_cube, end_date) + 1])
+    days = np.minimum(days, daily_cube['n_days'])
+
+    prefix = prefix_sums(daily_cube, cell_ids, days)
+    values = prefix[:, 1, :] - prefix[:, 0, :]
+
+    if by is None:
+        totals = to_measure_frame(values.sum(axis=0, keepdims=True))
+        return pd.Series({col: totals[col].iloc[0] for col in totals.columns}, dtype=object)
+
+    by = [by] if isinstance(by, str) else list(by)
+    cells = daily_cube['cells'].iloc[cell_ids].reset_index(drop=True)
+
+    return to_measure_frame(values).groupby([cells[d] for d in by], observed=True).sum()
+
+### Deret bulanan pada rentang tanggal
+def query_monthly(daily_cube: dict, start_date, end_date, where: dict = None) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan total setiap measure per bulan pada rentang [start_date, end_date].
+    Bulan pertama dan terakhir hanya dihitung sebagian sesuai rentang tanggal.
+
+    Parameters:
+        daily_cube (dict): cube harian
+        start_date (date): tanggal awal
+        end_date (date): tanggal akhir
+        where (dict): filter {dimensi: nilai}
+
+    Returns:
+        pandas DataFrame yang diindeks oleh year_month (Period bulanan)
+    """
+
+    months = pd.period_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq='M', name='year_month')
+
+    boundaries = [day_index(daily_cube, start_date)]
+    boundaries += [day_index(daily_cube, month.start_time) for month in months[1:]]
+    boundaries += [day_index(daily_cube, end_date) + 1]
+    boundaries = np.minimum(np.array(boundaries), daily_cube['n_days'])
+
+    prefix = prefix_sums(daily_cube, select_cells(daily_cube, where), boundaries).sum(axis=0)
+
+    return to_measure_frame(np.diff(prefix, axis=0), index=months)
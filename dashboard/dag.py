@@ -0,0 +1,82 @@
+"""
+Graf dependensi (DAG) data turunan dashboard yang dievaluasi secara lazy.
+
+Setiap data turunan (pivot, data frame merged, poin peta, ...) didaftarkan sebagai node: nama output,
+fungsi, dan nama input. Input adalah node lain atau parameter graf (rentang tanggal dan filter
+lainnya). Halaman dashboard hanya meminta node yang ditampilkannya, node beserta input-inputnya
+dihitung saat pertama kali diminta lalu disimpan, sehingga halaman ringan tidak menghitung data
+halaman lain dan "SHOW ALL" tetap menghitung setiap node sekali.
+
+Satu graf dibuat per rerun untuk satu state filter. Antar-rerun, fungsi node yang memakai
+st.cache_data / st.cache_resource tetap di-cache berdasarkan inputnya.
+"""
+
+
+### Graf data turunan
+class DatasetGraph:
+
+    """
+    Kumpulan node data turunan dengan parameter yang sama (misalnya start_date dan end_date).
+
+    Contoh:
+        datasets = DatasetGraph(start_date=start_date, end_date=end_date)
+        datasets.add('df_fact_update', slice_fact, 'start_date', 'end_date')
+        datasets.add(('pivot_seller', 'pivot_order'), create_pivot_seller_and_order, 'df_fact_update')
+        pivot_seller, pivot_order = datasets.get('pivot_seller', 'pivot_order')
+    """
+
+    def __init__(self, **params):
+        self.params = params
+        self.nodes = {}
+        self.values = {}
+        self.running = set()
+
+    def add(self, outputs, function, *inputs) -> None:
+
+        """
+        Mendaftarkan node: function(*nilai inputs) menghasilkan outputs. outputs berupa satu nama,
+        atau tuple nama jika function mengembalikan tuple dengan urutan yang sama.
+        """
+
+        outputs = (outputs,) if isinstance(outputs, str) else tuple(outputs)
+
+        for name in outputs:
+            if name in self.params or name in self.nodes:
+                raise ValueError(f'node {name!r} sudah terdaftar')
+            self.nodes[name] = (outputs, function, inputs)
+
+    def __getitem__(self, name: str):
+
+        if name in self.params:
+            return self.params[name]
+
+        if name not in self.values:
+            if name not in self.nodes:
+                raise KeyError(f'node {name!r} tidak terdaftar')
+
+            outputs, function, inputs = self.nodes[name]
+            if name in self.running:
+                raise ValueError(f'dependensi melingkar pada node {name!r}')
+
+            self.running.add(name)
+            try:
+                result = function(*(self[input_] for input_ in inputs))
+            finally:
+                self.running.discard(name)
+
+            self.values.update(zip(outputs, result) if len(outputs) > 1 else {name: result})
+
+        return self.values[name]
+
+    def get(self, *names):
+
+        """
+        Mengambil nilai node-node names (dihitung jika belum ada).
+
+        Returns:
+            nilai node jika hanya satu nama, selain itu tuple nilai sesuai urutan names
+        """
+
+        values = tuple(self[name] for name in names)
+
+        return values[0] if len(values) == 1 else values
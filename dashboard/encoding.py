@@ -0,0 +1,67 @@
+"""
+Encoding kolom ID (hex 32 karakter) menjadi kode integer (int32) yang padat.
+
+Setiap ID dipetakan ke kode yang sama di semua tabel tempat ID tersebut muncul sehingga
+merge, groupby, dan filter isin berjalan di atas integer. Array label (kebalikan dari kode)
+hanya dipakai saat ID perlu ditampilkan, misalnya pada grafik Top 5 Seller.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+### Kolom ID beserta tabel-tabel (indeks pada tuple read_csv) yang memuatnya
+# Urutan tabel: df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation
+ID_COLUMNS = {
+    'order_id': (1, 2, 3),
+    'customer_id': (0, 1),
+    'seller_id': (2, 5),
+    'product_id': (2, 4),
+}
+
+### Encode kolom ID
+def encode_ids(tables: tuple) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk mengganti kolom-kolom ID pada ID_COLUMNS dengan kode int32.
+
+    Parameters:
+        tables (tuple): tuple Data Frame dengan urutan yang sama seperti read_csv()
+
+    Returns:
+        tuple(tables, id_labels):
+        tuple Data Frame yang kolom ID-nya sudah berupa int32 dan dict id_labels
+        {nama kolom: numpy array label} sehingga id_labels[col][kode] menghasilkan ID aslinya
+    """
+
+    tables = list(tables)
+    id_labels = {}
+
+    for col, positions in ID_COLUMNS.items():
+
+        labels = pd.Index(pd.unique(pd.concat([tables[i][col] for i in positions], ignore_index=True)))
+
+        for i in positions:
+            tables[i] = tables[i].copy()
+            tables[i][col] = labels.get_indexer(tables[i][col]).astype(np.int32)
+
+        id_labels[col] = labels.to_numpy()
+
+    return tuple(tables), id_labels
+
+### Decode kode menjadi ID asli
+def decode_ids(codes, col: str, id_labels: dict) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk mengembalikan kode int32 menjadi ID aslinya (untuk ditampilkan).
+
+    Parameters:
+        codes (array-like): kode int32
+        col (str): nama kolom ID, misalnya 'seller_id'
+        id_labels (dict): dict hasil encode_ids
+
+    Returns:
+        numpy array berisi ID asli
+    """
+
+    return id_labels[col][np.asarray(codes, dtype=np.int64)]
@@ -0,0 +1,135 @@
+"""
+Tabel fakta order-item yang sudah di-join (denormalized).
+
+Satu baris per item order yang sudah membawa kategori product, lokasi seller, lokasi customer,
+waktu pembelian, status order, dan payment yang dialokasikan ke item tersebut. Tabel ini dibuat
+sekali per proses sehingga filter tanggal dan semua pivot cukup berupa slice dan groupby.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+### Status order untuk setiap kelompok order_id
+STATUS_CANCEL_UNAV = ('canceled', 'unavailable')
+STATUS_SELLER = ('delivered', 'invoiced', 'shipped', 'processing', 'created', 'approved')
+STATUS_CUSTOMER = ('delivered', 'shipped', 'invoiced', 'processing', 'created', 'approved')
+
+### Mendapatkan kelompok order_id berdasarkan status
+def create_kelompok_order(df_order: pd.DataFrame) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan kelompok order_id (cancel/unavailable, seller, customer)
+    berdasarkan order_status. Urutan order_id mengikuti urutan status pada konstanta STATUS_*.
+
+    Parameters:
+        df_order (pandas DataFrame): Data Frame df_order
+
+    Returns:
+        tuple(kelompok_cancel_unav, kelompok_seller, kelompok_customer): pandas Series order_id
+    """
+
+    def kelompok(statuses):
+        return pd.concat([df_order[df_order['order_status'] == status]['order_id'] for status in statuses])
+
+    return kelompok(STATUS_CANCEL_UNAV), kelompok(STATUS_SELLER), kelompok(STATUS_CUSTOMER)
+
+### Mengalokasikan payment order ke setiap item
+def allocate_payment(df_order_items: pd.DataFrame, df_order_payments: pd.DataFrame) -> pd.Series:
+
+    """
+    Fungsi ini bertujuan untuk membagi total payment setiap order ke item-itemnya secara proporsional
+    terhadap price + freight_value item. Jumlah alokasi per order sama dengan total payment order tersebut.
+
+    Parameters:
+        df_order_items (pandas DataFrame): Data Frame df_order_items
+        df_order_payments (pandas DataFrame): Data Frame df_order_payments
+
+    Returns:
+        payment_value (pandas Series): payment per item (NaN jika order tidak punya data payment)
+    """
+
+    item_value = df_order_items['price'] + df_order_items['freight_value']
+    order_value = item_value.groupby(df_order_items['order_id']).transform('sum')
+    item_count = item_value.groupby(df_order_items['order_id']).transform('count')
+
+    # Jika nilai order 0, payment dibagi rata
+    share = np.where(order_value > 0, item_value / order_value.where(order_value > 0, 1), 1 / item_count)
+
+    order_payment = df_order_payments.groupby(by='order_id')['payment_value'].sum()
+
+    return df_order_items['order_id'].map(order_payment) * share
+
+### Mendapatkan df_fact
+def create_df_fact(df_customer: pd.DataFrame,
+                   df_order: pd.DataFrame,
+                   df_order_items: pd.DataFrame,
+                   df_order_payments: pd.DataFrame,
+                   df_product: pd.DataFrame,
+                   df_sellers: pd.DataFrame,
+                   kelompok_seller: pd.Series,
+                   kelompok_customer: pd.Series) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan Data Frame df_fact, yaitu tabel order-item yang sudah di-join
+    dengan product, sellers, order, customer, dan payment.
+
+    Parameters:
+        df_customer (pandas DataFrame): Data Frame df_customer
+        df_order (pandas DataFrame): Data Frame df_order
+        df_order_items (pandas DataFrame): Data Frame df_order_items
+        df_order_payments (pandas DataFrame): Data Frame df_order_payments
+        df_product (pandas DataFrame): Data Frame df_product
+        df_sellers (pandas DataFrame): Data Frame df_sellers
+        kelompok_seller (pandas Series): order_id yang dihitung sebagai transaksi seller
+        kelompok_customer (pandas Series): order_id yang dihitung sebagai transaksi customer
+
+    Returns:
+        df_fact (pandas DataFrame): Data Frame df_fact
+    """
+
+    df_fact = df_order_items.copy()
+    df_fact['payment_value'] = allocate_payment(df_order_items, df_order_payments)
+
+    df_fact = pd.merge(df_fact, df_product, on='product_id', how='inner')
+    df_fact = pd.merge(df_fact, df_sellers, on='seller_id', how='left')
+    df_fact = pd.merge(df_fact,
+                       df_order[['order_id', 'customer_id', 'order_status', 'order_purchase_timestamp']],
+                       on='order_id', how='inner')
+    df_fact = pd.merge(df_fact,
+                       df_customer[['customer_id', 'customer_zip_code_prefix', 'customer_city', 'customer_state']],
+                       on='customer_id', how='left')
+
+    # Kelompok order_id disimpan sebagai kolom boolean agar tidak perlu isin setiap rerun
+    df_fact['kelompok_seller'] = df_fact['order_id'].isin(kelompok_seller)
+    df_fact['kelompok_customer'] = df_fact['order_id'].isin(kelompok_customer) & df_fact['payment_value'].notna()
+
+    # Diurutkan berdasarkan waktu pembelian agar bisa di-slice dengan slice_date_range
+    df_fact = df_fact.sort_values(by='order_purchase_timestamp', kind='stable').reset_index(drop=True)
+
+    return df_fact
+
+### Slice rentang tanggal dengan binary search
+def slice_date_range(data_frame: pd.DataFrame, column: str, start_date, end_date) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk mengambil baris pada tanggal start_date sampai end_date (seluruh hari end_date
+    ikut dihitung) dari Data Frame yang sudah terurut berdasarkan column. Batas slice dicari dengan
+    searchsorted (O(log n)) dan hasilnya berupa slice posisi (view) tanpa menyalin data dan tanpa boolean mask.
+
+    Parameters:
+        data_frame (pandas DataFrame): Data Frame yang terurut menaik berdasarkan column
+        column (str): nama kolom datetime
+        start_date (date): tanggal awal (inklusif)
+        end_date (date): tanggal akhir (inklusif)
+
+    Returns:
+        pandas DataFrame: slice dari data_frame
+    """
+
+    values = data_frame[column].to_numpy()
+
+    lower = values.searchsorted(np.datetime64(pd.Timestamp(start_date).normalize(), 'ns'), side='left')
+    upper = values.searchsorted(np.datetime64(pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1), 'ns'), side='left')
+
+    return data_frame.iloc[lower:upper]
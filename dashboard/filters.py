@@ -0,0 +1,70 @@
+"""
+Filter sidebar dashboard: rentang tanggal yang diterapkan dan penghentian rerun yang sudah usang.
+
+Rentang tanggal diisi di dalam st.form sehingga klik pada kalender tidak memicu rerun; filter baru
+diterapkan saat tombol Apply ditekan. Jika filter lain (misalnya menu navigasi) berubah selagi rerun
+masih menghitung, Streamlit baru menghentikan rerun tersebut pada pemanggilan st.* berikutnya.
+stop_if_stale dipanggil sebelum setiap fungsi analitik (lewat instrument.traced dan traced_cache),
+sehingga komputasi berat untuk state filter yang sudah tidak dilihat berhenti di antara fungsi,
+tanpa menunggu elemen berikutnya ditampilkan.
+"""
+
+import datetime
+
+import pandas as pd
+
+try:
+    from streamlit.runtime.scriptrunner_utils.exceptions import RerunException, StopException
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequestType
+    from streamlit.runtime.scriptrunner_utils.script_run_context import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = None
+
+
+### Rentang tanggal dari st.date_input
+def date_range(value, min_date, max_date) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk mengubah nilai st.date_input (satu tanggal, tuple satu tanggal saat
+    tanggal kedua belum dipilih, atau tuple dua tanggal) menjadi (start_date, end_date).
+    Satu tanggal berarti rentang satu hari, nilai kosong berarti seluruh data.
+
+    Parameters:
+        value (date atau tuple): nilai st.date_input
+        min_date (date): tanggal paling awal data
+        max_date (date): tanggal paling akhir data
+
+    Returns:
+        tuple(start_date, end_date): datetime.date, start_date <= end_date
+    """
+
+    dates = [value] if isinstance(value, (datetime.date, pd.Timestamp)) else list(value or ())
+    dates = [pd.Timestamp(date).date() for date in dates if date is not None]
+
+    if not dates:
+        return pd.Timestamp(min_date).date(), pd.Timestamp(max_date).date()
+
+    return min(dates), max(dates)
+
+### Menghentikan rerun yang sudah usang
+def stop_if_stale() -> None:
+
+    """
+    Fungsi ini bertujuan untuk menghentikan rerun ini jika session sudah meminta rerun baru (filter
+    berubah) atau berhenti, dengan cara yang sama seperti Streamlit pada setiap pemanggilan st.*.
+    Di luar thread script Streamlit (benchmark, worker, refresh cache di background) tidak melakukan apa pun.
+    """
+
+    ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx is not None else None
+    requests = getattr(ctx, 'script_requests', None)
+    if requests is None:
+        return
+
+    request = requests.on_scriptrunner_yield()
+    if request is None:
+        return
+
+    if request.type == ScriptRequestType.RERUN:
+        raise RerunException(request.rerun_data)
+
+    raise StopException()
@@ -0,0 +1,248 @@
+"""
+Bundle peta lokal (GeoParquet) untuk peta Brazil dan peta kota per state.
+
+Build step mengunduh GeoJSON negara dan ke-27 state sekali, menghitung centroid state (di EPSG:3395),
+menormalkan nama kota (tanpa aksen, huruf kecil), lalu menyimpannya sebagai file GeoParquet di
+data/geo/. Dashboard membaca bundle tersebut sehingga render peta tidak lagi bergantung pada
+GitHub. Jika file bundle belum ada, loader mengunduh dan memproses GeoJSON seperti sebelumnya.
+
+Bundle dibuat dengan:
+
+    python -m dashboard.geodata
+"""
+
+import os
+import sys
+import unicodedata
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from dashboard.store import DATA_DIR
+
+
+GEO_DIR = os.path.join(DATA_DIR, 'geo')
+
+ZIP_PREFIX_SIZE = 100000
+
+GEODATA_URL = 'https://raw.githubusercontent.com/luizpedone/municipal-brazilian-geodata/refs/heads/master/data'
+
+STATES = ('AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+          'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO')
+
+### Menghapus aksen
+def remove_accents(input_str):
+
+    nfkd_form = unicodedata.normalize('NFKD', input_str)
+    return ''.join([char for char in nfkd_form if not unicodedata.combining(char)])
+
+### Mendapatkan path file bundle
+def brazil_path(geo_dir: str = GEO_DIR) -> str:
+    return os.path.join(geo_dir, 'Brasil.parquet')
+
+def cities_path(state: str, geo_dir: str = GEO_DIR) -> str:
+    return os.path.join(geo_dir, f'{state}.parquet')
+
+### Mengunduh dan memproses peta Brazil
+def fetch_brazil(source_url: str = GEODATA_URL) -> gpd.GeoDataFrame:
+
+    """
+    Fungsi ini bertujuan untuk mengunduh peta state Brazil lalu menghitung centroid setiap state.
+    Centroid dihitung dalam meter (EPSG:3395) lalu dikonversi kembali ke latitude longitude.
+
+    Returns:
+        brazil_df (GeoPandas DataFrame): kolom UF, geometry, dan centroid, terurut berdasarkan UF
+    """
+
+    brazil_df = gpd.read_file(f'{source_url}/Brasil.json')
+
+    brazil_df['centroid'] = brazil_df['geometry'].to_crs(epsg=3395).centroid.to_crs(epsg=4326)
+
+    brazil_df = brazil_df.sort_values(by='UF', ascending=True).reset_index(drop=True)
+
+    return brazil_df
+
+### Mengunduh dan memproses peta kota pada satu state
+def fetch_cities(state: str, source_url: str = GEODATA_URL) -> gpd.GeoDataFrame:
+
+    """
+    Fungsi ini bertujuan untuk mengunduh peta kota pada state lalu menormalkan nama kota
+    (tanpa aksen, huruf kecil) pada kolom NOME.
+
+    Returns:
+        df_cities (GeoPandas DataFrame): peta kota terurut berdasarkan NOME
+    """
+
+    df_cities = gpd.read_file(f'{source_url}/{state}.json')
+
+    df_cities['NOME'] = df_cities['NOME'].apply(remove_accents).str.lower()
+
+    df_cities = df_cities.sort_values(by='NOME').reset_index(drop=True)
+
+    return df_cities
+
+### Membuat bundle peta lokal
+def build_geodata_bundle(geo_dir: str = GEO_DIR, source_url: str = GEODATA_URL) -> list:
+
+    """
+    Fungsi ini bertujuan untuk menyimpan peta Brazil dan peta kota setiap state sebagai GeoParquet.
+
+    Parameters:
+        geo_dir (str): folder tujuan bundle
+        source_url (str): URL folder GeoJSON sumber
+
+    Returns:
+        written (list): list path file yang ditulis
+    """
+
+    os.makedirs(geo_dir, exist_ok=True)
+
+    written = [brazil_path(geo_dir)]
+    fetch_brazil(source_url).to_parquet(written[0])
+
+    for state in STATES:
+        path = cities_path(state, geo_dir)
+        fetch_cities(state, source_url).to_parquet(path)
+        written.append(path)
+
+    return written
+
+### Membaca peta Brazil
+def load_brazil(geo_dir: str = GEO_DIR) -> gpd.GeoDataFrame:
+
+    path = brazil_path(geo_dir)
+    if os.path.exists(path):
+        return gpd.read_parquet(path)
+
+    return fetch_brazil()
+
+### Membaca peta kota pada satu state
+def load_cities(state: str, geo_dir: str = GEO_DIR) -> gpd.GeoDataFrame:
+
+    path = cities_path(state, geo_dir)
+    if os.path.exists(path):
+        return gpd.read_parquet(path)
+
+    return fetch_cities(state)
+
+### Menentukan region (state/kota) dari setiap poin
+def assign_regions(lng, lat, regions: gpd.GeoSeries) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk menentukan region tempat setiap poin (lng, lat) berada dengan
+    spatial join yang memakai STRtree, sehingga setiap poin hanya dibandingkan dengan polygon
+    yang bounding box-nya memuat poin tersebut.
+
+    Parameters:
+        lng (array-like): longitude setiap poin
+        lat (array-like): latitude setiap poin
+        regions (GeoPandas GeoSeries): polygon region, misalnya geometry dari load_brazil()
+
+    Returns:
+        codes (numpy array int16): posisi region pada regions untuk setiap poin, -1 jika di luar semua region
+    """
+
+    points = shapely.points(np.asarray(lng, dtype=np.float64), np.asarray(lat, dtype=np.float64))
+
+    tree = shapely.STRtree(np.asarray(regions.geometry.values))
+    point_idx, region_idx = tree.query(points, predicate='within')
+
+    # Jika poin berada di perbatasan beberapa region, region dengan posisi terkecil yang dipakai
+    codes = np.full(len(points), -1, dtype=np.int16)
+    codes[point_idx[::-1]] = region_idx[::-1]
+
+    return codes
+
+### Mendapatkan lookup koordinat per zip prefix
+def create_zip_lookup(df_geolocation: pd.DataFrame, regions: gpd.GeoSeries = None) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan array padat (indeks = zip prefix, < ZIP_PREFIX_SIZE)
+    berisi latitude, longitude (float32), poin shapely, dan state_code setiap zip prefix.
+    Cleaning koordinat dilakukan sekali di sini:
+    - poin dengan latitude <= -35 dianggap tidak valid
+    - poin state RJ dengan longitude <= -45 tidak dipakai untuk customer (valid_customer)
+
+    Parameters:
+        df_geolocation (pandas DataFrame): Data Frame df_geolocation (satu baris per zip prefix)
+        regions (GeoPandas GeoSeries): polygon state untuk state_code, None jika tidak diperlukan
+
+    Returns:
+        zip_lookup (dict): array lat, lng, geometry, state_code, valid, dan valid_customer
+    """
+
+    zip_prefix = df_geolocation['geolocation_zip_code_prefix'].to_numpy(dtype=np.int64)
+    lat = df_geolocation['geolocation_lat'].to_numpy(dtype=np.float64)
+    lng = df_geolocation['geolocation_lng'].to_numpy(dtype=np.float64)
+
+    keep = (zip_prefix >= 0) & (zip_prefix < ZIP_PREFIX_SIZE) & (lat > -35)
+    zip_prefix, lat, lng = zip_prefix[keep], lat[keep], lng[keep]
+    rj_west = ((df_geolocation['geolocation_state'] == 'RJ').to_numpy()[keep]) & (lng <= -45)
+
+    zip_lookup = {
+        'lat': np.full(ZIP_PREFIX_SIZE, np.nan, dtype=np.float32),
+        'lng': np.full(ZIP_PREFIX_SIZE, np.nan, dtype=np.float32),
+        'geometry': np.full(ZIP_PREFIX_SIZE, None, dtype=object),
+        'state_code': np.full(ZIP_PREFIX_SIZE, -1, dtype=np.int16),
+        'valid': np.zeros(ZIP_PREFIX_SIZE, dtype=bool),
+        'valid_customer': np.zeros(ZIP_PREFIX_SIZE, dtype=bool),
+    }
+
+    zip_lookup['lat'][zip_prefix] = lat
+    zip_lookup['lng'][zip_prefix] = lng
+    zip_lookup['geometry'][zip_prefix] = shapely.points(lng, lat)
+    zip_lookup['valid'][zip_prefix] = True
+    zip_lookup['valid_customer'][zip_prefix] = ~rj_west
+
+    if regions is not None:
+        zip_lookup['state_code'][zip_prefix] = assign_regions(lng, lat, regions)
+
+    return zip_lookup
+
+### Mengambil koordinat dari lookup zip prefix
+def lookup_zip(zip_lookup: dict, zip_prefix, valid: str = 'valid') -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk mengambil koordinat setiap baris dengan satu fancy indexing.
+
+    Parameters:
+        zip_lookup (dict): hasil create_zip_lookup atau shared.open_zip_lookup
+        zip_prefix (array-like): zip prefix setiap baris (boleh NaN)
+        valid (str): nama mask validitas, 'valid' atau 'valid_customer'
+
+    Returns:
+        tuple(mask, columns):
+        mask boolean baris yang punya koordinat valid, dan dict geolocation_lat, geolocation_lng,
+        state_code, geometry untuk baris-baris tersebut
+    """
+
+    zip_prefix = pd.to_numeric(pd.Series(zip_prefix), errors='coerce').to_numpy(dtype=np.float64)
+    in_range = (zip_prefix >= 0) & (zip_prefix < ZIP_PREFIX_SIZE)
+
+    position = np.where(in_range, zip_prefix, 0).astype(np.int64)
+    mask = in_range & zip_lookup[valid][position]
+    position = position[mask]
+
+    columns = {
+        'geolocation_lat': zip_lookup['lat'][position],
+        'geolocation_lng': zip_lookup['lng'][position],
+        'state_code': zip_lookup['state_code'][position],
+    }
+
+    # Lookup dari dataset bersama (dashboard.shared) tidak memuat objek shapely, hanya koordinatnya
+    if 'geometry' in zip_lookup:
+        columns['geometry'] = zip_lookup['geometry'][position]
+    else:
+        columns['geometry'] = shapely.points(zip_lookup['point_xy'][position])
+
+    return mask, columns
+
+
+if __name__ == '__main__':
+
+    geo_dir = sys.argv[1] if len(sys.argv) > 1 else GEO_DIR
+
+    for path in build_geodata_bundle(geo_dir):
+        print(path)
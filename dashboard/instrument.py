@@ -0,0 +1,265 @@
+"""
+Instrumentasi hot path dashboard per rerun.
+
+Fungsi analitik dan grafik dibungkus dengan traced / traced_cache. Selama satu rerun (start_rerun
+sampai finish_rerun) setiap pemanggilan dicatat sebagai span: waktu, status cache (hit/miss untuk
+fungsi st.cache_data / st.cache_resource dan cache grafik), jumlah baris input, serta jumlah baris
+dan ukuran output. Hasilnya ditampilkan pada panel debug di sidebar dan ditambahkan sebagai satu
+baris JSON per rerun ke file lokal.
+
+Instrumentasi bersifat opt-in (environment variable DASHBOARD_TRACE=1). Jika tidak aktif, fungsi
+yang dibungkus langsung dipanggil tanpa pencatatan. Wrapper tetap menjadi titik henti rerun yang
+sudah usang (filters.stop_if_stale), dengan atau tanpa instrumentasi.
+"""
+
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from dashboard.filters import stop_if_stale
+
+
+TRACE_ENABLED = os.environ.get('DASHBOARD_TRACE', '0') not in ('', '0', 'false', 'False')
+
+TRACE_FILE = os.environ.get('DASHBOARD_TRACE_FILE', os.path.join('logs', 'trace.jsonl'))
+
+## Trace rerun yang sedang berjalan, per thread (setiap session Streamlit menjalankan script di thread sendiri)
+_local = threading.local()
+_file_lock = threading.Lock()
+
+### Trace satu rerun
+class RerunTrace:
+
+    """
+    Kumpulan span pada satu rerun. Span yang sedang berjalan disimpan pada stack sehingga fungsi
+    yang dipanggil di dalam fungsi lain (misalnya load_daily_cubes -> load_df_fact) tercatat
+    dengan depth-nya.
+    """
+
+    def __init__(self, session: str = None):
+        self.session = session
+        self.started = time.perf_counter()
+        self.timestamp = datetime.datetime.now().isoformat(timespec='milliseconds')
+        self.attributes = {}
+        self.spans = []
+        self.stack = []
+
+    def to_record(self) -> dict:
+        return {
+            'timestamp': self.timestamp,
+            'session': self.session,
+            **self.attributes,
+            'seconds': time.perf_counter() - self.started,
+            'spans': self.spans,
+        }
+
+### Jumlah baris dan ukuran objek
+def n_rows(obj):
+
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index, np.ndarray)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)) and any(isinstance(item, (pd.DataFrame, pd.Series)) for item in obj):
+        return sum(n_rows(item) or 0 for item in obj)
+
+    return None
+
+def n_bytes(obj):
+
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(index=True)) if isinstance(obj, pd.Series) else int(obj.memory_usage())
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (tuple, list)):
+        sizes = [n_bytes(item) for item in obj]
+        return sum(size for size in sizes if size) if any(sizes) else None
+
+    return None
+
+### Memulai dan menyelesaikan trace rerun
+def start_rerun(session: str = None):
+
+    """
+    Fungsi ini bertujuan untuk memulai trace rerun pada thread ini. Tidak melakukan apa pun jika
+    instrumentasi tidak aktif.
+    """
+
+    _local.trace = RerunTrace(session) if TRACE_ENABLED else None
+    return _local.trace
+
+def current_trace():
+    return getattr(_local, 'trace', None)
+
+def annotate(**attributes) -> None:
+
+    # Atribut rerun, misalnya halaman yang dibuka dan rentang tanggal
+    trace = current_trace()
+    if trace is not None:
+        trace.attributes.update(attributes)
+
+def finish_rerun(trace_file: str = TRACE_FILE):
+
+    """
+    Fungsi ini bertujuan untuk menutup trace rerun pada thread ini dan menambahkannya sebagai satu
+    baris JSON ke trace_file.
+
+    Returns:
+        record (dict): record rerun, None jika instrumentasi tidak aktif
+    """
+
+    trace = current_trace()
+    if trace is None:
+        return None
+
+    _local.trace = None
+    record = trace.to_record()
+
+    if trace_file:
+        directory = os.path.dirname(trace_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _file_lock, open(trace_file, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record, default=str) + '\n')
+
+    return record
+
+### Status cache span yang sedang berjalan
+def mark_cache(status: str) -> None:
+
+    """
+    Fungsi ini bertujuan untuk mengisi status cache ('hit' / 'miss') span paling dalam yang sedang
+    berjalan, misalnya dari cache grafik.
+    """
+
+    trace = current_trace()
+    if trace is not None and trace.stack:
+        trace.stack[-1]['cache'] = status
+
+### Menjalankan fungsi sebagai span
+def _run_span(trace: RerunTrace, name: str, function, args, kwargs, cache=None):
+
+    span = {
+        'name': name,
+        'depth': len(trace.stack),
+        'start': time.perf_counter() - trace.started,
+        'cache': cache,
+        'rows_in': sum(n_rows(arg) or 0 for arg in list(args) + list(kwargs.values())),
+    }
+    trace.stack.append(span)
+
+    start = time.perf_counter()
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        span['seconds'] = time.perf_counter() - start
+        trace.stack.pop()
+        trace.spans.append(span)
+
+    span['rows_out'] = n_rows(result)
+    span['bytes_out'] = n_bytes(result)
+
+    return result
+
+### Decorator untuk fungsi tanpa cache
+def traced(function):
+
+    """
+    Decorator yang mencatat setiap pemanggilan function sebagai span pada trace rerun.
+    Sebelum function dijalankan, rerun yang sudah usang dihentikan (filters.stop_if_stale).
+    """
+
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+
+        stop_if_stale()
+
+        trace = current_trace()
+        if trace is None:
+            return function(*args, **kwargs)
+
+        return _run_span(trace, name, function, args, kwargs)
+
+    return wrapper
+
+### Decorator untuk fungsi dengan cache Streamlit
+def traced_cache(cache_decorator):
+
+    """
+    Decorator pengganti st.cache_data / st.cache_resource yang juga mencatat span beserta status
+    cache-nya: body fungsi hanya dijalankan saat cache miss, sehingga span ditandai 'miss' jika
+    body dijalankan dan 'hit' jika tidak. Sebelum body dijalankan, rerun yang sudah usang dihentikan
+    (filters.stop_if_stale), sehingga hasil untuk state filter lama tidak dihitung.
+
+    Contoh:
+        @traced_cache(st.cache_data)
+        def create_pivot_seller_and_order(df_fact): ...
+    """
+
+    def decorator(function):
+
+        name = function.__name__
+
+        @functools.wraps(function)
+        def body(*args, **kwargs):
+            stop_if_stale()
+            mark_cache('miss')
+            return function(*args, **kwargs)
+
+        cached_function = cache_decorator(body)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+
+            trace = current_trace()
+            if trace is None:
+                return cached_function(*args, **kwargs)
+
+            return _run_span(trace, name, cached_function, args, kwargs, cache='hit')
+
+        # clear() dan fungsi asli tetap bisa diakses
+        wrapper.clear = cached_function.clear
+        wrapper.__wrapped__ = function
+
+        return wrapper
+
+    return decorator
+
+### Ringkasan span per fungsi
+def summarize_spans(spans: list) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk meringkas span per nama fungsi: jumlah panggilan, total waktu,
+    hit/miss cache, serta total baris input dan output.
+
+    Returns:
+        pandas DataFrame terurut berdasarkan total waktu
+    """
+
+    columns = ['calls', 'seconds', 'hits', 'misses', 'rows_in', 'rows_out', 'bytes_out']
+    if not spans:
+        return pd.DataFrame(columns=columns)
+
+    df_spans = pd.DataFrame(spans)
+    df_spans['hits'] = df_spans['cache'] == 'hit'
+    df_spans['misses'] = df_spans['cache'] == 'miss'
+
+    summary = df_spans.groupby('name', sort=False).agg(calls=('name', 'size'),
+                                                        seconds=('seconds', 'sum'),
+                                                        hits=('hits', 'sum'),
+                                                        misses=('misses', 'sum'),
+                                                        rows_in=('rows_in', 'sum'),
+                                                        rows_out=('rows_out', 'sum'),
+                                                        bytes_out=('bytes_out', 'sum'))
+
+    return summary.sort_values(by='seconds', ascending=False)
@@ -0,0 +1,197 @@
+"""
+Leaderboard top-N seller dan customer yang bisa di-merge per bucket waktu.
+
+Nilai setiap entity (total price seller, total payment customer) disimpan sebagai partial per hari
+dan per bulan dalam bentuk CSR (baris = bucket, kolom = kode entity). Total pada rentang tanggal
+apa pun adalah gabungan partial bulan-bulan yang tercakup penuh ditambah partial hari di kedua
+ujung rentang. Top-N dipilih dengan seleksi parsial (argpartition), tanpa mengurutkan semua
+entity, sehingga waktu query hanya bergantung pada jumlah partial pada rentang tersebut dan
+jumlah entity, bukan pada jumlah order item.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard.cube import day_index
+
+
+### Leaderboard yang dipakai dashboard: measure, kelompok baris, dan kolom lokasi yang wajib ada
+# Sama seperti df_sellers_merged dan df_customer_merged, entity tanpa state tidak ikut dihitung
+LEADERBOARDS = {
+    'seller_id': {'measure': 'price', 'group': 'kelompok_seller', 'location': 'seller_state', 'column': 'price_sum'},
+    'customer_id': {'measure': 'payment_value', 'group': 'kelompok_customer', 'location': 'customer_state',
+                    'column': 'payment_value_sum'},
+}
+
+### Indeks n nilai terbesar
+def top_n(values, n: int) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan posisi n nilai terbesar, urut menurun. Kandidat dipilih
+    dengan argpartition (O(jumlah nilai)), hanya n kandidat tersebut yang diurutkan.
+    Nilai yang sama diurutkan berdasarkan posisinya.
+
+    Parameters:
+        values (array-like): nilai setiap entity
+        n (int): jumlah entity teratas
+
+    Returns:
+        numpy array posisi n nilai terbesar
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    n = min(n, len(values))
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    top = np.argpartition(-values, n - 1)[:n] if n < len(values) else np.arange(len(values))
+
+    return top[np.lexsort((top, -values[top]))]
+
+### Hari pertama setiap bulan
+def month_starts(day0: pd.Timestamp, n_days: int) -> np.ndarray:
+
+    # Indeks hari awal setiap bulan (bulan pertama mulai dari hari 0), diakhiri n_days
+    periods = pd.period_range(day0, day0 + pd.Timedelta(days=n_days - 1), freq='M')
+    month_start = np.maximum((periods.start_time - day0) // pd.Timedelta(days=1), 0)
+
+    return np.append(month_start, n_days).astype(np.int64)
+
+### Partial per bucket dalam bentuk CSR
+def build_buckets(bucket: np.ndarray, entity: np.ndarray, value: np.ndarray, count: np.ndarray,
+                  n_buckets: int, n_entities: int) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menjumlahkan value dan count per (bucket, entity) lalu menyimpannya
+    terurut per bucket: partial bucket b ada pada posisi indptr[b] sampai indptr[b + 1].
+
+    Returns:
+        buckets (dict): dict berisi indptr, entity, value, dan count
+    """
+
+    key = bucket.astype(np.int64) * n_entities + entity.astype(np.int64)
+    unique_key, inverse = np.unique(key, return_inverse=True)
+
+    return {
+        'indptr': np.searchsorted(unique_key // max(n_entities, 1), np.arange(n_buckets + 1), side='left'),
+        'entity': unique_key % max(n_entities, 1),
+        'value': np.bincount(inverse, weights=value, minlength=len(unique_key)),
+        'count': np.bincount(inverse, weights=count, minlength=len(unique_key)),
+    }
+
+### Mendapatkan leaderboard
+def create_leaderboard(df_fact: pd.DataFrame, entity: str, n_entities: int) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan leaderboard satu entity dari df_fact: partial per hari
+    dan per bulan untuk measure pada LEADERBOARDS[entity].
+
+    Parameters:
+        df_fact (pandas DataFrame): Data Frame df_fact (belum difilter tanggal)
+        entity (str): kolom entity, 'seller_id' atau 'customer_id'
+        n_entities (int): jumlah kode entity (len(id_labels[entity]))
+
+    Returns:
+        leaderboard (dict): dict berisi days, months, month_start, day0, n_days, n_entities, entity, dan column
+    """
+
+    spec = LEADERBOARDS[entity]
+
+    day0 = df_fact['order_purchase_timestamp'].min().normalize()
+    mask = (df_fact[spec['group']] & df_fact[spec['location']].notna()).to_numpy()
+    df_temp = df_fact[mask]
+
+    day = ((df_temp['order_purchase_timestamp'] - day0) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    n_days = int(((df_fact['order_purchase_timestamp'].max() - day0) // pd.Timedelta(days=1))) + 1 if len(df_fact) else 1
+
+    codes = df_temp[entity].to_numpy(dtype=np.int64)
+    value = df_temp[spec['measure']].to_numpy(dtype=np.float64)
+    count = np.ones(len(codes))
+
+    days = build_buckets(day, codes, value, count, n_days, n_entities)
+
+    # Partial bulanan adalah rollup partial harian
+    month_start = month_starts(day0, n_days)
+    day_of_partial = np.repeat(np.arange(n_days), np.diff(days['indptr']))
+    month_of_partial = np.searchsorted(month_start, day_of_partial, side='right') - 1
+    months = build_buckets(month_of_partial, days['entity'], days['value'], days['count'], len(month_start) - 1, n_entities)
+
+    return {
+        'days': days,
+        'months': months,
+        'month_start': month_start,
+        'day0': day0,
+        'n_days': n_days,
+        'n_entities': n_entities,
+        'entity': entity,
+        'column': spec['column'],
+    }
+
+### Potongan partial pada rentang bucket [start, end)
+def bucket_slice(buckets: dict, start: int, end: int) -> tuple:
+
+    start, end = buckets['indptr'][start], buckets['indptr'][end]
+
+    return buckets['entity'][start:end], buckets['value'][start:end], buckets['count'][start:end]
+
+### Bucket-bucket yang menyusun rentang hari
+def range_segments(month_start: np.ndarray, first: int, last: int) -> list:
+
+    """
+    Fungsi ini bertujuan untuk membagi rentang hari [first, last) menjadi bulan-bulan yang tercakup
+    penuh dan sisa hari di kedua ujungnya.
+
+    Returns:
+        segments (list): list (level, start, end) dengan level 'days' (indeks hari) atau 'months' (indeks bulan)
+    """
+
+    # Bulan [first_month, last_month) tercakup penuh oleh rentang hari [first, last)
+    first_month = int(np.searchsorted(month_start, first, side='left'))
+    last_month = int(np.searchsorted(month_start, last, side='right')) - 1
+
+    if first_month < last_month:
+        return [('days', first, int(month_start[first_month])),
+                ('months', first_month, last_month),
+                ('days', int(month_start[last_month]), last)]
+
+    return [('days', first, max(first, last))]
+
+### Rentang hari dari rentang tanggal
+def day_range(leaderboard: dict, start_date, end_date) -> tuple:
+
+    # [first, last) dalam indeks hari, kedua tanggal inklusif
+    return day_index(leaderboard, start_date), min(day_index(leaderboard, end_date) + 1, leaderboard['n_days'])
+
+### Top-N pada rentang tanggal
+def query_top(leaderboard: dict, start_date, end_date, n: int = 5) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan n entity dengan nilai terbesar pada rentang
+    [start_date, end_date] (kedua tanggal inklusif).
+
+    Bulan yang tercakup penuh diambil dari partial bulanan, sisa hari di kedua ujung dari partial
+    harian. Partial-partial tersebut digabung per entity lalu n teratas dipilih dengan top_n.
+
+    Parameters:
+        leaderboard (dict): hasil create_leaderboard
+        start_date (date): tanggal awal
+        end_date (date): tanggal akhir
+        n (int): jumlah entity teratas
+
+    Returns:
+        pandas DataFrame yang diindeks oleh kode entity, satu kolom leaderboard['column'], urut menurun
+    """
+
+    first, last = day_range(leaderboard, start_date, end_date)
+
+    parts = [bucket_slice(leaderboard[level], start, end)
+             for level, start, end in range_segments(leaderboard['month_start'], first, last)]
+
+    entity, value, count = (np.concatenate(arrays) for arrays in zip(*parts))
+
+    totals = np.bincount(entity, weights=value, minlength=leaderboard['n_entities'])
+    present = np.flatnonzero(np.bincount(entity, weights=count, minlength=leaderboard['n_entities']) > 0)
+
+    top = present[top_n(totals[present], n)]
+
+    return pd.DataFrame({leaderboard['column']: totals[top]}, index=pd.Index(top, name=leaderboard['entity']))
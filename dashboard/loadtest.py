@@ -0,0 +1,317 @@
+"""
+Load test dashboard dengan banyak session sekaligus pada satu mesin.
+
+Setiap session adalah AppTest (app testing API Streamlit) yang berjalan di thread sendiri di dalam
+satu proses, sehingga semua session memakai objek st.cache_resource / st.cache_data yang sama
+seperti pada satu server Streamlit. Setiap session membuka dashboard lalu memutar urutan interaksi
+acak yang realistis: pindah halaman, mengganti rentang tanggal, dan memilih state, kota, periode,
+atau kategori produk. Waktu setiap rerun dicatat, lalu dilaporkan p50/p95/p99, throughput
+(rerun per detik), dan RSS proses (server).
+
+Load test dijalankan pada dataset data/ atau dataset sintetis benchmark (--scale):
+
+    python -m dashboard.loadtest --sessions 8 --interactions 20
+    python -m dashboard.loadtest --sessions 16 --interactions 10 --scale 10 --output load.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import threading
+import time
+
+import numpy as np
+import streamlit as st
+
+from dashboard.benchmark import APP_PATH, max_rss_mb, navigation_options, prepare_dataset, working_directory
+
+
+## Key session_state yang dipakai untuk memilih halaman (option_menu adalah custom component)
+PAGE_KEY = '_loadtest_page'
+
+## Bobot setiap jenis interaksi
+INTERACTIONS = {'page': 0.3, 'date_range': 0.25, 'selectbox': 0.45}
+
+## Panjang rentang tanggal acak (hari)
+DATE_RANGE_DAYS = (60, 540)
+
+PERCENTILES = (50, 95, 99)
+
+### option_menu pengganti yang membaca halaman dari session_state
+def option_menu(menu_title, options, default_index=0, **kwargs):
+    return st.session_state.get(PAGE_KEY, options[default_index])
+
+### Sampling RSS proses
+class RssSampler(threading.Thread):
+
+    """
+    Thread yang mencatat RSS proses setiap interval detik selama load test berjalan.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def current_rss_mb() -> float:
+
+        # /proc hanya ada di Linux, selain itu dipakai RSS maksimum
+        try:
+            with open('/proc/self/statm') as file:
+                return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+        except OSError:
+            return max_rss_mb()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.samples.append(self.current_rss_mb())
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+### Satu session dashboard
+class LoadSession:
+
+    """
+    Satu session AppTest yang memutar urutan interaksi acak dan mencatat waktu setiap rerun.
+    """
+
+    def __init__(self, session_id: int, pages: list, seed: int = 0, timeout: float = 600):
+        from streamlit.testing.v1 import AppTest
+
+        self.session_id = session_id
+        self.pages = pages
+        self.rng = random.Random(seed * 1000003 + session_id)
+        self.app_test = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.records = []
+        self.date_bounds = None
+
+    def rerun(self, kind: str, detail: str) -> None:
+
+        start = time.perf_counter()
+        error = None
+        try:
+            self.app_test.run()
+            if self.app_test.exception:
+                error = self.app_test.exception[0].message
+        except Exception as exception:
+            error = repr(exception)
+        end = time.perf_counter()
+
+        self.records.append({
+            'session': self.session_id,
+            'kind': kind,
+            'detail': detail,
+            'start': start,
+            'seconds': end - start,
+            'error': error,
+        })
+
+    def open(self) -> None:
+
+        page = self.rng.choice(self.pages)
+        self.app_test.session_state[PAGE_KEY] = page
+        self.rerun('open', page)
+
+        if len(self.app_test.date_input):
+            self.date_bounds = tuple(self.app_test.date_input[0].value)
+
+    def switch_page(self) -> None:
+
+        page = self.rng.choice(self.pages)
+        self.app_test.session_state[PAGE_KEY] = page
+        self.rerun('page', page)
+
+    def change_date_range(self) -> None:
+
+        if not self.date_bounds or not len(self.app_test.date_input):
+            return self.switch_page()
+
+        first, last = self.date_bounds
+        days = min(self.rng.randint(*DATE_RANGE_DAYS), (last - first).days)
+        start = first + datetime.timedelta(days=self.rng.randint(0, (last - first).days - days))
+        end = start + datetime.timedelta(days=days)
+
+        # Rentang tanggal berada di dalam form, baru diterapkan saat tombol Apply ditekan
+        self.app_test.date_input[0].set_value((start, end))
+        for button in self.app_test.button:
+            if button.label == 'Apply':
+                button.click()
+        self.rerun('date_range', f'{start} - {end}')
+
+    def pick_option(self) -> None:
+
+        # Selectbox pada halaman yang sedang dibuka: state, kota, periode RFM, jumlah kota, kategori
+        selectboxes = [selectbox for selectbox in self.app_test.selectbox if len(selectbox.options) > 1]
+        if not selectboxes:
+            return self.switch_page()
+
+        selectbox = self.rng.choice(selectboxes)
+        option = self.rng.choice(list(selectbox.options))
+
+        selectbox.select(option)
+        self.rerun('selectbox', f'{selectbox.label} {option}')
+
+    def play(self, n_interactions: int, think_time: float = 0.0) -> None:
+
+        self.open()
+
+        actions = {'page': self.switch_page, 'date_range': self.change_date_range, 'selectbox': self.pick_option}
+        for _ in range(n_interactions):
+            if think_time:
+                time.sleep(self.rng.expovariate(1 / think_time))
+
+            kind = self.rng.choices(list(INTERACTIONS), weights=list(INTERACTIONS.values()))[0]
+            actions[kind]()
+
+### Menjalankan load test
+def run_load_test(root: str,
+                  sessions: int,
+                  n_interactions: int,
+                  pages: list = None,
+                  think_time: float = 0.0,
+                  seed: int = 0,
+                  warmup: bool = True,
+                  timeout: float = 600) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menjalankan sessions session bersamaan, masing-masing memutar
+    n_interactions interaksi acak setelah membuka dashboard.
+
+    Parameters:
+        root (str): folder yang berisi data/, dipakai sebagai working directory dashboard
+        sessions (int): jumlah session bersamaan
+        n_interactions (int): jumlah interaksi per session
+        pages (list): pilihan Navigation Menu yang dipakai, default semua
+        think_time (float): rata-rata jeda antar interaksi (detik), 0 berarti tanpa jeda
+        seed (int): seed urutan interaksi
+        warmup (bool): jika True, cache diisi dulu dengan satu session SHOW ALL sebelum pengukuran
+        timeout (float): batas waktu satu rerun (detik)
+
+    Returns:
+        result (dict): records setiap rerun, sampel RSS, dan durasi total
+    """
+
+    import streamlit_option_menu
+    from streamlit.testing.v1.util import patch_config_options
+
+    pages = pages or navigation_options()
+    original_option_menu = streamlit_option_menu.option_menu
+    streamlit_option_menu.option_menu = option_menu
+
+    try:
+        # Setiap AppTest.run mengaktifkan global.appTest lalu mengembalikan nilai sebelumnya saat selesai.
+        # Opsi ini diaktifkan selama load test agar run yang selesai tidak menonaktifkannya bagi
+        # session lain yang masih berjalan
+        with working_directory(root), patch_config_options({'global.appTest': True}):
+
+            if warmup:
+                warmup_session = LoadSession(-1, [pages[-1]], seed, timeout)
+                warmup_session.open()
+
+            load_sessions = [LoadSession(session_id, pages, seed, timeout) for session_id in range(sessions)]
+            barrier = threading.Barrier(sessions)
+
+            def play(load_session):
+                barrier.wait()
+                load_session.play(n_interactions, think_time)
+
+            threads = [threading.Thread(target=play, args=(load_session,)) for load_session in load_sessions]
+
+            sampler = RssSampler()
+            sampler.start()
+            start = time.perf_counter()
+
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            duration = time.perf_counter() - start
+            sampler.stop()
+    finally:
+        streamlit_option_menu.option_menu = original_option_menu
+
+    records = [record for load_session in load_sessions for record in load_session.records]
+
+    return {'records': records, 'rss_mb': sampler.samples, 'duration': duration}
+
+### Ringkasan hasil
+def summarize(result: dict) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghitung persentil latensi rerun (keseluruhan dan per jenis interaksi),
+    throughput, jumlah error, dan RSS.
+    """
+
+    records = result['records']
+
+    def latency(rows):
+        seconds = np.array([row['seconds'] for row in rows])
+        if not len(seconds):
+            return {}
+        summary = {f'p{p}': float(np.percentile(seconds, p)) for p in PERCENTILES}
+        summary.update(count=len(seconds), mean=float(seconds.mean()), max=float(seconds.max()))
+        return summary
+
+    kinds = sorted({row['kind'] for row in records})
+    rss = result['rss_mb'] or [max_rss_mb()]
+
+    return {
+        'reruns': len(records),
+        'errors': sum(row['error'] is not None for row in records),
+        'duration': result['duration'],
+        'throughput': len(records) / result['duration'] if result['duration'] else 0.0,
+        'latency': latency(records),
+        'latency_by_kind': {kind: latency([row for row in records if row['kind'] == kind]) for kind in kinds},
+        'rss_mb': {'mean': float(np.mean(rss)), 'max': float(np.max(rss))},
+    }
+
+### Menampilkan ringkasan
+def format_summary(summary: dict) -> str:
+
+    lines = [f"reruns {summary['reruns']}  errors {summary['errors']}  duration {summary['duration']:.1f} s  "
+             f"throughput {summary['throughput']:.2f} reruns/s",
+             f"RSS mean {summary['rss_mb']['mean']:.0f} MB  max {summary['rss_mb']['max']:.0f} MB",
+             f"{'interaction':<12} {'count':>6}" + ''.join(f"{f'p{p} (s)':>10}" for p in PERCENTILES) + f"{'max (s)':>10}"]
+
+    rows = [('all', summary['latency'])] + list(summary['latency_by_kind'].items())
+    for kind, latency in rows:
+        if latency:
+            lines.append(f"{kind:<12} {latency['count']:>6}" + ''.join(f"{latency[f'p{p}']:>10.3f}" for p in PERCENTILES)
+                         + f"{latency['max']:>10.3f}")
+
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Load test dashboard dengan banyak session bersamaan.')
+    parser.add_argument('--sessions', type=int, default=8, help='jumlah session bersamaan')
+    parser.add_argument('--interactions', type=int, default=20, help='jumlah interaksi per session')
+    parser.add_argument('--pages', nargs='*', help='pilihan Navigation Menu yang dipakai (default semua)')
+    parser.add_argument('--think-time', type=float, default=0.0, help='rata-rata jeda antar interaksi (detik)')
+    parser.add_argument('--scale', type=float, help='pakai dataset sintetis benchmark dengan skala ini')
+    parser.add_argument('--seed', type=int, default=0, help='seed urutan interaksi')
+    parser.add_argument('--no-warmup', action='store_true', help='tidak mengisi cache sebelum pengukuran')
+    parser.add_argument('--output', help='file JSON tujuan ringkasan dan records')
+    args = parser.parse_args()
+
+    root = prepare_dataset(args.scale) if args.scale else os.getcwd()
+
+    result = run_load_test(root, args.sessions, args.interactions, args.pages, args.think_time,
+                           args.seed, not args.no_warmup)
+    summary = summarize(result)
+
+    print(format_summary(summary))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'sessions': args.sessions, 'interactions': args.interactions, 'cpu_count': os.cpu_count(),
+                       'summary': summary, 'records': result['records']}, file, indent=2)
@@ -0,0 +1,126 @@
+"""
+Renderer peta titik (customer/seller) dalam bentuk raster kepadatan.
+
+Poin-poin dibagi ke grid 2D beresolusi tetap per warna state dengan satu np.bincount, lalu setiap
+sel grid diberi warna state yang paling banyak poinnya dan transparansi sesuai jumlah poin.
+Grid tersebut digambar sebagai satu layer gambar (imshow) di atas peta dasar, sehingga waktu
+render tidak bergantung pada jumlah poin. Untuk poin yang sedikit (<= POINT_LIMIT) tiap poin
+tetap digambar sebagai marker seperti sebelumnya.
+"""
+
+import numpy as np
+import pandas as pd
+from matplotlib import cm
+from matplotlib.colors import ListedColormap, Normalize
+from matplotlib.lines import Line2D
+
+
+POINT_LIMIT = 5000
+
+RASTER_WIDTH = 250
+
+### Warna setiap kategori (sama seperti plot kolom kategorikal GeoPandas)
+def category_colors(values: pd.Series, colors_map: list) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan kategori, kode kategori setiap poin, dan warna RGBA setiap
+    kategori dengan pemetaan yang sama seperti GeoDataFrame.plot(column=..., cmap=ListedColormap(colors_map)).
+
+    Returns:
+        tuple(categories, codes, colors)
+    """
+
+    cat = pd.Categorical(values)
+    categories = list(cat.categories)
+
+    norm = Normalize(vmin=0, vmax=len(categories) - 1)
+    colors = cm.ScalarMappable(norm=norm, cmap=ListedColormap(colors_map)).to_rgba(np.arange(len(categories)))
+
+    return categories, cat.codes, colors
+
+### Raster kepadatan poin
+def rasterize_points(x: np.ndarray, y: np.ndarray, codes: np.ndarray, colors: np.ndarray,
+                     extent: tuple, width: int = RASTER_WIDTH, aspect: float = 1.0) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan gambar RGBA (origin di kiri bawah) dari poin-poin.
+
+    Parameters:
+        x, y (numpy array): koordinat poin
+        codes (numpy array): indeks warna setiap poin (-1 diabaikan)
+        colors (numpy array): warna RGBA setiap kode, shape (n_colors, 4)
+        extent (tuple): (xmin, xmax, ymin, ymax) area grid
+        width (int): jumlah kolom grid
+        aspect (float): rasio tinggi/lebar satu satuan y terhadap x pada axis (agar piksel persegi)
+
+    Returns:
+        numpy array dengan shape (height, width, 4)
+    """
+
+    xmin, xmax, ymin, ymax = extent
+    height = max(1, int(round(width * (ymax - ymin) * aspect / (xmax - xmin))))
+    n_colors = len(colors)
+
+    ix = np.floor((x - xmin) / (xmax - xmin) * width).astype(np.int64)
+    iy = np.floor((y - ymin) / (ymax - ymin) * height).astype(np.int64)
+    inside = (ix >= 0) & (ix < width) & (iy >= 0) & (iy < height) & (codes >= 0)
+
+    key = (codes[inside].astype(np.int64) * height + iy[inside]) * width + ix[inside]
+    counts = np.bincount(key, minlength=n_colors * height * width).reshape(n_colors, height, width)
+
+    total = counts.sum(axis=0)
+    dominant = counts.argmax(axis=0)
+
+    image = np.asarray(colors, dtype=np.float64)[dominant]
+    if total.max() > 0:
+        image[..., 3] = np.where(total > 0, 0.6 + 0.4 * np.log1p(total) / np.log1p(total.max()), 0.0)
+    else:
+        image[..., 3] = 0.0
+
+    return image
+
+### Menggambar poin pada peta
+def plot_points(axis, df_geo_point, column: str, colors_map: list,
+                point_limit: int = POINT_LIMIT, markersize: float = 5) -> None:
+
+    """
+    Fungsi ini bertujuan untuk menggambar poin df_geo_point yang diwarnai berdasarkan column di atas axis.
+    Jika jumlah poin <= point_limit setiap poin digambar sebagai marker, selain itu poin digambar
+    sebagai raster kepadatan dengan legend yang sama.
+
+    Parameters:
+        axis (matplotlib Axes): axis peta dasar
+        df_geo_point (GeoPandas DataFrame): poin-poin yang digambar
+        column (str): kolom kategori warna, misalnya 'customer_state'
+        colors_map (list): list warna
+        point_limit (int): batas jumlah poin untuk mode per poin
+        markersize (float): ukuran marker pada mode per poin
+    """
+
+    # Kategori yang tidak muncul dibuang: warnanya sama seperti kolom object, dan GeoPandas
+    # tidak perlu memplot grup kosong (gagal jika ada markersize)
+    if isinstance(df_geo_point[column].dtype, pd.CategoricalDtype):
+        df_geo_point = df_geo_point.assign(**{column: df_geo_point[column].cat.remove_unused_categories()})
+
+    if len(df_geo_point) <= point_limit:
+        df_geo_point.sort_values(by=column, ascending=True).plot(ax=axis, column=column, cmap=ListedColormap(colors_map),
+                                                                  markersize=markersize, legend=True)
+        return
+
+    categories, codes, colors = category_colors(df_geo_point[column], colors_map)
+
+    xlim, ylim = axis.get_xlim(), axis.get_ylim()
+    aspect = axis.get_aspect()
+    aspect = aspect if isinstance(aspect, (int, float)) else 1.0
+
+    extent = (xlim[0], xlim[1], ylim[0], ylim[1])
+    image = rasterize_points(df_geo_point.geometry.x.to_numpy(), df_geo_point.geometry.y.to_numpy(),
+                             np.asarray(codes), colors, extent, aspect=aspect)
+
+    axis.imshow(image, extent=extent, origin='lower', interpolation='nearest', aspect=axis.get_aspect(), zorder=2)
+    axis.set_xlim(xlim)
+    axis.set_ylim(ylim)
+
+    handles = [Line2D([0], [0], linestyle='none', marker='o', markersize=10, markerfacecolor=color,
+                      markeredgewidth=0, alpha=1) for color in colors]
+    axis.legend(handles, categories, numpoints=1)
@@ -0,0 +1,216 @@
+"""
+Sketch kuantil (median, p90, p95, ...) price, freight_value, dan nilai order per hari yang bisa di-merge.
+
+Setiap nilai dimasukkan ke bucket logaritmik (gaya DDSketch): bucket i memuat nilai pada
+(MIN_VALUE * GAMMA**(i - 1), MIN_VALUE * GAMMA**i] dan diwakili satu nilai yang error relatifnya
+paling besar QUANTILE_ACCURACY terhadap semua nilai di dalam bucket tersebut. Sketch dua rentang
+digabung cukup dengan menjumlahkan count per bucket.
+
+Count per (kelompok, bucket, hari) disimpan seperti cube harian: key = sel * n_days + hari (sel =
+kelompok * N_BUCKETS + bucket) yang terurut dengan jumlah kumulatifnya. Count setiap sel pada rentang
+[start_date, end_date] didapat dari selisih dua prefix sum, sehingga waktu query hanya bergantung
+pada jumlah sel yang terisi, bukan pada panjang rentang atau jumlah order item.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard.cube import day_index
+
+
+## Error relatif maksimum nilai kuantil terhadap nilai sebenarnya pada rank yang sama
+QUANTILE_ACCURACY = 0.01
+
+GAMMA = (1 + QUANTILE_ACCURACY) / (1 - QUANTILE_ACCURACY)
+
+## Nilai sampai MIN_VALUE (BRL) masuk ke bucket 0 dan diwakili 0
+MIN_VALUE = 0.01
+
+## Bucket terakhir (sekitar 7.7 juta BRL) juga memuat semua nilai yang lebih besar
+N_BUCKETS = 1024
+
+## Kuantil box chart: whisker P5 dan P95, box P25 sampai P75
+BOX_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+### Sketch yang dipakai dashboard: kolom df_fact, kelompok baris, dan kolom pengelompokan
+# order_value adalah total payment_value per order (satu nilai per order pada tanggal pembeliannya)
+QUANTILE_MEASURES = {
+    'price': {'measure': 'price', 'group': 'kelompok_seller', 'by': ('seller_state', 'product_category_name')},
+    'freight_value': {'measure': 'freight_value', 'group': 'kelompok_seller', 'by': ('seller_state', 'product_category_name')},
+    'order_value': {'measure': 'payment_value', 'group': 'kelompok_customer', 'by': ('customer_state',)},
+}
+
+### Indeks bucket dan nilai wakilnya
+def bucket_index(values: np.ndarray) -> np.ndarray:
+
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        index = np.ceil(np.log(values / MIN_VALUE) / np.log(GAMMA))
+
+    return np.clip(np.where(values > MIN_VALUE, index, 0), 0, N_BUCKETS - 1).astype(np.int64)
+
+def bucket_value(index: np.ndarray) -> np.ndarray:
+
+    # Nilai dengan error relatif yang sama (QUANTILE_ACCURACY) terhadap kedua batas bucket
+    index = np.asarray(index, dtype=np.int64)
+
+    return np.where(index > 0, 2 * MIN_VALUE * np.power(GAMMA, index) / (GAMMA + 1), 0.0)
+
+### Menyusun prefix sum count per (sel, hari)
+def build_quantile_sketch(group: np.ndarray, day: np.ndarray, bucket: np.ndarray,
+                          groups: pd.Index, day0: pd.Timestamp, n_days: int) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghitung count per (kelompok, bucket, hari) lalu menyimpannya
+    sebagai prefix sum terurut berdasarkan key = (kelompok * N_BUCKETS + bucket) * n_days + hari.
+
+    Returns:
+        quantile_sketch (dict): dict berisi key, cumsum, cells, groups, day0, dan n_days
+    """
+
+    key = np.sort((group.astype(np.int64) * N_BUCKETS + bucket) * n_days + day)
+    first = np.append(True, key[1:] != key[:-1]) if len(key) else np.zeros(0, dtype=bool)
+    counts = np.diff(np.append(np.flatnonzero(first), len(key)))
+    key = key[first]
+
+    cells = key // n_days
+
+    return {
+        'key': key,
+        'cumsum': np.append(0, np.cumsum(counts)),
+        'cells': cells[np.append(True, cells[1:] != cells[:-1])] if len(cells) else cells,
+        'groups': groups,
+        'day0': day0,
+        'n_days': n_days,
+    }
+
+### Mendapatkan quantile sketch
+def create_quantile_sketches(df_fact: pd.DataFrame, name: str) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan sketch kuantil QUANTILE_MEASURES[name] dari df_fact,
+    untuk keseluruhan dan untuk setiap kolom pengelompokan.
+
+    Parameters:
+        df_fact (pandas DataFrame): Data Frame df_fact (belum difilter tanggal)
+        name (str): 'price', 'freight_value', atau 'order_value'
+
+    Returns:
+        quantile_sketches (dict): {None atau kolom pengelompokan: quantile sketch}
+    """
+
+    spec = QUANTILE_MEASURES[name]
+
+    day0 = df_fact['order_purchase_timestamp'].min().normalize()
+    n_days = int(((df_fact['order_purchase_timestamp'].max() - day0) // pd.Timedelta(days=1))) + 1 if len(df_fact) else 1
+
+    df_temp = df_fact[df_fact[spec['group']].to_numpy() & df_fact[spec['measure']].notna().to_numpy()]
+    values = df_temp[spec['measure']].to_numpy(dtype=np.float64)
+
+    if name == 'order_value':
+        # df_fact terurut berdasarkan waktu, baris pertama setiap order mewakili order tersebut
+        values = df_temp.groupby('order_id', sort=False, observed=True)[spec['measure']].sum().to_numpy(dtype=np.float64)
+        df_temp = df_temp[~df_temp['order_id'].duplicated().to_numpy()]
+
+    day = ((df_temp['order_purchase_timestamp'] - day0) // pd.Timedelta(days=1)).to_numpy(dtype=np.int64)
+    bucket = bucket_index(values)
+
+    quantile_sketches = {None: build_quantile_sketch(np.zeros(len(day), dtype=np.int64), day, bucket,
+                                                     pd.Index([None]), day0, n_days)}
+
+    for by in spec['by']:
+        codes = df_temp[by].cat.codes.to_numpy().astype(np.int64)
+        valid = codes >= 0
+        quantile_sketches[by] = build_quantile_sketch(codes[valid], day[valid], bucket[valid],
+                                                      df_temp[by].cat.categories, day0, n_days)
+
+    return quantile_sketches
+
+### Kuantil dari count per sel
+def cell_quantiles(cells: np.ndarray, counts: np.ndarray, n_groups: int, quantiles: tuple) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk menghitung kuantil setiap kelompok dari count per sel (terurut
+    berdasarkan kelompok lalu bucket). Kuantil q adalah nilai wakil bucket yang memuat nilai terkecil
+    x dengan proporsi nilai <= x minimal q (rank ceil(q * n) - 1 dari 0), sama seperti
+    np.quantile(method='inverted_cdf').
+
+    Returns:
+        tuple(values, totals): numpy array (n_groups, len(quantiles)) dengan NaN untuk kelompok
+        tanpa nilai, dan jumlah nilai per kelompok
+    """
+
+    group = cells // N_BUCKETS
+    totals = np.bincount(group, weights=counts, minlength=n_groups)[:n_groups]
+    group_start = np.cumsum(totals) - totals
+
+    rank = group_start[:, None] + np.maximum(np.ceil(np.asarray(quantiles) * totals[:, None]) - 1, 0)
+    position = np.searchsorted(np.cumsum(counts), rank, side='right')
+
+    values = bucket_value(cells[np.minimum(position, max(len(cells) - 1, 0))] % N_BUCKETS) if len(cells) else np.zeros(rank.shape)
+
+    return np.where(totals[:, None] > 0, values, np.nan), totals
+
+### Count per sel pada rentang tanggal
+def range_counts(quantile_sketch: dict, start_date, end_date, cells: np.ndarray = None) -> np.ndarray:
+
+    cells = quantile_sketch['cells'] if cells is None else cells
+    n_days = quantile_sketch['n_days']
+
+    # [first, last) dalam indeks hari, kedua tanggal inklusif
+    first = day_index(quantile_sketch, start_date)
+    last = min(day_index(quantile_sketch, end_date) + 1, n_days)
+
+    lower = np.searchsorted(quantile_sketch['key'], cells * n_days + first, side='left')
+    upper = np.searchsorted(quantile_sketch['key'], cells * n_days + max(first, last), side='left')
+
+    return (quantile_sketch['cumsum'][upper] - quantile_sketch['cumsum'][lower]).astype(np.float64)
+
+### Kuantil pada rentang tanggal
+def query_quantiles(quantile_sketch: dict, start_date, end_date, quantiles: tuple = (0.5, 0.9, 0.95),
+                    group=None) -> pd.Series:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan kuantil pada rentang [start_date, end_date] (kedua tanggal
+    inklusif), keseluruhan atau pada satu kelompok. Error relatif setiap kuantil paling besar
+    QUANTILE_ACCURACY terhadap nilai sebenarnya pada rank yang sama.
+
+    Parameters:
+        quantile_sketch (dict): salah satu hasil create_quantile_sketches
+        start_date (date): tanggal awal
+        end_date (date): tanggal akhir
+        quantiles (tuple): kuantil antara 0 dan 1
+        group (str): kelompok (misalnya state), None untuk sketch keseluruhan
+
+    Returns:
+        pandas Series yang diindeks oleh kuantil, NaN jika tidak ada nilai pada rentang tersebut
+    """
+
+    code = 0 if group is None else quantile_sketch['groups'].get_loc(group)
+
+    # Sel satu kelompok berada pada posisi yang berurutan
+    cells = quantile_sketch['cells']
+    cells = cells[np.searchsorted(cells, code * N_BUCKETS):np.searchsorted(cells, (code + 1) * N_BUCKETS)]
+
+    values, _ = cell_quantiles(cells % N_BUCKETS, range_counts(quantile_sketch, start_date, end_date, cells), 1, quantiles)
+
+    return pd.Series(values[0], index=pd.Index(quantiles, name='quantile'))
+
+def query_quantiles_by(quantile_sketch: dict, start_date, end_date, quantiles: tuple = BOX_QUANTILES) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan kuantil setiap kelompok pada rentang [start_date, end_date],
+    seperti query_quantiles untuk setiap kelompok.
+
+    Returns:
+        pandas DataFrame yang diindeks oleh kelompok, satu kolom per kuantil dan kolom count,
+        kelompok tanpa nilai bernilai NaN dengan count 0
+    """
+
+    values, totals = cell_quantiles(quantile_sketch['cells'], range_counts(quantile_sketch, start_date, end_date),
+                                    len(quantile_sketch['groups']), quantiles)
+
+    result = pd.DataFrame(values, index=quantile_sketch['groups'], columns=list(quantiles))
+    result['count'] = totals.astype(np.int64)
+
+    return result
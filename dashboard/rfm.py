@@ -0,0 +1,167 @@
+"""
+Analisis RFM (Recency, Frequency, Monetary) untuk beberapa periode sekaligus.
+
+Recency dihitung dalam hari (integer) dari tanggal shipping terakhir, frequency dari jumlah item,
+dan monetary dari total payment order. Setiap baris diberi indeks bucket periode (misalnya <= 30,
+<= 60, <= 90 hari) lalu dijumlahkan per order dengan satu bincount dan jumlah kumulatif antar bucket,
+sehingga hasil 30, 60, dan 90 hari didapat dalam satu kali proses. Skor dan klaster prioritas
+dihitung dengan np.digitize dan np.select tanpa apply per baris.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+RFM_PERIODS = (30, 60, 90)
+
+RFM_CLUSTERS = np.array(['1st Priority', '2nd Priority', '3rd Priority'])
+
+# Tanggal shipping yang tidak wajar pada data Olist
+SHIPPING_OUTLIERS = ('2020-02-03', '2020-04-09')
+
+### Mendapatkan indeks bucket periode
+def period_buckets(age_days: np.ndarray, periods: tuple) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk memberi indeks bucket k pada setiap umur (hari) sehingga
+    umur <= periods[j] untuk semua j >= k. Umur yang lebih dari periode terpanjang mendapat len(periods).
+    """
+
+    return np.searchsorted(np.asarray(periods, dtype=np.float64), age_days, side='left')
+
+### Menjumlahkan nilai per order untuk semua periode
+def cumulative_by_period(order: np.ndarray, bucket: np.ndarray, weights: np.ndarray,
+                         n_orders: int, n_periods: int) -> np.ndarray:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan jumlah weights per order untuk setiap periode.
+
+    Returns:
+        numpy array dengan shape (n_orders, n_periods), kolom k berisi jumlah untuk umur <= periods[k]
+    """
+
+    n_buckets = n_periods + 1
+    totals = np.bincount(order * n_buckets + bucket, weights=weights, minlength=n_orders * n_buckets)
+
+    return totals.reshape(n_orders, n_buckets)[:, :n_periods].cumsum(axis=1)
+
+### Skor dan klaster RFM
+def score_rfm(recency: np.ndarray, frequency: np.ndarray, monetary: np.ndarray, period: int) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghitung skor recency, frequency, monetary dan klaster prioritas.
+
+    Parameters:
+        recency (numpy array): recency dalam hari
+        frequency (numpy array): jumlah item
+        monetary (numpy array): total payment
+        period (int): panjang periode dalam hari
+
+    Returns:
+        dict berisi score_rec, score_freq, score_monet, dan klaster_rfm_score
+    """
+
+    scale = period / 30
+    m = monetary.max() / 3 if len(monetary) else 0.0
+
+    score_freq = np.digitize(frequency, [2, 3]) + 1
+    score_rec = 3 - np.digitize(recency, [20 * scale, 26 * scale])
+    score_monet = np.digitize(monetary, [m * scale, 1.25 * m * scale, 1.75 * m * scale]) + 2
+
+    # Jumlah dimensi dengan skor tinggi
+    high_scores = (score_freq >= 2).astype(int) + (score_rec >= 2) + (score_monet > 2)
+    klaster = np.select([high_scores >= 2, high_scores == 1], [0, 1], default=2)
+
+    return {
+        'score_rec': score_rec,
+        'score_freq': score_freq,
+        'score_monet': score_monet,
+        'klaster_rfm_score': RFM_CLUSTERS[klaster],
+    }
+
+### Mendapatkan hasil RFM untuk semua periode
+def create_rfm(df_fact: pd.DataFrame, periods: tuple = RFM_PERIODS) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan analisis RFM untuk setiap periode pada periods.
+
+    Recency dan frequency dihitung dari item kelompok_seller berdasarkan tanggal shipping
+    (hari ini = tanggal shipping terakhir), monetary dari order kelompok_customer berdasarkan
+    waktu pembelian. Order yang masuk ke analisis adalah order yang ada di kedua sisi.
+
+    Parameters:
+        df_fact (pandas DataFrame): Data Frame df_fact yang sudah difilter
+        periods (tuple): panjang periode dalam hari
+
+    Returns:
+        rfm (dict): {'today': Period hari ini, periode: {'recency', 'frequency', 'monetary', 'df_rfm'}}
+    """
+
+    periods = tuple(sorted(periods))
+    n_periods = len(periods)
+
+    # Sisi item (recency dan frequency)
+    df_item = df_fact[df_fact['kelompok_seller']]
+    day = df_item['shipping_limit_date'].dt.normalize()
+    keep = ~day.isin(pd.to_datetime(list(SHIPPING_OUTLIERS))).to_numpy()
+    day = day.to_numpy()[keep]
+    item_order = df_item['order_id'].to_numpy()[keep]
+
+    # Sisi order (monetary)
+    df_buyer = df_fact[df_fact['kelompok_customer'] & df_fact['customer_state'].notna()]
+    buyer_order = df_buyer['order_id'].to_numpy()
+    purchase = df_buyer['order_purchase_timestamp'].to_numpy()
+
+    today = day.max() if len(day) else None
+    rfm = {'today': pd.Period(today, freq='D') if today is not None else None}
+
+    n_orders = int(max(item_order.max(initial=-1), buyer_order.max(initial=-1))) + 1
+
+    recency = ((today - day) // np.timedelta64(1, 'D')).astype(np.int64) if today is not None else np.zeros(0, np.int64)
+    item_bucket = period_buckets(recency, periods)
+
+    frequency = cumulative_by_period(item_order, item_bucket, None, n_orders, n_periods)
+    recency_sum = cumulative_by_period(item_order, item_bucket, recency, n_orders, n_periods)
+
+    # Recency per order adalah shipping paling baru pada order tersebut
+    last_recency = np.full(n_orders, np.iinfo(np.int64).max)
+    np.minimum.at(last_recency, item_order, recency)
+
+    payment = np.bincount(buyer_order, weights=df_buyer['payment_value'].to_numpy(), minlength=n_orders)
+
+    order_time = np.full(n_orders, np.datetime64('NaT'), dtype=purchase.dtype)
+    order_time[buyer_order[::-1]] = purchase[::-1]
+    has_payment = np.bincount(buyer_order, minlength=n_orders) > 0
+
+    age = (purchase.max() - order_time) / np.timedelta64(1, 'D') if len(purchase) else np.zeros(n_orders)
+    order_bucket = np.where(has_payment, period_buckets(age, periods), n_periods)
+
+    for k, period in enumerate(periods):
+
+        in_item_window = frequency[:, k] > 0
+        in_monet_window = order_bucket <= k
+
+        order_id = np.flatnonzero(in_item_window & in_monet_window)
+
+        df_rfm = pd.DataFrame({
+            'order_id': order_id.astype(np.int32),
+            'recency': last_recency[order_id],
+            'frequency': frequency[order_id, k].astype(np.int64),
+            'monetary': payment[order_id],
+        })
+        df_rfm = df_rfm.assign(**score_rfm(df_rfm['recency'].to_numpy(),
+                                           df_rfm['frequency'].to_numpy(),
+                                           df_rfm['monetary'].to_numpy(),
+                                           period))
+        df_rfm = df_rfm.sort_values(by='klaster_rfm_score', kind='stable').reset_index(drop=True)
+
+        n_items = frequency[:, k].sum()
+
+        rfm[period] = {
+            'recency': recency_sum[:, k].sum() / n_items if n_items else 0.0,
+            'frequency': n_items / in_item_window.sum() if n_items else 0.0,
+            'monetary': payment[in_monet_window].mean() if in_monet_window.any() else 0.0,
+            'df_rfm': df_rfm,
+        }
+
+    return rfm
@@ -0,0 +1,191 @@
+"""
+Dataset bersama (memory-mapped) untuk beberapa proses server Streamlit pada satu host.
+
+st.cache_resource hanya berlaku di dalam satu proses, sehingga setiap proses server biasanya
+membaca dan menyimpan salinan tabelnya sendiri. Modul ini mem-publish tabel dasar (kolom ID
+sudah di-encode menjadi int32) sekali sebagai file Arrow IPC tanpa kompresi, label ID dan array
+lookup zip prefix sebagai file .npy. Setiap proses lalu memetakan file-file tersebut read-only:
+kolom numerik, datetime, dan categorical dipakai langsung dari page cache tanpa disalin, sehingga
+proses server tambahan hampir tidak menambah RSS untuk data.
+
+Dataset disimpan per versi (hash dari ukuran dan waktu modifikasi file sumber) di dalam folder
+bersama, sehingga data yang berubah di-publish ke folder versi baru tanpa mengganggu proses yang
+masih memetakan versi lama. Publish dijalankan sekali dengan:
+
+    python -m dashboard.shared /dev/shm/olist-dashboard
+
+atau otomatis oleh proses server pertama yang tidak menemukan versi terbaru.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import shapely
+
+from dashboard.encoding import encode_ids
+from dashboard.geodata import GEO_DIR, brazil_path, create_zip_lookup, load_brazil
+from dashboard.store import DATA_DIR, PARQUET_DIR, TABLES, csv_path, load_tables, parquet_path
+
+
+SHARED_DATA_DIR = os.environ.get('SHARED_DATA_DIR', '')
+
+## Naikkan jika format file dataset bersama berubah
+FORMAT_VERSION = 1
+
+## Array zip_lookup yang di-publish, geometry (objek shapely) diganti koordinatnya
+ZIP_LOOKUP_ARRAYS = ('lat', 'lng', 'state_code', 'valid', 'valid_customer', 'point_xy')
+
+MANIFEST = 'manifest.json'
+
+### Versi dataset dari file sumber
+def dataset_version(data_dir: str = DATA_DIR, parquet_dir: str = PARQUET_DIR, geo_dir: str = GEO_DIR) -> str:
+
+    """
+    Fungsi ini bertujuan untuk menghitung versi dataset dari ukuran dan waktu modifikasi file CSV,
+    Parquet, dan peta Brazil. Versi berubah setiap kali salah satu file sumber berubah.
+
+    Returns:
+        version (str): hash 16 karakter
+    """
+
+    paths = [path for name in TABLES for path in (csv_path(name, data_dir), parquet_path(name, parquet_dir))]
+    paths.append(brazil_path(geo_dir))
+
+    digest = hashlib.sha1(f'format {FORMAT_VERSION}'.encode())
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f'{os.path.abspath(path)} {stat.st_size} {stat.st_mtime_ns}\n'.encode())
+
+    return digest.hexdigest()[:16]
+
+### Menulis dan membaca tabel Arrow IPC
+def write_arrow(data_frame: pd.DataFrame, path: str) -> None:
+
+    # Kolom float ditulis dari array numpy agar NaN tetap NaN (bukan null) dan bisa dipakai tanpa disalin
+    arrays = [pa.array(data_frame[col].to_numpy()) if data_frame[col].dtype.kind in 'biuf' else pa.array(data_frame[col])
+              for col in data_frame.columns]
+    table = pa.table(arrays, names=list(data_frame.columns))
+
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def read_arrow(path: str) -> pd.DataFrame:
+
+    # split_blocks mencegah pandas menggabungkan kolom (yang berarti menyalin), kolom string tetap
+    # berupa array Arrow di atas file yang dipetakan
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+    return table.to_pandas(split_blocks=True, types_mapper={pa.string(): pd.StringDtype('pyarrow'),
+                                                            pa.large_string(): pd.StringDtype('pyarrow')}.get)
+
+### Publish dataset bersama
+def publish_dataset(shared_dir: str = SHARED_DATA_DIR,
+                    data_dir: str = DATA_DIR,
+                    parquet_dir: str = PARQUET_DIR,
+                    geo_dir: str = GEO_DIR) -> str:
+
+    """
+    Fungsi ini bertujuan untuk mem-publish tabel dasar yang sudah di-encode, label ID, dan lookup zip
+    prefix ke folder versi di dalam shared_dir. Jika versi terbaru sudah ada, tidak ada yang ditulis.
+
+    File ditulis ke folder sementara lalu di-rename, sehingga beberapa proses yang mem-publish
+    bersamaan tidak pernah memetakan dataset yang belum lengkap.
+
+    Parameters:
+        shared_dir (str): folder bersama, sebaiknya di tmpfs (misalnya /dev/shm) atau disk lokal
+        data_dir (str): folder tempat file CSV berada
+        parquet_dir (str): folder tempat file Parquet berada
+        geo_dir (str): folder bundle peta
+
+    Returns:
+        dataset_dir (str): folder versi dataset
+    """
+
+    dataset_dir = os.path.join(shared_dir, dataset_version(data_dir, parquet_dir, geo_dir))
+    if os.path.exists(os.path.join(dataset_dir, MANIFEST)):
+        return dataset_dir
+
+    tables, id_labels = encode_ids(load_tables(data_dir, parquet_dir, categorical=True))
+    zip_lookup = create_zip_lookup(tables[list(TABLES).index('df_geolocation')], load_brazil(geo_dir).geometry)
+
+    os.makedirs(shared_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix='.publish-', dir=shared_dir)
+
+    try:
+        for name, data_frame in zip(TABLES, tables):
+            write_arrow(data_frame, os.path.join(staging_dir, f'{name}.arrow'))
+
+        # Label ID sebagai string lebar tetap agar bisa dipetakan dan di-index seperti array object
+        for col, labels in id_labels.items():
+            np.save(os.path.join(staging_dir, f'id_{col}.npy'), labels.astype(str))
+
+        valid = zip_lookup['valid']
+        zip_lookup['point_xy'] = np.full((len(valid), 2), np.nan)
+        zip_lookup['point_xy'][valid] = shapely.get_coordinates(zip_lookup['geometry'][valid])
+        for key in ZIP_LOOKUP_ARRAYS:
+            np.save(os.path.join(staging_dir, f'zip_{key}.npy'), zip_lookup[key])
+
+        with open(os.path.join(staging_dir, MANIFEST), 'w', encoding='utf-8') as file:
+            json.dump({'format': FORMAT_VERSION, 'tables': list(TABLES), 'id_columns': list(id_labels)}, file)
+
+        os.chmod(staging_dir, 0o755)
+        os.rename(staging_dir, dataset_dir)
+    except OSError:
+        # Proses lain sudah mem-publish versi yang sama lebih dulu
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        if not os.path.exists(os.path.join(dataset_dir, MANIFEST)):
+            raise
+
+    return dataset_dir
+
+### Memetakan dataset bersama
+def open_tables(dataset_dir: str) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk memetakan tabel dan label ID dari folder versi dataset secara read-only.
+
+    Parameters:
+        dataset_dir (str): hasil publish_dataset
+
+    Returns:
+        tuple(tables, id_labels): sama seperti encode_ids(load_tables(categorical=True)),
+        dengan array read-only di atas file yang dipetakan
+    """
+
+    with open(os.path.join(dataset_dir, MANIFEST), encoding='utf-8') as file:
+        manifest = json.load(file)
+
+    tables = tuple(read_arrow(os.path.join(dataset_dir, f'{name}.arrow')) for name in manifest['tables'])
+    id_labels = {col: np.load(os.path.join(dataset_dir, f'id_{col}.npy'), mmap_mode='r')
+                 for col in manifest['id_columns']}
+
+    return tables, id_labels
+
+def open_zip_lookup(dataset_dir: str) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk memetakan array lookup zip prefix secara read-only. Lookup tidak
+    memuat geometry, lookup_zip membuat poin dari point_xy hanya untuk baris yang diminta.
+
+    Returns:
+        zip_lookup (dict): array lat, lng, state_code, valid, valid_customer, dan point_xy
+    """
+
+    return {key: np.load(os.path.join(dataset_dir, f'zip_{key}.npy'), mmap_mode='r') for key in ZIP_LOOKUP_ARRAYS}
+
+
+if __name__ == '__main__':
+
+    shared_dir = sys.argv[1] if len(sys.argv) > 1 else SHARED_DATA_DIR
+    if not shared_dir:
+        sys.exit('usage: python -m dashboard.shared SHARED_DIR (atau environment variable SHARED_DATA_DIR)')
+
+    print(publish_dataset(shared_dir))
@@ -0,0 +1,577 @@
+"""
+Backend agregasi dengan engine SQL in-process (DuckDB) yang membaca file data secara langsung.
+
+Alternatif dari jalur pandas (df_fact + cube harian) yang tetap menjadi implementasi referensi.
+Saat engine dibuat, DuckDB membaca file Parquet (atau CSV) dan menyusun tabel fakta order-item yang
+sama seperti fact.create_df_fact di dalam storage kolumnarnya sendiri: filter status order
+(kelompok_seller / kelompok_customer) diterapkan pada scan df_order, ID hex diganti kode int32
+encode_ids, dan baris diurutkan berdasarkan waktu pembelian. Setiap query lalu hanya membaca row group
+pada rentang tanggal yang dipilih, diagregasi multi-thread, dan mengembalikan hasil yang kecil: pivot
+seller dan order, total dan deret bulanan (pengganti cube.query_totals / cube.query_monthly), jumlah
+item per kategori, kuantil, dan input RFM per order.
+
+Backend dipilih dengan environment variable QUERY_BACKEND ('pandas' atau 'duckdb'). DuckDB adalah
+dependency opsional (pip install duckdb), jika belum terpasang dashboard tetap memakai pandas.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from dashboard.cube import CUBE_MEASURES, to_measure_frame
+from dashboard.fact import STATUS_SELLER, STATUS_CUSTOMER
+from dashboard.rfm import RFM_PERIODS, SHIPPING_OUTLIERS, score_rfm
+from dashboard.encoding import ID_COLUMNS
+from dashboard.leaderboard import LEADERBOARDS
+from dashboard.quantile import QUANTILE_MEASURES
+from dashboard.store import DATA_DIR, PARQUET_DIR, TABLES, csv_path, parquet_path
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+
+QUERY_BACKENDS = ('pandas', 'duckdb')
+
+## Tabel yang dibaca oleh engine (df_geolocation hanya dipakai untuk peta)
+SQL_TABLES = ('df_customer', 'df_order', 'df_order_items', 'df_order_payments', 'df_product', 'df_sellers')
+
+## Kolom categorical dashboard, disimpan sebagai ENUM dengan label dari tabel di memori agar hasil query
+## berupa pandas Categorical dengan kategori yang sama seperti jalur pandas
+CATEGORY_COLUMNS = ('order_status', 'product_category_name', 'seller_city', 'seller_state', 'customer_city', 'customer_state')
+
+### Backend yang dipakai
+def query_backend() -> str:
+
+    """
+    Fungsi ini bertujuan untuk membaca backend agregasi dari environment variable QUERY_BACKEND.
+    Jika 'duckdb' dipilih tetapi DuckDB belum terpasang, dipakai 'pandas'.
+
+    Returns:
+        backend (str): 'pandas' atau 'duckdb'
+    """
+
+    backend = os.environ.get('QUERY_BACKEND', 'pandas').lower()
+    if backend not in QUERY_BACKENDS:
+        raise ValueError(f'QUERY_BACKEND harus salah satu dari {QUERY_BACKENDS}, bukan {backend!r}')
+
+    if backend == 'duckdb' and duckdb is None:
+        return 'pandas'
+
+    return backend
+
+### Literal SQL
+def _quote(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _status_list(statuses) -> str:
+    return ', '.join(_quote(status) for status in statuses)
+
+### Sumber data setiap tabel
+def table_source(name: str, data_dir: str = DATA_DIR, parquet_dir: str = PARQUET_DIR) -> str:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan ekspresi FROM untuk satu tabel: file Parquet jika ada dan
+    tidak lebih lama dari CSV-nya (aturan yang sama seperti store.load_table), selain itu file CSV.
+    """
+
+    path = parquet_path(name, parquet_dir)
+    source = csv_path(name, data_dir)
+
+    if os.path.exists(path) and (not os.path.exists(source) or os.path.getmtime(path) >= os.path.getmtime(source)):
+        return f'read_parquet({_quote(os.path.abspath(path))})'
+
+    # Kolom ID selalu dibaca sebagai string (ID hex bisa terlihat seperti angka)
+    position = list(TABLES).index(name)
+    types = ', '.join(f'{_quote(col)}: {_quote("VARCHAR")}' for col, positions in ID_COLUMNS.items() if position in positions)
+
+    return f'read_csv({_quote(os.path.abspath(source))}, header = true, quote = {_quote(chr(34))}, escape = {_quote(chr(34))}, types = {{{types}}})'
+
+### Tabel fakta (sekali per engine)
+# Sama seperti fact.create_df_fact, tetapi hanya baris kelompok_seller / kelompok_customer (filter status
+# diterapkan pada scan df_order), kolom ID berupa kode int32 encode_ids, dan terurut berdasarkan waktu pembelian
+FACT_SQL = f"""
+CREATE TABLE fact AS
+WITH orders AS (
+    SELECT order_id, customer_id, order_status, order_purchase_timestamp,
+           order_status IN ({_status_list(STATUS_SELLER)}) AS kelompok_seller,
+           order_status IN ({_status_list(STATUS_CUSTOMER)}) AS kelompok_customer_status
+    FROM df_order
+    WHERE order_status IN ({_status_list(dict.fromkeys(STATUS_SELLER + STATUS_CUSTOMER))})
+),
+payments AS (
+    SELECT order_id, sum(payment_value) AS order_payment
+    FROM df_order_payments
+    GROUP BY order_id
+),
+order_items AS (
+    SELECT order_id, sum(price + freight_value) AS order_value, count(price + freight_value) AS order_items,
+           min(order_item_id) AS first_item_id
+    FROM df_order_items SEMI JOIN orders USING (order_id)
+    GROUP BY order_id
+),
+items AS (
+    SELECT df_order_items.order_id, product_id, seller_id, shipping_limit_date, price, freight_value,
+           price + freight_value AS item_value, order_value, order_items,
+           order_item_id = first_item_id AS first_item
+    FROM df_order_items JOIN order_items ON order_items.order_id = df_order_items.order_id
+)
+SELECT id_order_id.code AS order_id, id_product_id.code AS product_id, id_seller_id.code AS seller_id,
+       items.shipping_limit_date, items.price, items.freight_value,
+       payments.order_payment * CASE WHEN items.order_value > 0 THEN items.item_value / items.order_value
+                                     ELSE 1 / items.order_items END AS payment_value,
+       CAST(df_product.product_category_name AS product_category_name_enum) AS product_category_name,
+       df_sellers.seller_zip_code_prefix,
+       CAST(df_sellers.seller_city AS seller_city_enum) AS seller_city,
+       CAST(df_sellers.seller_state AS seller_state_enum) AS seller_state,
+       id_customer_id.code AS customer_id,
+       CAST(orders.order_status AS order_status_enum) AS order_status,
+       orders.order_purchase_timestamp,
+       df_customer.customer_zip_code_prefix,
+       CAST(df_customer.customer_city AS customer_city_enum) AS customer_city,
+       CAST(df_customer.customer_state AS customer_state_enum) AS customer_state,
+       items.first_item, orders.kelompok_seller,
+       orders.kelompok_customer_status AND payments.order_payment IS NOT NULL AS kelompok_customer
+FROM items
+JOIN orders ON orders.order_id = items.order_id
+JOIN df_product ON df_product.product_id = items.product_id
+LEFT JOIN payments ON payments.order_id = items.order_id
+LEFT JOIN df_sellers ON df_sellers.seller_id = items.seller_id
+LEFT JOIN df_customer ON df_customer.customer_id = orders.customer_id
+JOIN id_order_id ON id_order_id.label = items.order_id
+JOIN id_product_id ON id_product_id.label = items.product_id
+JOIN id_seller_id ON id_seller_id.label = items.seller_id
+JOIN id_customer_id ON id_customer_id.label = orders.customer_id
+ORDER BY orders.order_purchase_timestamp
+"""
+
+## Filter rentang tanggal pada setiap query, dengan urutan waktu pembelian DuckDB melewati row group
+## di luar rentang (zone map) tanpa membaca isinya
+RANGE_SQL = """
+WITH fact AS (
+    SELECT * FROM fact
+    WHERE order_purchase_timestamp >= $start_date AND order_purchase_timestamp < $end_date
+)
+"""
+
+## Measure cube dalam SQL (urutan sama seperti CUBE_MEASURES), satu order dihitung sekali pada item pertamanya
+MEASURES_SQL = """
+    coalesce(sum(price) FILTER (WHERE kelompok_seller), 0) AS price,
+    coalesce(sum(freight_value) FILTER (WHERE kelompok_seller), 0) AS freight_value,
+    count(*) FILTER (WHERE kelompok_seller) AS item_count,
+    coalesce(sum(payment_value) FILTER (WHERE kelompok_customer), 0) AS payment_value,
+    count(*) FILTER (WHERE kelompok_customer AND first_item) AS order_count
+"""
+
+### Engine SQL
+class SqlEngine:
+
+    """
+    Koneksi DuckDB in-memory berisi tabel fakta yang dibaca langsung dari file data, beserta label kolom
+    categorical dashboard. Setiap query memakai cursor sendiri sehingga aman dipanggil dari beberapa
+    session Streamlit sekaligus.
+    """
+
+    def __init__(self, id_labels: dict, categories: dict,
+                 data_dir: str = DATA_DIR, parquet_dir: str = PARQUET_DIR, threads: int = None):
+
+        self.connection = duckdb.connect(':memory:')
+        if threads:
+            self.connection.execute(f'SET threads = {int(threads)}')
+
+        for name in SQL_TABLES:
+            self.connection.execute(f'CREATE TEMP VIEW {name} AS SELECT * FROM {table_source(name, data_dir, parquet_dir)}')
+
+        # Lookup ID hex ke kode int32 yang sama seperti encoding.encode_ids, hanya dipakai saat tabel fakta dibuat
+        for col, labels in id_labels.items():
+            self.connection.register(f'id_{col}', pd.DataFrame({'label': labels, 'code': np.arange(len(labels), dtype=np.int32)}))
+
+        for col in CATEGORY_COLUMNS:
+            self.connection.register(f'labels_{col}', pd.DataFrame({'label': categories[col].astype(str)}))
+            self.connection.execute(f'CREATE TYPE {col}_enum AS ENUM (SELECT label FROM labels_{col})')
+            self.connection.unregister(f'labels_{col}')
+
+        self.connection.execute(FACT_SQL)
+
+        for col in id_labels:
+            self.connection.unregister(f'id_{col}')
+
+        self.n_ids = {col: len(labels) for col, labels in id_labels.items()}
+        self.categories = categories
+
+    def query(self, sql: str, start_date, end_date, parameters: dict = None) -> pd.DataFrame:
+
+        """
+        Menjalankan sql pada tabel fakta yang dibatasi ke rentang [start_date, end_date], kedua tanggal inklusif.
+        """
+
+        parameters = {
+            'start_date': pd.Timestamp(start_date).normalize().to_pydatetime(),
+            'end_date': (pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)).to_pydatetime(),
+            **(parameters or {}),
+        }
+
+        cursor = self.connection.cursor()
+        try:
+            return cursor.execute(RANGE_SQL + sql, parameters).df()
+        finally:
+            cursor.close()
+
+    def codes(self, col: str, values) -> np.ndarray:
+
+        # Label menjadi kode categorical dashboard, NaN dan label yang tidak dikenal menjadi -1
+        return pd.Categorical(values, categories=self.categories[col]).codes.astype(np.int64)
+
+### Membuat engine
+def create_engine(id_labels: dict, categories: dict,
+                  data_dir: str = DATA_DIR, parquet_dir: str = PARQUET_DIR) -> SqlEngine:
+
+    """
+    Fungsi ini bertujuan untuk membuat engine DuckDB dan membaca tabel fakta dari file data.
+
+    Parameters:
+        id_labels (dict): dict hasil encode_ids, ID hex pada file diganti dengan kode int32 yang sama
+        categories (dict): {kolom CATEGORY_COLUMNS: pandas Index label}, label categorical dashboard
+        data_dir (str): folder tempat file CSV berada
+        parquet_dir (str): folder tempat file Parquet berada
+
+    Returns:
+        engine (SqlEngine): engine SQL, jumlah thread bisa dibatasi dengan environment variable DUCKDB_THREADS
+    """
+
+    return SqlEngine(id_labels, categories, data_dir, parquet_dir, os.environ.get('DUCKDB_THREADS'))
+
+### Kondisi WHERE dari filter dimensi
+def _where_sql(where: dict) -> tuple:
+
+    conditions, parameters = [], {}
+    for i, (dim, value) in enumerate((where or {}).items()):
+        conditions.append(f'{dim} = $where_{i}')
+        parameters[f'where_{i}'] = value
+
+    return ' AND '.join(conditions) or 'true', parameters
+
+### Total pada rentang tanggal
+def query_totals(engine: SqlEngine, start_date, end_date, by=None, where: dict = None):
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan total setiap measure pada rentang [start_date, end_date]
+    dengan hasil yang sama seperti cube.query_totals.
+
+    Parameters:
+        engine (SqlEngine): engine SQL (menggantikan cube harian)
+        start_date (date): tanggal awal
+        end_date (date): tanggal akhir
+        by (str/list): dimensi pengelompokan, None untuk total keseluruhan
+        where (dict): filter {dimensi: nilai}
+
+    Returns:
+        pandas Series (jika by None) atau pandas DataFrame yang diindeks oleh by
+    """
+
+    condition, parameters = _where_sql(where)
+
+    if by is None:
+        result = engine.query(f'SELECT {MEASURES_SQL} FROM fact WHERE {condition}', start_date, end_date, parameters)
+        totals = to_measure_frame(result[list(CUBE_MEASURES)].to_numpy(dtype=np.float64))
+        return pd.Series({col: totals[col].iloc[0] for col in totals.columns}, dtype=object)
+
+    by = [by] if isinstance(by, str) else list(by)
+    dims = ', '.join(by)
+    not_null = ' AND '.join(f'{dim} IS NOT NULL' for dim in by)
+
+    result = engine.query(f'SELECT {dims}, {MEASURES_SQL} FROM fact WHERE {condition} AND {not_null} '
+                          f'GROUP BY {dims} ORDER BY {dims}', start_date, end_date, parameters)
+
+    index = pd.MultiIndex.from_frame(result[by]) if len(by) > 1 else pd.Index(result[by[0]], name=by[0])
+
+    return to_measure_frame(result[list(CUBE_MEASURES)].to_numpy(dtype=np.float64), index=index)
+
+### Deret bulanan pada rentang tanggal
+def query_monthly(engine: SqlEngine, start_date, end_date, where: dict = None) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan total setiap measure per bulan pada rentang [start_date, end_date]
+    dengan hasil yang sama seperti cube.query_monthly (bulan tanpa transaksi bernilai 0).
+
+    Returns:
+        pandas DataFrame yang diindeks oleh year_month (Period bulanan)
+    """
+
+    condition, parameters = _where_sql(where)
+
+    result = engine.query(f"SELECT date_trunc('month', order_purchase_timestamp) AS year_month, {MEASURES_SQL} "
+                          f'FROM fact WHERE {condition} GROUP BY year_month', start_date, end_date, parameters)
+
+    months = pd.period_range(pd.Timestamp(start_date), pd.Timestamp(end_date), freq='M', name='year_month')
+    values = result.set_index(pd.PeriodIndex(result['year_month'], freq='M'))[list(CUBE_MEASURES)]
+
+    return to_measure_frame(values.reindex(months, fill_value=0).to_numpy(dtype=np.float64), index=months)
+
+### Top-N seller / customer pada rentang tanggal
+def query_top(engine: SqlEngine, start_date, end_date, entity: str, n: int = 5) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan n entity dengan nilai terbesar pada rentang [start_date, end_date]
+    dengan hasil yang sama seperti leaderboard.query_top. ORDER BY ... LIMIT dijalankan DuckDB sebagai top-N
+    (heap berukuran n), tanpa mengurutkan semua entity.
+
+    Returns:
+        pandas DataFrame yang diindeks oleh kode entity, satu kolom LEADERBOARDS[entity]['column'], urut menurun
+    """
+
+    spec = LEADERBOARDS[entity]
+
+    result = engine.query(f"""
+        SELECT {entity}, sum({spec['measure']}) AS value
+        FROM fact
+        WHERE {spec['group']} AND {spec['location']} IS NOT NULL
+        GROUP BY {entity}
+        ORDER BY value DESC, {entity}
+        LIMIT {int(n)}""", start_date, end_date)
+
+    return pd.DataFrame({spec['column']: result['value'].to_numpy(dtype=np.float64)},
+                        index=pd.Index(result[entity].to_numpy(dtype=np.int64), name=entity))
+
+### Jumlah distinct seller / customer aktif
+def query_distinct(engine: SqlEngine, start_date, end_date, entity: str, by_state: bool = False):
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan jumlah distinct seller / customer aktif pada rentang
+    [start_date, end_date], keseluruhan atau per state, seperti distinct.query_distinct dan
+    distinct.query_distinct_by_state. COUNT(DISTINCT) pada DuckDB selalu exact.
+
+    Returns:
+        jumlah distinct (int), atau pandas Series yang diindeks oleh state jika by_state
+    """
+
+    spec = LEADERBOARDS[entity]
+    location = spec['location']
+
+    if not by_state:
+        result = engine.query(f"""
+            SELECT count(DISTINCT {entity}) AS n FROM fact
+            WHERE {spec['group']} AND {location} IS NOT NULL""", start_date, end_date)
+        return int(result['n'].iloc[0])
+
+    result = engine.query(f"""
+        SELECT {location}, count(DISTINCT {entity}) AS n FROM fact
+        WHERE {spec['group']} AND {location} IS NOT NULL
+        GROUP BY {location}""", start_date, end_date)
+
+    states = engine.categories[location]
+    counts = pd.Series(result['n'].to_numpy(dtype=np.int64), index=result[location].astype(str))
+
+    return counts.reindex(states, fill_value=0)
+
+### Kuantil price, freight_value, dan nilai order
+def query_quantiles(engine: SqlEngine, start_date, end_date, name: str, quantiles: tuple = (0.5, 0.9, 0.95), by: str = None):
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan kuantil QUANTILE_MEASURES[name] pada rentang [start_date, end_date],
+    keseluruhan atau per kelompok, seperti quantile.query_quantiles dan quantile.query_quantiles_by.
+    quantile_disc pada DuckDB exact (rank ceil(q * n) - 1), tanpa error bucket sketch.
+
+    Returns:
+        pandas Series yang diindeks oleh kuantil, atau pandas DataFrame yang diindeks oleh kelompok
+        (satu kolom per kuantil dan kolom count) jika by diisi
+    """
+
+    spec = QUANTILE_MEASURES[name]
+    columns = ''.join(f'any_value({col}) AS {col}, ' if name == 'order_value' else f'{col}, ' for col in spec['by'])
+
+    if name == 'order_value':
+        source = f"""
+            SELECT {columns}sum({spec['measure']}) AS value FROM fact
+            WHERE {spec['group']} AND {spec['measure']} IS NOT NULL GROUP BY order_id"""
+    else:
+        source = f"SELECT {columns}{spec['measure']} AS value FROM fact WHERE {spec['group']} AND {spec['measure']} IS NOT NULL"
+
+    quantile_list = '[' + ', '.join(str(float(q)) for q in quantiles) + ']'
+    group_sql = f'{by}, ' if by else ''
+    result = engine.query(f"""
+        , quantile_values AS ({source})
+        SELECT {group_sql}quantile_disc(value, {quantile_list}) AS quantiles, count(*) AS count
+        FROM quantile_values {f'WHERE {by} IS NOT NULL GROUP BY {by}' if by else ''}""", start_date, end_date)
+
+    # Rentang atau kelompok tanpa nilai menghasilkan NULL
+    values = np.array([q if isinstance(q, (list, np.ndarray)) else [np.nan] * len(quantiles) for q in result['quantiles']],
+                      dtype=np.float64).reshape(len(result), len(quantiles))
+
+    if not by:
+        return pd.Series(values[0], index=pd.Index(quantiles, name='quantile'))
+
+    groups = engine.categories[by]
+    result = pd.DataFrame(values, index=result[by].astype(str), columns=list(quantiles)).assign(count=result['count'].to_numpy())
+
+    return result.reindex(groups).fillna({'count': 0}).astype({'count': np.int64})
+
+### Mendapatkan pivot_seller dan pivot_order
+def create_pivot_seller_and_order(engine: SqlEngine, start_date, end_date) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan pivot_seller dan pivot_order seperti
+    create_pivot_seller_and_order di dashboard-app.py.
+
+    Returns:
+        tuple(pivot_seller, pivot_order):
+        pivot_seller diindeks oleh seller_id dan pivot_order diindeks oleh order_id (kode int32)
+    """
+
+    stats = ', '.join(f'{function}({col}) AS {col}_{suffix}'
+                      for col in ('price', 'freight_value')
+                      for function, suffix in (('sum', 'sum'), ('avg', 'mean'), ('max', 'max'), ('min', 'min')))
+
+    pivot_seller = engine.query(f"""
+        SELECT seller_id, {stats},
+               any_value(seller_zip_code_prefix) AS seller_zip_code_prefix,
+               any_value(seller_city) AS seller_city,
+               any_value(seller_state) AS seller_state
+        FROM fact WHERE kelompok_seller
+        GROUP BY seller_id ORDER BY price_sum DESC
+        """, start_date, end_date)
+
+    pivot_order = engine.query(f"""
+        SELECT order_id, any_value(customer_id) AS customer_id, sum(payment_value) AS payment_value_sum, {stats},
+               any_value(order_status) AS order_status,
+               any_value(order_purchase_timestamp) AS order_purchase_timestamp,
+               any_value(customer_zip_code_prefix) AS customer_zip_code_prefix,
+               any_value(customer_city) AS customer_city,
+               any_value(customer_state) AS customer_state
+        FROM fact WHERE kelompok_customer
+        GROUP BY order_id ORDER BY payment_value_sum DESC
+        """, start_date, end_date)
+
+    return pivot_seller.set_index('seller_id'), pivot_order.set_index('order_id')
+
+### Mendapatkan category_matrices
+def create_category_matrices(engine: SqlEngine, start_date, end_date) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan matriks sparse jumlah item per entity per kategori product
+    seperti create_category_matrices di dashboard-app.py. Query hanya mengembalikan jumlah item per
+    (seller, kategori) dan (order, kategori); matriks kota dan state dijumlahkan dari keduanya karena
+    kota dan state tetap untuk setiap seller dan order.
+
+    Returns:
+        category_matrices (dict): {nama entity: scipy csr_matrix}, beserta 'categories' dan 'labels'
+    """
+
+    category = 'product_category_name'
+    category_codes = lambda result: engine.codes(category, result[category])
+    shape = lambda n_rows: (n_rows, len(engine.categories[category]))
+
+    def matrix(rows, cols, counts, n_rows):
+        valid = (rows >= 0) & (cols >= 0)
+        return sp.coo_matrix((counts[valid], (rows[valid], cols[valid])), shape=shape(n_rows)).tocsr()
+
+    category_matrices = {
+        'categories': engine.categories[category],
+        'labels': {col: engine.categories[col] for col in ['seller_city', 'seller_state', 'customer_city', 'customer_state']},
+    }
+
+    for entity, side, prefix in (('seller_id', 'kelompok_seller', 'seller'), ('order_id', 'kelompok_customer', 'customer')):
+
+        result = engine.query(f"""
+            SELECT {entity}, {category},
+                   any_value({prefix}_city) AS {prefix}_city,
+                   any_value({prefix}_state) AS {prefix}_state,
+                   count(*) AS item_count
+            FROM fact WHERE {side}
+            GROUP BY {entity}, {category}
+            """, start_date, end_date)
+
+        cols = category_codes(result)
+        counts = result['item_count'].to_numpy(dtype=np.int64)
+
+        category_matrices[entity] = matrix(result[entity].to_numpy(dtype=np.int64), cols, counts, engine.n_ids[entity])
+        for col in (f'{prefix}_city', f'{prefix}_state'):
+            category_matrices[col] = matrix(engine.codes(col, result[col]), cols, counts, len(engine.categories[col]))
+
+    return category_matrices
+
+### Mendapatkan hasil RFM untuk semua periode
+def create_rfm(engine: SqlEngine, start_date, end_date, periods: tuple = RFM_PERIODS) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan analisis RFM seperti rfm.create_rfm. Recency, frequency
+    (per periode), dan monetary dihitung per order di dalam SQL; skor dan klaster dihitung dengan
+    rfm.score_rfm.
+
+    Returns:
+        rfm (dict): {'today': Period hari ini, periode: {'recency', 'frequency', 'monetary', 'df_rfm'}}
+    """
+
+    periods = tuple(sorted(periods))
+    outliers = ', '.join(f'DATE {_quote(day)}' for day in SHIPPING_OUTLIERS)
+
+    windows = ', '.join(f'count(*) FILTER (WHERE recency <= {period}) AS frequency_{k}, '
+                        f'coalesce(sum(recency) FILTER (WHERE recency <= {period}), 0) AS recency_sum_{k}'
+                        for k, period in enumerate(periods))
+
+    shipped = f"""
+        , shipped AS (
+            SELECT order_id, CAST(shipping_limit_date AS DATE) AS day
+            FROM fact WHERE kelompok_seller AND CAST(shipping_limit_date AS DATE) NOT IN ({outliers})
+        )
+        """
+
+    # Hari ini = tanggal shipping terakhir
+    today = engine.query(shipped + 'SELECT max(day) AS today FROM shipped', start_date, end_date)['today'].iloc[0]
+    rfm = {'today': pd.Period(today, freq='D') if pd.notna(today) else None}
+
+    result = engine.query(shipped + f"""
+        , item_side AS (
+            SELECT order_id, min(recency) AS recency, {windows}
+            FROM (SELECT order_id, date_diff('day', day, $today) AS recency FROM shipped)
+            GROUP BY order_id
+        ),
+        order_side AS (
+            SELECT order_id, sum(payment_value) AS monetary, min(order_purchase_timestamp) AS purchase
+            FROM fact WHERE kelompok_customer AND customer_state IS NOT NULL
+            GROUP BY order_id
+        )
+        SELECT coalesce(item_side.order_id, order_side.order_id) AS order_id,
+               item_side.* EXCLUDE (order_id), order_side.monetary,
+               date_diff('microsecond', order_side.purchase, (SELECT max(purchase) FROM order_side)) / 86400e6 AS age
+        FROM item_side FULL OUTER JOIN order_side ON item_side.order_id = order_side.order_id
+        ORDER BY order_id
+        """, start_date, end_date, {'today': pd.Timestamp(today).date() if pd.notna(today) else None})
+
+    recency = result['recency'].to_numpy()
+    monetary = result['monetary'].fillna(0.0).to_numpy(dtype=np.float64)
+    age = result['age'].to_numpy(dtype=np.float64)
+
+    for k, period in enumerate(periods):
+
+        frequency = result[f'frequency_{k}'].fillna(0).to_numpy(dtype=np.int64)
+        in_item_window = frequency > 0
+        in_monet_window = age <= period
+
+        selected = in_item_window & in_monet_window
+
+        df_rfm = pd.DataFrame({
+            'order_id': result['order_id'].to_numpy()[selected],
+            'recency': recency[selected].astype(np.int64),
+            'frequency': frequency[selected],
+            'monetary': monetary[selected],
+        })
+        df_rfm = df_rfm.assign(**score_rfm(df_rfm['recency'].to_numpy(),
+                                           df_rfm['frequency'].to_numpy(),
+                                           df_rfm['monetary'].to_numpy(),
+                                           period))
+        df_rfm = df_rfm.sort_values(by='klaster_rfm_score', kind='stable').reset_index(drop=True)
+
+        n_items = frequency.sum()
+
+        rfm[period] = {
+            'recency': result[f'recency_sum_{k}'].fillna(0).sum() / n_items if n_items else 0.0,
+            'frequency': n_items / in_item_window.sum() if n_items else 0.0,
+            'monetary': monetary[in_monet_window].mean() if in_monet_window.any() else 0.0,
+            'df_rfm': df_rfm,
+        }
+
+    return rfm
@@ -0,0 +1,183 @@
+"""
+Penyimpanan data kolumnar (Parquet) untuk dashboard.
+
+CSV di folder data/ dikonversi sekali ke file Parquet yang sudah bertipe:
+kolom datetime disimpan dalam bentuk yang sudah di-parse dan kolom berkardinalitas
+rendah (status, state, kota, kategori) disimpan sebagai dictionary. Dashboard lalu
+membaca file Parquet tersebut (memory-mapped) sehingga cold start tidak lagi
+didominasi parsing CSV.
+
+Konversi dijalankan dengan:
+
+    python -m dashboard.store
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+DATA_DIR = 'data'
+PARQUET_DIR = os.path.join(DATA_DIR, 'parquet')
+
+### Skema setiap tabel: nama file CSV, kolom datetime, dan kolom dictionary
+TABLES = {
+    'df_customer': {
+        'file': 'df_customer_clean',
+        'datetime': [],
+        'category': ['customer_city', 'customer_state'],
+    },
+    'df_order': {
+        'file': 'df_order_clean',
+        'datetime': ['order_purchase_timestamp'],
+        'category': ['order_status'],
+    },
+    'df_order_items': {
+        'file': 'df_order_items_clean',
+        'datetime': ['shipping_limit_date'],
+        'category': [],
+    },
+    'df_order_payments': {
+        'file': 'df_order_payments_clean',
+        'datetime': [],
+        'category': ['payment_type'],
+    },
+    'df_product': {
+        'file': 'df_product_clean',
+        'datetime': [],
+        'category': ['product_category_name'],
+    },
+    'df_sellers': {
+        'file': 'df_sellers_clean',
+        'datetime': [],
+        'category': ['seller_city', 'seller_state'],
+    },
+    'df_geolocation': {
+        'file': 'df_geolocation_clean',
+        'datetime': [],
+        'category': ['geolocation_city', 'geolocation_state'],
+    },
+}
+
+### Mendapatkan path file CSV dan Parquet
+def csv_path(name: str, data_dir: str = DATA_DIR) -> str:
+    return os.path.join(data_dir, TABLES[name]['file'] + '.csv')
+
+def parquet_path(name: str, parquet_dir: str = PARQUET_DIR) -> str:
+    return os.path.join(parquet_dir, TABLES[name]['file'] + '.parquet')
+
+### Membaca CSV beserta konversi tipenya
+def read_typed_csv(name: str, data_dir: str = DATA_DIR) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk membaca satu tabel CSV lalu mengubah tipe kolomnya sesuai TABLES.
+
+    Parameters:
+        name (str): nama tabel pada TABLES, misalnya 'df_order'
+        data_dir (str): folder tempat file CSV berada
+
+    Returns:
+        data_frame (pandas DataFrame): Data Frame dengan kolom datetime dan category
+    """
+
+    schema = TABLES[name]
+    data_frame = pd.read_csv(csv_path(name, data_dir))
+
+    for col in schema['datetime']:
+        data_frame[col] = pd.to_datetime(data_frame[col])
+
+    for col in schema['category']:
+        data_frame[col] = data_frame[col].astype('category')
+
+    return data_frame
+
+### Konversi CSV ke Parquet
+def convert_csv_to_parquet(data_dir: str = DATA_DIR,
+                           parquet_dir: str = PARQUET_DIR,
+                           compression: str = 'zstd') -> list:
+
+    """
+    Fungsi ini bertujuan untuk mengonversi semua CSV pada TABLES menjadi file Parquet
+    yang sudah bertipe dan terkompresi. Tabel yang CSV-nya tidak ada akan dilewati.
+
+    Parameters:
+        data_dir (str): folder tempat file CSV berada
+        parquet_dir (str): folder tujuan file Parquet
+        compression (str): codec kompresi Parquet
+
+    Returns:
+        converted (list): list nama tabel yang berhasil dikonversi
+    """
+
+    os.makedirs(parquet_dir, exist_ok=True)
+
+    converted = []
+    for name in TABLES:
+        if not os.path.exists(csv_path(name, data_dir)):
+            continue
+
+        table = pa.Table.from_pandas(read_typed_csv(name, data_dir), preserve_index=False)
+        pq.write_table(table, parquet_path(name, parquet_dir), compression=compression)
+        converted.append(name)
+
+    return converted
+
+### Membaca satu tabel
+def load_table(name: str,
+               data_dir: str = DATA_DIR,
+               parquet_dir: str = PARQUET_DIR,
+               categorical: bool = False) -> pd.DataFrame:
+
+    """
+    Fungsi ini bertujuan untuk membaca satu tabel dari file Parquet (memory-mapped).
+    Jika file Parquet belum ada atau lebih lama dari CSV-nya, tabel dibaca dari CSV.
+
+    Parameters:
+        name (str): nama tabel pada TABLES
+        data_dir (str): folder tempat file CSV berada
+        parquet_dir (str): folder tempat file Parquet berada
+        categorical (bool): jika False, kolom dictionary dikembalikan sebagai object (string)
+
+    Returns:
+        data_frame (pandas DataFrame): Data Frame tabel yang diminta
+    """
+
+    path = parquet_path(name, parquet_dir)
+    source = csv_path(name, data_dir)
+
+    if os.path.exists(path) and (not os.path.exists(source) or os.path.getmtime(path) >= os.path.getmtime(source)):
+        data_frame = pq.read_table(path, memory_map=True).to_pandas()
+    else:
+        data_frame = read_typed_csv(name, data_dir)
+
+    if not categorical:
+        for col in TABLES[name]['category']:
+            data_frame[col] = data_frame[col].astype(object)
+
+    return data_frame
+
+### Membaca semua tabel
+def load_tables(data_dir: str = DATA_DIR,
+                parquet_dir: str = PARQUET_DIR,
+                categorical: bool = False) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk membaca ketujuh tabel dengan urutan yang sama seperti read_csv() di dashboard-app.py.
+
+    Returns:
+        tuple(df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation)
+    """
+
+    return tuple(load_table(name, data_dir, parquet_dir, categorical) for name in TABLES)
+
+
+if __name__ == '__main__':
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else DATA_DIR
+    parquet_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, 'parquet')
+
+    for name in convert_csv_to_parquet(data_dir, parquet_dir):
+        print(f'{csv_path(name, data_dir)} -> {parquet_path(name, parquet_dir)}')
@@ -0,0 +1,228 @@
+"""
+Generator data sintetis berbentuk dataset Olist untuk benchmark dan perencanaan kapasitas.
+
+Tabel customer, order, order item, dan payment dibuat dengan skema yang sama seperti CSV pada
+data/ (lihat store.TABLES), pada skala 1x (jumlah order Olist), 10x, 100x, dan seterusnya.
+Data konsisten secara referensial:
+- setiap order punya satu customer_id (seperti Olist), customer_unique_id bisa berulang
+- setiap item menunjuk ke product_id dan seller_id yang ada, setiap produk dijual oleh satu seller
+- total payment setiap order sama dengan total price + freight_value item-itemnya
+- zip prefix, kota, dan state customer/seller diambil dari baris df_geolocation yang sama
+
+Tabel produk dan seller ikut diperbesar sesuai skala, kategori produk mengikuti distribusi
+df_product yang ada. Dataset dibuat dengan:
+
+    python -m dashboard.synthetic <folder tujuan> [skala]
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from dashboard.store import DATA_DIR, TABLES, csv_path, load_table
+
+
+## Ukuran dataset Olist (skala 1x)
+OLIST_SIZE = {'orders': 99441, 'products': 32951, 'sellers': 3095}
+
+## Rentang waktu pembelian
+START_TIMESTAMP = pd.Timestamp('2016-09-04')
+END_TIMESTAMP = pd.Timestamp('2018-09-03')
+
+## Distribusi status order, jumlah item per order, dan tipe payment (mendekati Olist)
+ORDER_STATUS = {'delivered': 0.970, 'shipped': 0.011, 'canceled': 0.006, 'unavailable': 0.006,
+                'invoiced': 0.003, 'processing': 0.003, 'created': 0.0005, 'approved': 0.0005}
+ITEMS_PER_ORDER = {1: 0.900, 2: 0.075, 3: 0.015, 4: 0.006, 5: 0.003, 6: 0.001}
+PAYMENT_TYPE = {'credit_card': 0.74, 'boleto': 0.19, 'voucher': 0.055, 'debit_card': 0.015}
+
+## Porsi order yang dibayar dengan dua payment (voucher + tipe lain) dan porsi customer yang order lagi
+SPLIT_PAYMENT_SHARE = 0.03
+REPEAT_CUSTOMER_SHARE = 0.03
+
+## Sebaran popularitas produk dan seller
+POPULARITY_SIGMA = 1.5
+
+### ID hex 32 karakter seperti ID Olist
+def hex_ids(rng: np.random.Generator, n: int) -> np.ndarray:
+
+    # Satu string hex panjang dipotong per 32 karakter tanpa loop Python
+    return np.frombuffer(rng.bytes(16 * n).hex().encode(), dtype='S32').astype(str)
+
+### Memilih kategori sesuai distribusi
+def _choice(rng: np.random.Generator, distribution: dict, n: int) -> np.ndarray:
+
+    p = np.array(list(distribution.values()), dtype=np.float64)
+    return rng.choice(np.array(list(distribution)), size=n, p=p / p.sum())
+
+### Bobot popularitas (lognormal, beberapa entitas jauh lebih populer)
+def _popularity(rng: np.random.Generator, n: int) -> np.ndarray:
+
+    weights = rng.lognormal(0, POPULARITY_SIGMA, n)
+    return weights / weights.sum()
+
+### Lokasi acak dari df_geolocation
+def _sample_locations(rng: np.random.Generator, df_geolocation: pd.DataFrame, n: int) -> pd.DataFrame:
+
+    rows = rng.integers(0, len(df_geolocation), n)
+    return df_geolocation.iloc[rows].reset_index(drop=True)
+
+### Membuat seluruh tabel sintetis
+def generate_tables(scale: float,
+                    df_geolocation: pd.DataFrame,
+                    category_weights: pd.Series,
+                    seed: int = 0) -> tuple:
+
+    """
+    Fungsi ini bertujuan untuk membuat ketujuh tabel dashboard pada skala tertentu.
+
+    Parameters:
+        scale (float): kelipatan ukuran Olist, 1 = 99441 order
+        df_geolocation (pandas DataFrame): df_geolocation, sumber zip prefix, kota, dan state
+        category_weights (pandas Series): bobot setiap product_category_name
+        seed (int): seed generator acak
+
+    Returns:
+        tuple(df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation)
+        dengan urutan yang sama seperti store.load_tables()
+    """
+
+    rng = np.random.default_rng(seed)
+
+    n_orders = max(1, int(round(OLIST_SIZE['orders'] * scale)))
+    n_products = max(1, int(round(OLIST_SIZE['products'] * scale)))
+    n_sellers = max(1, int(round(OLIST_SIZE['sellers'] * scale)))
+
+    ## Seller
+    location = _sample_locations(rng, df_geolocation, n_sellers)
+    df_sellers = pd.DataFrame({
+        'seller_id': hex_ids(rng, n_sellers),
+        'seller_zip_code_prefix': location['geolocation_zip_code_prefix'].to_numpy(),
+        'seller_city': location['geolocation_city'].to_numpy(),
+        'seller_state': location['geolocation_state'].to_numpy(),
+    })
+
+    ## Produk, setiap produk dijual oleh satu seller (popularitas seller tidak merata)
+    categories = category_weights.index.to_numpy()
+    p = category_weights.to_numpy(dtype=np.float64)
+    df_product = pd.DataFrame({
+        'product_id': hex_ids(rng, n_products),
+        'product_category_name': rng.choice(categories, size=n_products, p=p / p.sum()),
+    })
+    product_seller = rng.choice(n_sellers, size=n_products, p=_popularity(rng, n_sellers))
+    product_price = np.round(rng.lognormal(4.5, 0.9, n_products), 2)
+
+    ## Customer, satu customer_id per order
+    location = _sample_locations(rng, df_geolocation, n_orders)
+    customer_unique_id = hex_ids(rng, n_orders)
+    repeat = rng.random(n_orders) < REPEAT_CUSTOMER_SHARE
+    customer_unique_id[repeat] = customer_unique_id[rng.integers(0, n_orders, repeat.sum())]
+    df_customer = pd.DataFrame({
+        'customer_id': hex_ids(rng, n_orders),
+        'customer_unique_id': customer_unique_id,
+        'customer_zip_code_prefix': location['geolocation_zip_code_prefix'].to_numpy(),
+        'customer_city': location['geolocation_city'].to_numpy(),
+        'customer_state': location['geolocation_state'].to_numpy(),
+    })
+
+    ## Order, jumlah order per hari naik seiring waktu
+    span = (END_TIMESTAMP - START_TIMESTAMP).value
+    offset = np.sort(np.sqrt(rng.random(n_orders)) * span).astype(np.int64)
+    purchase = pd.to_datetime(START_TIMESTAMP.value + offset).floor('s')
+    df_order = pd.DataFrame({
+        'order_id': hex_ids(rng, n_orders),
+        'customer_id': df_customer['customer_id'].to_numpy(),
+        'order_status': _choice(rng, ORDER_STATUS, n_orders),
+        'order_purchase_timestamp': purchase,
+    })
+
+    ## Order item, produk populer lebih sering dibeli
+    items_per_order = _choice(rng, ITEMS_PER_ORDER, n_orders).astype(np.int64)
+    order_pos = np.repeat(np.arange(n_orders), items_per_order)
+    n_items = len(order_pos)
+    first_item = np.cumsum(items_per_order) - items_per_order
+    product = rng.choice(n_products, size=n_items, p=_popularity(rng, n_products))
+    df_order_items = pd.DataFrame({
+        'order_id': df_order['order_id'].to_numpy()[order_pos],
+        'order_item_id': np.arange(n_items) - first_item[order_pos] + 1,
+        'product_id': df_product['product_id'].to_numpy()[product],
+        'seller_id': df_sellers['seller_id'].to_numpy()[product_seller[product]],
+        'shipping_limit_date': purchase[order_pos] + pd.to_timedelta(rng.integers(2, 8, n_items), unit='D'),
+        'price': product_price[product],
+        'freight_value': np.round(rng.lognormal(2.8, 0.5, n_items), 2),
+    })
+
+    ## Payment, total per order sama dengan total item
+    total = np.bincount(order_pos, weights=df_order_items['price'] + df_order_items['freight_value'],
+                        minlength=n_orders).round(2)
+    payment_type = _choice(rng, PAYMENT_TYPE, n_orders)
+    installments = np.where(payment_type == 'credit_card', rng.integers(1, 11, n_orders), 1)
+
+    split = rng.random(n_orders) < SPLIT_PAYMENT_SHARE
+    voucher = np.round(total[split] * rng.uniform(0.1, 0.9, split.sum()), 2)
+    first_value = total.copy()
+    first_value[split] = voucher
+
+    df_order_payments = pd.concat([
+        pd.DataFrame({
+            'order_id': df_order['order_id'].to_numpy(),
+            'payment_sequential': 1,
+            'payment_type': np.where(split, 'voucher', payment_type),
+            'payment_installments': np.where(split, 1, installments),
+            'payment_value': first_value,
+        }),
+        pd.DataFrame({
+            'order_id': df_order['order_id'].to_numpy()[split],
+            'payment_sequential': 2,
+            'payment_type': np.where(payment_type[split] == 'voucher', 'credit_card', payment_type[split]),
+            'payment_installments': installments[split],
+            'payment_value': np.round(total[split] - voucher, 2),
+        }),
+    ]).sort_values(by=['order_id', 'payment_sequential'], kind='stable').reset_index(drop=True)
+
+    return df_customer, df_order, df_order_items, df_order_payments, df_product, df_sellers, df_geolocation
+
+### Menyimpan tabel sintetis sebagai CSV
+def write_tables(tables: tuple, data_dir: str) -> list:
+
+    """
+    Fungsi ini bertujuan untuk menyimpan tabel hasil generate_tables sebagai CSV dengan nama file
+    yang sama seperti store.TABLES, sehingga folder tersebut bisa dibaca langsung oleh dashboard.
+
+    Returns:
+        written (list): list path file yang ditulis
+    """
+
+    os.makedirs(data_dir, exist_ok=True)
+
+    written = []
+    for name, data_frame in zip(TABLES, tables):
+        path = csv_path(name, data_dir)
+        data_frame.to_csv(path, index=False)
+        written.append(path)
+
+    return written
+
+### Membuat dataset sintetis dari data referensi di data/
+def generate_dataset(data_dir: str, scale: float, seed: int = 0, reference_dir: str = DATA_DIR) -> list:
+
+    """
+    Fungsi ini bertujuan untuk membuat dataset sintetis pada data_dir. df_geolocation dan distribusi
+    kategori produk diambil dari reference_dir.
+    """
+
+    parquet_dir = os.path.join(reference_dir, 'parquet')
+    df_geolocation = load_table('df_geolocation', reference_dir, parquet_dir)
+    category_weights = load_table('df_product', reference_dir, parquet_dir)['product_category_name'].value_counts()
+
+    return write_tables(generate_tables(scale, df_geolocation, category_weights, seed), data_dir)
+
+
+if __name__ == '__main__':
+
+    data_dir = sys.argv[1]
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    for path in generate_dataset(data_dir, scale):
+        print(path)
@@ -0,0 +1,130 @@
+"""
+Backend grafik di sisi browser (Vega-Lite) untuk line chart dan bar chart.
+
+Fungsi-fungsi di sini menghasilkan spec Vega-Lite (dict) dengan signature yang sama seperti
+create_line_chart dan create_bar_chart pada dashboard.charts. Server hanya mengirim data hasil
+agregasi (puluhan baris) dan spec-nya, lalu grafik digambar oleh browser dengan st.vega_lite_chart,
+sehingga tidak ada render matplotlib dan tidak ada PNG yang dikirim.
+"""
+
+import math
+
+import pandas as pd
+
+
+VEGA_LITE_SCHEMA = 'https://vega.github.io/schema/vega-lite/v5.json'
+
+LINE_COLOR = '#7e74f1'
+
+CHART_HEIGHT = 300
+
+## Style yang menyerupai grafik matplotlib (font Roboto dari @font-face, tanpa grid dan border)
+CHART_CONFIG = {
+    'font': 'Roboto',
+    'view': {'stroke': None},
+    'axis': {'grid': False, 'domainColor': 'black', 'tickColor': 'black',
+             'labelColor': 'black', 'titleColor': 'black', 'titleFontWeight': 'normal'},
+    'title': {'fontWeight': 'normal', 'fontSize': 14, 'color': 'black'},
+}
+
+### Nilai numerik yang bisa di-serialize ke JSON
+def _json_number(value):
+
+    value = float(value)
+    return None if math.isnan(value) else value
+
+### Label yang unik agar setiap baris menjadi satu bar
+def _unique_labels(labels: list) -> list:
+
+    seen = {}
+    unique = []
+
+    for label in labels:
+        # Label kembar diberi zero-width space sehingga tetap tampil sama
+        count = seen.get(label, 0)
+        seen[label] = count + 1
+        unique.append(label + '\u200b' * count)
+
+    return unique
+
+### Spec dasar
+def _base_spec(title_: str, values: list) -> dict:
+
+    return {
+        '$schema': VEGA_LITE_SCHEMA,
+        'title': title_,
+        'width': 'container',
+        'height': CHART_HEIGHT,
+        'data': {'values': values},
+        'config': CHART_CONFIG,
+    }
+
+##### SPEC LINE CHART
+def line_chart_spec(data_frame: pd.DataFrame, column_: str, title_: str, ylabel_: str) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan spec Vega-Lite line chart bulanan dengan marker dan anotasi
+    nilai di atas setiap titik, seperti charts.create_line_chart.
+
+    Parameters:
+        data_frame (pandas DataFrame): Data Frame yang diindeks oleh bulan
+        column_ (str): kolom nilai
+        title_ (str): judul grafik
+        ylabel_ (str): label sumbu y
+
+    Returns:
+        spec (dict): spec Vega-Lite
+    """
+
+    values = [{'month': str(month), 'value': _json_number(value)}
+              for month, value in zip(data_frame.index, data_frame[column_])]
+
+    spec = _base_spec(title_, values)
+    spec['encoding'] = {
+        'x': {'field': 'month', 'type': 'ordinal', 'sort': None, 'title': 'Month-Year'},
+        'y': {'field': 'value', 'type': 'quantitative', 'title': ylabel_},
+    }
+    spec['layer'] = [
+        {'mark': {'type': 'line', 'color': LINE_COLOR, 'point': {'color': LINE_COLOR, 'filled': True}}},
+        {'mark': {'type': 'text', 'dy': -8, 'fontSize': 8},
+         'encoding': {'text': {'field': 'value', 'type': 'quantitative', 'format': '.0f'}}},
+    ]
+
+    return spec
+
+##### SPEC BAR CHART
+def bar_chart_spec(data_frame: pd.DataFrame,
+                   index_: list,
+                   xlabel_: str,
+                   ylabel_: str,
+                   title_: str,
+                   column_: str,
+                   colors: list,
+                   slicer=3) -> dict:
+
+    """
+    Fungsi ini bertujuan untuk menghasilkan spec Vega-Lite bar chart horizontal, seperti
+    charts.create_bar_chart: label dipotong menjadi slicer huruf jika ada label yang lebih panjang,
+    dan setiap bar diberi warna sesuai urutan colors.
+
+    Returns:
+        spec (dict): spec Vega-Lite
+    """
+
+    labels = [str(label) for label in index_]
+    if any(len(label) > slicer for label in labels):
+        labels = [label[:slicer]+'...' for label in labels]
+    labels = _unique_labels(labels)
+
+    values = [{'label': label, 'value': _json_number(value), 'color': color}
+              for label, value, color in zip(labels, data_frame[column_], colors)]
+
+    spec = _base_spec(title_, values)
+    spec['mark'] = {'type': 'bar'}
+    spec['encoding'] = {
+        'y': {'field': 'label', 'type': 'nominal', 'sort': None, 'title': ylabel_},
+        'x': {'field': 'value', 'type': 'quantitative', 'title': xlabel_, 'axis': {'format': '~s'}},
+        'color': {'field': 'color', 'type': 'nominal', 'scale': None, 'legend': None},
+    }
+
+    return spec